@@ -0,0 +1,63 @@
+# ax25_address.py
+# Python3
+# AX.25 address field codec shared by the packet encoder and parser
+# Support validate.py
+# 18 Oct 2026
+
+import sys
+import functools
+
+ADDRESS_CACHE_SIZE = 1024
+
+# Shift callsign characters right one bit, dropping the 0x00 and space padding.
+_CALLSIGN_SHIFT = bytes(character >> 1 for character in range(256))
+_CALLSIGN_PADDING = bytes([0x00, 0x01, 0x40, 0x41])
+
+@functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def ParseCallsign(callsign_string):
+	"""
+	Splits a callsign string like "0TEST0-5" into six space-padded callsign
+	bytes and an SSID clamped to 0..16. Callsigns longer than six characters
+	are truncated, and the character after the sixth is skipped as the hyphen.
+	"""
+	data = bytes(callsign_string.upper(), 'UTF-8')
+	hyphen = data.find(b'-', 0, 6)
+	if hyphen < 0:
+		callsign = data[:6]
+		ssid_digits = data[7:]
+	else:
+		callsign = data[:hyphen]
+		ssid_digits = data[hyphen + 1:]
+	if len(ssid_digits) == 1:
+		ssid = ssid_digits[0] - 0x30
+	elif len(ssid_digits) == 2:
+		ssid = ((ssid_digits[0] - 0x30) * 10) + (ssid_digits[1] - 0x30)
+	else:
+		ssid = 0
+	ssid = min(max(ssid, 0), 16)
+	return callsign.ljust(6, b' '), ssid
+
+@functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def EncodeAddress(callsign_string):
+	"""
+	Returns the 7 byte address field for callsign_string. The SSID byte only
+	holds the SSID bits; the caller ORs in the C/H, reserved and extension bits.
+	"""
+	callsign, ssid = ParseCallsign(callsign_string)
+	field = bytearray(7)
+	for j in range(6):
+		field[j] = callsign[j] << 1
+	field[6] = (ssid & 0xF) << 1
+	return bytes(field)
+
+@functools.lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _DecodeAddress(field):
+	callsign = field[:6].translate(_CALLSIGN_SHIFT, _CALLSIGN_PADDING).decode('latin-1')
+	return sys.intern(callsign + '-' + chr(((field[6] >> 1) & 0b1111) + 0x30))
+
+def DecodeAddress(field):
+	"""
+	Returns the callsign string, e.g. "0TEST0-0", for a 7 byte address field.
+	Repeat decodes of the same field are served from the cache.
+	"""
+	return _DecodeAddress(bytes(field))
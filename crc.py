@@ -1,15 +1,82 @@
-import numpy as np
+# crc.py
+# Python3
+# CRC-16/X.25 frame check sequence used by AX.25
+# Support validate.py
 
-def CalcCRC16(packet):
-	fcsval = np.uint16(0xFFFF)
-	CRC_poly = np.uint16(0x8408)
-	one = np.uint16(1)
-	for byte in packet:
+CRC16_POLY = 0x8408
+CRC16_INIT = 0xFFFF
+
+def _BuildCRC16Table():
+	table = []
+	for index in range(256):
+		fcsval = index
 		for i in range(8):
-			fcsbit = np.bitwise_and(fcsval, one)
-			fcsval = np.right_shift(fcsval, 1)
-			if np.bitwise_xor(fcsbit, np.bitwise_and(byte,one)) != 0:
-				fcsval = np.bitwise_xor(fcsval, CRC_poly)
-			byte = np.right_shift(byte, 1)
-	fcs_val = np.bitwise_and(np.bitwise_not(fcsval), 0xFFFF)
-	return(hex(fcs_val))
+			if fcsval & 1:
+				fcsval = (fcsval >> 1) ^ CRC16_POLY
+			else:
+				fcsval = fcsval >> 1
+		table.append(fcsval)
+	return tuple(table)
+
+CRC16_TABLE = _BuildCRC16Table()
+_CRC16_TABLE_NP = None
+
+def _NumPyCRC16Table():
+	# numpy is only needed by the batch routine, so it is imported on first use.
+	global _CRC16_TABLE_NP
+	if _CRC16_TABLE_NP is None:
+		import numpy as np
+		_CRC16_TABLE_NP = np.array(CRC16_TABLE, dtype=np.uint16)
+	return _CRC16_TABLE_NP
+
+def UpdateCRC16(state, chunk):
+	# Fold chunk into a running CRC state. Start with CRC16_INIT, feed any
+	# number of chunks, then pass the state to FinalizeCRC16.
+	table = CRC16_TABLE
+	for byte in chunk:
+		state = (state >> 8) ^ table[(state ^ byte) & 0xFF]
+	return state
+
+def FinalizeCRC16(state):
+	return state ^ 0xFFFF
+
+def CRC16(packet):
+	return FinalizeCRC16(UpdateCRC16(CRC16_INIT, packet))
+
+def CRC16String(fcs_val):
+	# String form used in the log lines, e.g. "0x99ca".
+	return hex(fcs_val)
+
+def CalcCRC16(packet):
+	return CRC16String(CRC16(packet))
+
+def CalcCRC16Batch(packets):
+	"""
+	Computes the CRC of every frame in packets with one vectorized pass per
+	byte column. Returns a numpy uint16 array in the same order as packets.
+	"""
+	import numpy as np
+	table = _NumPyCRC16Table()
+	count = len(packets)
+	if count == 0:
+		return np.zeros(0, dtype=np.uint16)
+	lengths = np.fromiter((len(packet) for packet in packets), dtype=np.intp, count=count)
+	# Longest frames first, so the frames still active at any column are a prefix.
+	order = np.argsort(-lengths, kind='stable')
+	sorted_lengths = lengths[order]
+	width = int(sorted_lengths[0])
+	frames = np.zeros((count, width), dtype=np.uint8)
+	for row, index in enumerate(order):
+		length = sorted_lengths[row]
+		if length:
+			frames[row, :length] = np.frombuffer(bytes(packets[index]), dtype=np.uint8)
+	# Number of frames that still have a byte at each column.
+	active_counts = count - np.searchsorted(sorted_lengths[::-1], np.arange(width), side='right')
+	state = np.full(count, CRC16_INIT, dtype=np.uint16)
+	for column in range(width):
+		active = active_counts[column]
+		working = state[:active]
+		state[:active] = (working >> 8) ^ table[(working ^ frames[:active, column]) & 0xFF]
+	fcs_vals = np.empty(count, dtype=np.uint16)
+	fcs_vals[order] = state ^ 0xFFFF
+	return fcs_vals
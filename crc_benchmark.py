@@ -0,0 +1,60 @@
+# crc_benchmark.py
+# Python3
+# Compare crc.py against the original per-bit NumPy CRC routine
+# 18 Oct 2026
+#
+# Usage: python3 crc_benchmark.py [frame_count]
+
+import sys
+import time
+import random
+import numpy as np
+import crc
+
+def LegacyCalcCRC16(packet):
+	# The per-bit routine crc.CalcCRC16 used before the lookup table.
+	fcsval = np.uint16(0xFFFF)
+	CRC_poly = np.uint16(0x8408)
+	one = np.uint16(1)
+	for byte in packet:
+		for i in range(8):
+			fcsbit = np.bitwise_and(fcsval, one)
+			fcsval = np.right_shift(fcsval, 1)
+			if np.bitwise_xor(fcsbit, np.bitwise_and(byte,one)) != 0:
+				fcsval = np.bitwise_xor(fcsval, CRC_poly)
+			byte = np.right_shift(byte, 1)
+	fcs_val = np.bitwise_and(np.bitwise_not(fcsval), 0xFFFF)
+	return(hex(fcs_val))
+
+def TimeIt(label, function, frames, byte_count):
+	start_time = time.perf_counter()
+	result = function(frames)
+	elapsed = time.perf_counter() - start_time
+	print(f"{label:<28}{elapsed * 1000:>10.2f} ms{len(frames) / elapsed:>14.0f} frames/s{byte_count / elapsed / 1e6:>10.2f} MB/s")
+	return result, elapsed
+
+def main():
+	frame_count = 200
+	if len(sys.argv) > 1:
+		frame_count = int(sys.argv[1])
+	rng = random.Random(1)
+	frames = []
+	for j in range(frame_count):
+		# Mix of 20 byte IDENT-sized frames and 255 byte burst frames.
+		length = 20 if (j & 1) else 255
+		frames.append(bytes(rng.randrange(256) for k in range(length)))
+	byte_count = sum(len(frame) for frame in frames)
+	print(f"{frame_count} frames, {byte_count} bytes")
+
+	legacy, legacy_time = TimeIt("legacy per-bit", lambda f: [LegacyCalcCRC16(p) for p in f], frames, byte_count)
+	table, table_time = TimeIt("table CalcCRC16", lambda f: [crc.CalcCRC16(p) for p in f], frames, byte_count)
+	ints, int_time = TimeIt("table CRC16 (int)", lambda f: [crc.CRC16(p) for p in f], frames, byte_count)
+	batch, batch_time = TimeIt("CalcCRC16Batch", crc.CalcCRC16Batch, frames, byte_count)
+
+	if legacy != table or ints != [int(x) for x in batch] or table != [crc.CRC16String(x) for x in ints]:
+		print("MISMATCH between implementations")
+		sys.exit(1)
+	print(f"table speedup {legacy_time / table_time:.1f}x, batch speedup {legacy_time / batch_time:.1f}x")
+
+if __name__ == "__main__":
+	main()
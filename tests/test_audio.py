@@ -0,0 +1,44 @@
+# test_audio.py
+# Python3
+# Tests of validate_audio.py
+# 18 Oct 2026
+
+import sys
+import pytest
+import validate_audio as vaudio
+
+def test_aplay_command_passes_channel_count_as_option():
+	command = vaudio.AplayCommand(vaudio.WavFormat(2, 48000, 16))
+	assert command == ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "2", "-r", "48000"]
+
+def test_aplay_command_device_and_8_bit():
+	command = vaudio.AplayCommand(vaudio.WavFormat(1, 8000, 8), device="hw:1")
+	assert command[command.index("-f") + 1] == "U8"
+	assert command[command.index("-c") + 1] == "1"
+	assert command[-2:] == ["-D", "hw:1"]
+
+class FakeAlsa:
+	# The parts of pyalsaaudio AlsaSink uses, recording the PCM settings.
+	PCM_PLAYBACK = 0
+	PCM_FORMAT_U8 = "U8"
+	PCM_FORMAT_S16_LE = "S16_LE"
+	PCM_FORMAT_S24_3LE = "S24_3LE"
+	PCM_FORMAT_S32_LE = "S32_LE"
+
+	def __init__(self):
+		self.opened = []
+
+	def PCM(self, kind, **settings):
+		self.opened.append(settings)
+		return self
+
+def test_alsa_sink_plays_24_bit(monkeypatch):
+	alsa = FakeAlsa()
+	monkeypatch.setitem(sys.modules, "alsaaudio", alsa)
+	vaudio.AlsaSink().Start(vaudio.WavFormat(1, 48000, 24))
+	assert alsa.opened[0]["format"] == "S24_3LE"
+
+def test_alsa_sink_rejects_unknown_depth(monkeypatch):
+	monkeypatch.setitem(sys.modules, "alsaaudio", FakeAlsa())
+	with pytest.raises(ValueError, match="20 bit"):
+		vaudio.AlsaSink().Start(vaudio.WavFormat(1, 48000, 20))
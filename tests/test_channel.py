@@ -0,0 +1,34 @@
+# test_channel.py
+# Python3
+# Tests of validate_channel.py
+# 18 Oct 2026
+
+import numpy as np
+import validate_audio as vaudio
+import validate_channel as vchannel
+import validate_synth as vsynth
+
+def ReadSamples(path):
+	wav = vaudio.WavFile(path)
+	try:
+		return np.concatenate(list(vchannel.FrameChunks(wav)))[:, 0]
+	finally:
+		wav.Close()
+
+def test_noise_matches_requested_ebn0(tmp_path):
+	source = str(tmp_path / "AFSK_1200_AX25_50b_4x.wav")
+	vsynth.WriteWav(source, vsynth.RenderTrack("AFSK_1200_AX25", 50, 4))
+	clean = ReadSamples(source)
+	for ebn0 in (4.0, 10.0):
+		output = str(tmp_path / f"e{ebn0:g}.wav")
+		vchannel.Render(source, output, vchannel.Impairment(ebn0, seed=1), 1200)
+		impaired = ReadSamples(output)
+		assert np.mean(np.abs(impaired) >= 32767) < 1e-4
+		# The track may have been turned down for headroom; the noise is what is left of the scaled track.
+		gain = np.dot(impaired, clean) / np.dot(clean, clean)
+		noise = impaired - gain * clean
+		wav = vaudio.WavFile(source)
+		signal_power, peak = vchannel.MeasureSignal(wav)
+		wav.Close()
+		measured = 10 * np.log10((gain ** 2 * signal_power / 1200) / (2 * np.var(noise) / vsynth.SAMPLE_RATE))
+		assert abs(measured - ebn0) < 0.2
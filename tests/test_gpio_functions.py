@@ -0,0 +1,33 @@
+# test_gpio_functions.py
+# Python3
+# Tests of validate_gpio_functions.py
+# 18 Oct 2026
+
+import sys
+import pytest
+import validate_gpio_functions as vgpio
+
+class BrokenRPiFinder:
+	# Makes "import RPi.GPIO" fail the way it does on a Pi 5.
+	def find_spec(self, name, path=None, target=None):
+		if name == "RPi" or name.startswith("RPi."):
+			raise RuntimeError("This module can only be run on a Raspberry Pi!")
+		return None
+
+def test_auto_falls_back_to_gpiod_when_rpi_gpio_raises(monkeypatch):
+	for name in ("RPi", "RPi.GPIO"):
+		monkeypatch.delitem(sys.modules, name, raising=False)
+	monkeypatch.setattr(sys, "meta_path", [BrokenRPiFinder()] + sys.meta_path)
+	monkeypatch.setattr(vgpio, "GpiodBackend", lambda: "gpiod backend")
+	assert vgpio.MakeBackend("auto") == "gpiod backend"
+
+def test_auto_reports_both_errors(monkeypatch):
+	for name in ("RPi", "RPi.GPIO"):
+		monkeypatch.delitem(sys.modules, name, raising=False)
+	monkeypatch.setattr(sys, "meta_path", [BrokenRPiFinder()] + sys.meta_path)
+	def NoGpiod():
+		raise ImportError("No module named 'gpiod'")
+	monkeypatch.setattr(vgpio, "GpiodBackend", NoGpiod)
+	with pytest.raises(ImportError) as error:
+		vgpio.MakeBackend("auto")
+	assert "Raspberry Pi" in str(error.value) and "gpiod" in str(error.value)
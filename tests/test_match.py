@@ -0,0 +1,33 @@
+# test_match.py
+# Python3
+# Tests of validate_match.py
+# 18 Oct 2026
+
+import validate_packet_functions as vpacket
+import validate_serial_functions as vserial
+import validate_match as vmatch
+
+def test_frame_keys_agree_either_side_of_batch_cutoff():
+	frames = vpacket.UIPacketFactory("TEST-1", "CQ-0", length=40, seed=5).generate_many(vpacket.BATCH_CRC_MIN_FRAMES)
+	batch_keys = vmatch.FrameKeys(frames)
+	assert [vmatch.FrameKeys([frame])[0] for frame in frames[:20]] == batch_keys[:20]
+
+def test_match_frames_small_lists():
+	frames = vpacket.UIPacketFactory("TEST-1", "CQ-0", length=40, seed=5).generate_many(4)
+	loss_map = vmatch.MatchFrames(frames[:3], frames[1:])
+	assert (loss_map.missed, loss_map.extra) == ([4], [1])
+
+def test_positions_follow_the_track_when_timed():
+	# Ten packets 0.5 s apart; neither device hears packet 3, TEST misses packet 6.
+	packets = vpacket.UIPacketFactory("TEST-1", "CQ-0", length=40, seed=5).generate_many(10)
+	start_ns = 1000000000
+	def Heard(numbers):
+		return [vserial.KISSFrame(packets[number - 1], start_ns + int((number * 0.5 + 0.02) * 1e9)) for number in numbers]
+	standard = Heard([1, 2, 4, 5, 6, 7, 8, 9, 10])
+	test = Heard([1, 2, 4, 5, 7, 8, 9, 10])
+	loss_map = vmatch.MatchFrames(test, standard, start_ns, 0.5, 10)
+	assert loss_map.timed
+	assert loss_map.missed == [6]
+	assert loss_map.Map() == "..-..M...."
+	# Without timing the same loss is numbered in decode order.
+	assert vmatch.MatchFrames(test, standard).missed == [5]
@@ -0,0 +1,28 @@
+# test_packet_functions.py
+# Python3
+# Tests of validate_packet_functions.py
+# 18 Oct 2026
+
+import random
+import collections
+import crc
+import validate_packet_functions as vpacket
+
+def test_parse_frames_crc_matches_either_side_of_batch_cutoff():
+	factory = vpacket.UIPacketFactory("TEST-1", "CQ-0", length=40, seed=3)
+	for count in (3, vpacket.BATCH_CRC_MIN_FRAMES):
+		packets = factory.generate_many(count)
+		summary = vpacket.ParseFrames(packets)
+		assert summary['Count'] == count
+		assert summary['CRC'] == [crc.CalcCRC16(packet) for packet in packets]
+		assert summary['SOURCE'][0] == "TEST-1"
+
+def test_random_printable_bytes_are_uniform():
+	data = vpacket.RandomPrintableBytes(95 * 2000, random.Random(7))
+	assert len(data) == 95 * 2000
+	counts = collections.Counter(data)
+	assert set(counts) == set(range(32, 127))
+	# Before the fix 32..97 came up about twice as often as 98..126.
+	low = sum(counts[byte] for byte in range(32, 98)) / 66
+	high = sum(counts[byte] for byte in range(98, 127)) / 29
+	assert abs(low / high - 1) < 0.05
@@ -0,0 +1,21 @@
+# test_shard.py
+# Python3
+# Tests of validate_shard.py
+# 18 Oct 2026
+
+import validate_modes as vmodes
+import validate_tests as vtests
+import validate_shard as vshard
+
+def test_every_beacon_shard_disables_beacons():
+	schedule = vtests.Schedule(vtests.BuildRegistry(vmodes.MODE_TABLE))
+	for shard_count in range(1, 9):
+		shards = vshard.ShardSchedule(schedule, shard_count)
+		for shard_schedule, load in shards:
+			phases = [case.phase.name for test_mode, standard_mode, group in shard_schedule for case in group]
+			if "beacon" in phases:
+				assert "beacon_disable" in phases
+				# Beacon disable runs after the shard's last beacon case.
+				assert phases.index("beacon_disable") > len(phases) - 1 - phases[::-1].index("beacon")
+		cases = [case.name for shard_schedule, load in shards for test_mode, standard_mode, group in shard_schedule for case in group]
+		assert set(cases) == set(case.name for test_mode, standard_mode, group in schedule for case in group)
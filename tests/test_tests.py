@@ -0,0 +1,23 @@
+# test_tests.py
+# Python3
+# Tests of validate_tests.py
+# 18 Oct 2026
+
+import queue
+import pytest
+import validate_sequential as vseq
+import validate_tests as vtests
+
+class MissingTrackRig:
+	# A rig whose playback fails, like a track missing from the corpus.
+	def __init__(self):
+		self.test_serial_queue = queue.Queue()
+		self.standard_serial_queue = queue.Queue()
+
+	def PlayTrack(self, track, stop=None):
+		raise FileNotFoundError(track)
+
+def test_play_while_counting_raises_the_playback_error():
+	comparison = vseq.SequentialComparison(10)
+	with pytest.raises(FileNotFoundError):
+		vtests.PlayWhileCounting(MissingTrackRig(), "missing.wav", comparison, [], [])
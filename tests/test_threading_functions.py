@@ -0,0 +1,48 @@
+# test_threading_functions.py
+# Python3
+# Tests of validate_threading_functions.py
+# 18 Oct 2026
+
+import time
+import queue
+import threading
+import validate_threading_functions as vthread
+
+def PutLater(q, frame, delay):
+	timer = threading.Timer(delay, q.put, (frame,))
+	timer.start()
+	return timer
+
+def test_quiet_time_waits_for_first_frame():
+	q = queue.Queue()
+	PutLater(q, b'late', 0.4)
+	start_time = time.monotonic()
+	frames = vthread.WaitForFrames(q, quiet_time=0.25, timeout=2)
+	assert frames == [b'late']
+	# Returned a quiet_time after the frame, not at the timeout.
+	assert time.monotonic() - start_time < 1.5
+
+def test_quiet_time_after_frames():
+	q = queue.Queue()
+	q.put(b'first')
+	PutLater(q, b'second', 0.1)
+	PutLater(q, b'too late', 0.8)
+	frames = vthread.WaitForFrames(q, quiet_time=0.25, timeout=2)
+	assert frames == [b'first', b'second']
+
+def test_settle_time_zero_stops_when_nothing_comes():
+	q = queue.Queue()
+	start_time = time.monotonic()
+	assert vthread.WaitForFrames(q, quiet_time=0.1, timeout=2, settle_time=0) == []
+	assert time.monotonic() - start_time < 0.5
+
+def test_each_queue_gets_the_same_window():
+	test_queue = queue.Queue()
+	standard_queue = queue.Queue()
+	PutLater(test_queue, b'test', 0.3)
+	PutLater(standard_queue, b'standard late', 0.9)
+	start_time = time.monotonic()
+	test_frames, standard_frames = vthread.WaitForFramesEach((test_queue, standard_queue), quiet_time=0.1, timeout=0.6)
+	# The STANDARD frame after the shared window is not counted.
+	assert (test_frames, standard_frames) == ([b'test'], [])
+	assert time.monotonic() - start_time < 0.85
@@ -0,0 +1,29 @@
+# test_threshold.py
+# Python3
+# Tests of validate_threshold.py
+# 18 Oct 2026
+
+import random
+import validate_threshold as vthreshold
+
+def Player(test_threshold, standard_threshold, sent=20):
+	rng = random.Random(1)
+	def Play(level, playback):
+		decodes = []
+		for threshold in (test_threshold, standard_threshold):
+			p = vthreshold.Logistic(2 * (level - threshold))
+			decodes.append(sum(rng.random() < p for packet in range(sent)))
+		return decodes[0], decodes[1], sent
+	return Play
+
+def test_search_finds_thresholds_in_range():
+	search = vthreshold.ThresholdSearch(Player(6.0, 7.0), vthreshold.EbN0Stimulus.low, vthreshold.EbN0Stimulus.high, 0.5, 1.0)
+	test_fit, standard_fit = search.Run()
+	assert abs(test_fit.threshold - 6.0) < 0.5
+	assert abs(standard_fit.threshold - 7.0) < 0.5
+
+def test_threshold_outside_range_is_not_found():
+	search = vthreshold.ThresholdSearch(Player(6.0, 25.0), 0.0, 16.0, 0.5, 1.0)
+	test_fit, standard_fit = search.Run()
+	assert test_fit is not None
+	assert standard_fit is None
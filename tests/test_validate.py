@@ -0,0 +1,34 @@
+# test_validate.py
+# Python3
+# Tests of validate.py
+# 18 Oct 2026
+
+import pytest
+import validate
+import validate_tests as vtests
+
+class FailingRig:
+	# Stands in for a rig whose first case raises, like a failing audio sink.
+	def __init__(self):
+		self.closed = False
+		self.loss_maps = {}
+
+	def Open(self):
+		pass
+
+	def Close(self):
+		self.closed = True
+
+def test_run_tests_closes_rig_and_results_on_error(tmp_path, monkeypatch):
+	def Fail(rig, schedule, recorder=None):
+		raise OSError("audio sink failed")
+	monkeypatch.setattr(vtests, "RunSchedule", Fail)
+	closed = []
+	import validate_results as vresults
+	monkeypatch.setattr(vresults.ResultsStore, "Close", lambda store: closed.append(store))
+	rig = FailingRig()
+	args = validate.MakeParser().parse_args(["--results", str(tmp_path / "results.db")])
+	with pytest.raises(OSError):
+		validate.RunTests(args, rig, [])
+	assert rig.closed
+	assert len(closed) == 1
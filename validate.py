@@ -5,20 +5,38 @@
 # 19 Jan 2024
 # Exit codes
 # 1 Wrong python version
-# 2 Not enough command line arguments
+# 2 Bad command line arguments
 # 3 Unable to open test serial port
 # 4 Unable to open standard serial port
+# 5 Missing or unusable test tracks
+#
+# Usage: python3 validate.py [--modes MODES] [--phases PHASES] [--simulate SCALE] [--audio-sink SINK] [--synthesize] [--awgn-ebn0 DB]
+#                    [--threshold-search STIMULUS] [--list] [--dry-run]
+# MODES is a comma separated list of mode numbers, names or name fragments,
+# e.g. "PSK" or "0,AFSK_1200_AX25". PHASES is a comma separated list of
+# phase names, e.g. "burst,awgn". Both default to everything. --simulate
+# runs against emulated TNCs instead of hardware, SCALE times faster than
+# real time. SINK is alsa, aplay, null or a .wav file to record the played
+# audio to. --synthesize plays burst tracks generated by validate_synth.py
+# for the AX.25 AFSK and GFSK modes instead of the corpus tracks. --awgn-ebn0
+# replaces each AWGN track with the mode's burst track plus noise at DB Eb/N0.
+# --threshold-search finds each device's 50% decode point per mode instead of
+# running the tests, stepping STIMULUS: ebn0 (noise added to the burst track)
+# or volume (the mixer level). --list and --dry-run print the planned cases
+# and their estimated duration without touching the rig.
+#
+# Installed with pip, the same command is available as n9600a-validate.
+# Importing this module has no side effects; main() runs the harness.
 
+# Only the modules needed to plan a run are imported here. The rig, GPIO,
+# serial, NumPy and database modules are imported when a run needs them, so
+# --list and --dry-run return at once, even on a Pi.
 import sys
 import time
-import subprocess
-import threading
-import queue
-import validate_gpio_functions as vgpio
-import validate_threading_functions as vthread
-import validate_serial_functions as vserial
-import validate_packet_functions as vpacket
-import crc
+import argparse
+import validate_modes as vmodes
+import validate_tests as vtests
+import validate_manifest as vmanifest
 
 test_serial_port = "/dev/ttyACM0"
 test_serial_port_baud = "57600"
@@ -29,398 +47,211 @@ path_to_test_audio = "/home/pi/github/modem-test-audio/"
 test_callsign = "0TEST0-5"
 standard_callsign = "STNDRD-7"
 reset_time = 2.0
-pass_text = "......................................................................PASS"
-fail_text = "......................................................................FAIL"
-
-mode_list = ["GFSK_9600_AX25",
-			"GFSK_9600_IL2P",
-			"GFSK_9600_IL2Pc",
-			"GFSK_4800_IL2P",
-			"GFSK_4800_IL2Pc",
-			"DAPSK_2400_IL2P",
-			"AFSK_1200_AX25",
-			"AFSK_1200_IL2P",
-			"BPSK_300_IL2Pc",
-			"QPSK_600_IL2Pc",
-			"BPSK_1200_IL2Pc",
-			"QPSK_2400_IL2Pc",
-			"AFSK_300_AX25",
-			"AFSK_300_IL2P",
-			"AFSK_300_IL2Pc",
-			"BPSK_1200_IL2P" ]
-
-mode_bit_rate_list = [ 9600,
-					9600,
-					9600,
-					4800,
-					4800,
-					2400,
-					1200,
-					1200,
-					300,
-					600,
-					1200,
-					2400,
-					300,
-					300,
-					300,
-					1200 ]
-
-awgn_track_list = ["4_multiple_awgn/GFSK_9600_AX25_50b_50m_a1.wav",
-			"4_multiple_awgn/GFSK_9600_IL2Pc_50b_50m_a1.wav",
-			"4_multiple_awgn/GFSK_9600_IL2Pc_50b_50m_a1.wav",
-			"4_multiple_awgn/GFSK_4800_IL2Pc_50b_50m_a2.wav",
-			"4_multiple_awgn/GFSK_4800_IL2Pc_50b_50m_a2.wav",
-			"4_multiple_awgn/DAPSK_2400_IL2P_50b_50m_a2.wav",
-			"4_multiple_awgn/AFSK_1200_AX25_50b_50m_a3.wav",
-			"4_multiple_awgn/AFSK_1200_IL2P_50b_50m_a3.wav",
-			"4_multiple_awgn/BPSK_300_IL2Pc_50b_50m_a4.wav",
-			"4_multiple_awgn/QPSK_600_IL2Pc_50b_50m_a4.wav",
-			"4_multiple_awgn/BPSK_1200_IL2Pc_50b_50m_a3.wav",
-			"4_multiple_awgn/QPSK_2400_IL2Pc_50b_50m_a5.wav",
-			"4_multiple_awgn/AFSK_300_AX25_50b_50m_a4.wav",
-			"4_multiple_awgn/AFSK_300_IL2P_50b_50m_a4.wav",
-			"4_multiple_awgn/AFSK_300_IL2Pc_50b_50m_a4.wav",
-			"4_multiple_awgn/BPSK_1200_IL2P_50b_50m_a3.wav" ]
-
-burst_track_list = ["2_burst/GFSK_9600_AX25_255b_10x.wav",
-			"2_burst/GFSK_9600_IL2P_255b_10x.wav",
-			"2_burst/GFSK_9600_IL2Pc_255b_10x.wav",
-			"2_burst/GFSK_4800_IL2P_255b_10x.wav",
-			"2_burst/GFSK_4800_IL2Pc_255b_10x.wav",
-			"2_burst/DAPSK_2400_IL2P_50b_10x.wav",
-			"2_burst/AFSK_1200_AX25_50b_10x.wav",
-			"2_burst/AFSK_1200_IL2P_50b_10x.wav",
-			"2_burst/BPSK_300_IL2Pc_50b_10x.wav",
-			"2_burst/QPSK_600_IL2Pc_50b_10x.wav",
-			"2_burst/BPSK_1200_IL2Pc_50b_10x.wav",
-			"2_burst/QPSK_2400_IL2Pc_50b_10x.wav",
-			"2_burst/AFSK_300_AX25_50b_10x.wav",
-			"2_burst/AFSK_300_IL2P_50b_10x.wav",
-			"2_burst/AFSK_300_IL2Pc_50b_10x.wav",
-			"2_burst/BPSK_1200_IL2P_50b_10x.wav" ]
-
-beacon_mode_list = [ 6, # 0000 GFSK 9600 AX.25
-					6, #  0001 GFSK 9600 IL2P
-					6, #  0010 GFSK 9600 IL2Pc
-					6, #  0011 GFSK 4800 IL2P
-					6, #  0100 GFSK 4800 IL2Pc
-					6, #  0101 DAPSK 2400 IL2P
-					-1, # 0110 AFSK 1200 AX.25
-					6, #  0111 AFSK 1200 IL2P
-					12, # 1000 BPSK 300 IL2Pc
-					12, # 1001 QPSK 600 IL2Pc
-					12, # 1010 BPSK 1200 IL2Pc
-					12, # 1011 QPSK 2400 IL2Pc
-					-1, # 1100 AFSK 300 AX.25
-					-1, # 1101 AFSK 300 IL2P
-					-1, # 1110 AFSK 300 IL2Pc
-					12 ] # 1111 BPSK 1200 IL2P
+# Measured reset times per mode, used to learn tighter reset timeouts.
+reset_history_file = "reset_times.json"
+reset_holdoff = 0.25
+# Longest waits for expected frames; phases move on as soon as they arrive.
+frame_timeout = 2.0
+beacon_interval = 60.0
+# Time without new frames after which a track's decodes are considered complete.
+quiet_time = 0.25
+# Where test tracks are played: auto (ALSA through pyalsaaudio, else aplay), alsa, aplay, null or FILE.wav
+audio_sink = "auto"
+# Burst and AWGN tracks stop as soon as their verdict is settled. The error
+# bounds are the chances of an early FAIL for a TEST device that meets the 7%
+# criterion by 5% of decodes, and of an early PASS for one that misses it by 5%.
+early_stop = True
+sequential_alpha = 0.01
+sequential_beta = 0.01
+# Results of every run are stored here for validate_results.py; empty to disable.
+results_file = "results.db"
+# Index of the modem-test-audio corpus, refreshed for the tracks each run needs.
+manifest_file = "track_manifest.json"
+# Where --synthesize keeps the tracks it generates, keyed by their parameters.
+synth_cache_dir = "synth_cache"
+# Where --awgn-ebn0 keeps impaired tracks, least recently used deleted beyond the size limit.
+channel_cache_dir = "channel_cache"
+channel_cache_bytes = 4 * 1024 ** 3
 
 if sys.version_info < (3, 0):
 	print("Python version should be 3.x, exiting")
 	sys.exit(1)
 
-"""
-Initialize Raspberry Pi GPIO for manipulation of MODE switches on TEST device
-and STANDARD device.
-"""
-print(f"{time.asctime()} Initializing Raspberry Pi GPIO.")
-vgpio.SetupGPIO()
-time.sleep(reset_time)
-
-"""
-Open serial port for TEST device and STANDARD device.
-Use threading to read serial data and parse KISS frames outside main thread.
-"""
-print(f"{time.asctime()} Opening TEST and STANDARD device serial ports, starting KISS reader threads.")
-test_serial_port_obj = vserial.OpenPort(test_serial_port, test_serial_port_baud, 3)
-standard_serial_port_obj = vserial.OpenPort(standard_serial_port, standard_serial_port_baud, 4)
-test_serial_queue = queue.Queue()
-test_serial_thread = threading.Thread(target=vserial.ParseKISSFromPort, args=([test_serial_port_obj, test_serial_queue]))
-test_serial_thread.start()
-standard_serial_queue = queue.Queue()
-standard_serial_thread = threading.Thread(target=vserial.ParseKISSFromPort, args=([standard_serial_port_obj, standard_serial_queue]))
-standard_serial_thread.start()
-
+def MakeParser():
+	parser = argparse.ArgumentParser(prog="n9600a-validate", description="Validate N9600A firmware.")
+	parser.add_argument("--modes", default="", help="comma separated mode numbers, names or name fragments (default all)")
+	parser.add_argument("--phases", default="", help="comma separated phases: " + ",".join(phase.name for phase in vtests.PHASES) + " (default all)")
+	parser.add_argument("--simulate", type=float, default=None, metavar="SCALE", help="run against simulated TNCs, SCALE times faster than real time")
+	parser.add_argument("--gpio", default="auto", choices=["auto", "rpi", "gpiod", "mock"], help="GPIO backend (default auto: RPi.GPIO, then gpiod)")
+	parser.add_argument("--audio-sink", default=audio_sink, metavar="SINK", help="auto, alsa, aplay, null or a .wav file (default auto)")
+	parser.add_argument("--no-early-stop", action="store_true", help="always play burst and AWGN tracks to the end")
+	parser.add_argument("--firmware", default="unknown", metavar="LABEL", help="firmware build under test, as recorded in the results database")
+	parser.add_argument("--note", default="", help="free text recorded with the run")
+	parser.add_argument("--results", default=results_file, metavar="FILE", help=f"SQLite results database (default {results_file}, empty to disable)")
+	parser.add_argument("--synthesize", action="store_true", help="play synthesized burst tracks for the AX.25 modes that validate_synth.py supports")
+	parser.add_argument("--awgn-ebn0", type=float, default=None, metavar="DB", help="AWGN phase plays burst tracks with noise added at DB Eb/N0")
+	parser.add_argument("--threshold-search", default=None, choices=["ebn0", "volume"], metavar="STIMULUS", help="find each device's 50%% decode point per mode, stepping ebn0 or volume")
+	parser.add_argument("--capture", default=None, metavar="FILE", help="record all serial traffic to FILE for validate_capture.py")
+	parser.add_argument("--list", action="store_true", help="list the test cases that would run and their estimated duration, then exit")
+	parser.add_argument("--dry-run", action="store_true", help="print the mode change schedule and estimated duration, then exit")
+	return parser
 
-"""
-Generate a UI frame to assign callsign to TEST device.
-"""
-print(f"{time.asctime()} Sending a UI Packet from {test_callsign} to {standard_callsign} to set TEST device callsign.")
-# Set the mode switches
-mode = 1
-vgpio.SetTestDeviceMode(mode)
-vgpio.SetStandardDeviceMode(mode)
-# Wait for device reset
-time.sleep(reset_time)
-# Clear serial queues
-vthread.ClearQueue(standard_serial_queue)
-vthread.ClearQueue(test_serial_queue)
-packet = vpacket.GenerateUIPacket(test_callsign, standard_callsign, "nothing to see here ", 50)
-tx_metadata = vpacket.GetFrameMeta(packet)
-print(f"{time.asctime()} Packet CRC is {vpacket.GetCRC(packet)}.")
-#print(f"{time.asctime()} Packet payload: {str(tx_metadata['Payload'])}")
-test_serial_port_obj.write(vpacket.EncodeKISSFrame(0,packet))
-time.sleep(1)
-count = 0
-start_time = time.time()
-while not standard_serial_queue.empty():
-	packet = standard_serial_queue.get()
-	count += 1
-	tx_metadata = vpacket.GetFrameMeta(packet)
-	print(f'{time.asctime()} STANDARD device heard packet from {tx_metadata["SOURCE"]} to {tx_metadata["DEST"]} CRC {tx_metadata["CRC"]}.')
-	#print(f"{time.asctime()} Packet payload: {str(tx_metadata['Payload'])}")
+def SelectModes(args, mode_table):
+	# The modes of mode_table selected by --modes, or None for all.
+	if not args.modes:
+		return None
+	return mode_table.Select(args.modes.split(","))
 
-"""
-Check the TEST_TX button transmits a packet with the correct callsign.
-"""
-print(f"{time.asctime()} Testing OWN DEVICE CALLSIGN ADOPTION.")
-# Set the mode switches
-mode = 1
-vgpio.SetTestDeviceMode(mode)
-vgpio.SetStandardDeviceMode(mode)
-# Wait for device reset
-time.sleep(reset_time)
-# Clear serial queues
-vthread.ClearQueue(standard_serial_queue)
-vthread.ClearQueue(test_serial_queue)
-vgpio.AssertTestTXButton()
-time.sleep(.1)
-vgpio.ReleaseTestTXButton()
-time.sleep(1)
-count = 0
-while not standard_serial_queue.empty():
-	packet = standard_serial_queue.get()
-	count += 1
-	rx_metadata = vpacket.GetFrameMeta(packet)
-	print(f'{time.asctime()} STANDARD device heard packet from {rx_metadata["SOURCE"]} to {rx_metadata["DEST"]} CRC {rx_metadata["CRC"]}.')
-	#print(f"{time.asctime()} Packet payload: {str(rx_metadata['Payload'])}")
-try:
-	if rx_metadata['SOURCE'][:-2] == tx_metadata['SOURCE'][:-2]:
-		print(f"{time.asctime()}{pass_text}")
-	else:
-		print(f"{time.asctime()}{fail_text}")
-except:
-		print(f"{time.asctime()}{fail_text}")
+def SelectPhases(args):
+	if not args.phases:
+		return None
+	return [name.strip() for name in args.phases.split(",") if name.strip()]
 
-"""
-Check that the TEST_TX button sends a packet to the host over USB, and loopback works in each mode.
-"""
-print(f"{time.asctime()} Testing USB TEST PACKET and LOOPBACK TEST in each mode.")
-for mode in range(16):
-	print(mode_list[mode])
-	# Set the mode switches
-	vgpio.SetTestDeviceMode(mode)
-	vgpio.SetStandardDeviceMode(mode)
-	# Wait for device reset
-	time.sleep(reset_time)
-	# Clear serial queues
-	vthread.ClearQueue(standard_serial_queue)
-	vthread.ClearQueue(test_serial_queue)
-	repeat_count = 3
-	for repeat in range(repeat_count):
-		vgpio.AssertTestTXButton()
-		time.sleep(1)
-		vgpio.ReleaseTestTXButton()
-		time.sleep(1 + (100 * 8 / mode_bit_rate_list[mode]))
-	count = 0
-	while not test_serial_queue.empty():
-		packet = test_serial_queue.get()
-		count += 1
-		rx_metadata = vpacket.GetFrameMeta(packet)
-		print(f'{time.asctime()} TEST device heard packet from {rx_metadata["SOURCE"]} to {rx_metadata["DEST"]} CRC {rx_metadata["CRC"]}.')
-		#print(f"{time.asctime()} Packet payload: {str(rx_metadata['Payload'])}")
-	if count > repeat_count:
-		print(f"{time.asctime()}{pass_text}")
-	else:
-		print(f"{time.asctime()}{fail_text}")
+def PrintPlan(schedule, grouped):
+	"""
+	Prints the cases of schedule with their estimated durations, under each
+	mode change if grouped, and the estimated total.
+	"""
+	if vmanifest.manifest is None:
+		# Exact track durations if the corpus has been indexed; nothing is read or hashed.
+		vmanifest.UseManifest(vmanifest.Manifest.Load(manifest_file, path_to_test_audio))
+	case_count = 0
+	for test_mode, standard_mode, group in schedule:
+		if grouped:
+			print(f"TEST mode {test_mode} {vmodes.MODE_TABLE[test_mode].name}, STANDARD mode {standard_mode} {vmodes.MODE_TABLE[standard_mode].name}, reset {reset_time:.1f} s")
+		for case in group:
+			case_count += 1
+			print(f"{'  ' if grouped else ''}{case.name:<40}{case.Estimate(beacon_interval):>9.1f} s")
+	total = vtests.EstimateSchedule(schedule, reset_time, beacon_interval)
+	print(f"{case_count} test cases, {vtests.CountModeChanges(schedule)} mode changes, estimated {total / 60:.1f} minutes.")
 
+def CheckTracks(cases):
+	# Check every track the run needs now, rather than when aplay fails partway through.
+	manifest = vmanifest.Manifest.Load(manifest_file, path_to_test_audio)
+	problems = manifest.Check(vmanifest.RequiredTracks(cases))
+	manifest.Save(manifest_file)
+	for track, problem in problems:
+		print(f"{time.asctime()} {path_to_test_audio}{track}: {problem}")
+	if not problems:
+		vmanifest.UseManifest(manifest)
+	return not problems
 
-"""
-Check BURST track performance.
-"""
-print(f"{time.asctime()} Testing BURST TRACK PERFORMANCE.")
-vthread.ClearQueue(standard_serial_queue)
-vthread.ClearQueue(test_serial_queue)
-subprocess.run(["amixer", "sset", "'Master'", f"{soundcard_volume}"], stdout=subprocess.DEVNULL)
-for mode in range(16):
-	print(f"Playing {burst_track_list[mode]} for mode {mode_list[mode]}.")
-	# Set the mode switches
-	vgpio.SetTestDeviceMode(mode)
-	vgpio.SetStandardDeviceMode(mode)
-	# Wait for device reset
-	time.sleep(reset_time)
-	# Empty the serial queues
-	while not test_serial_queue.empty():
-		packet = test_serial_queue.get()
-	while not standard_serial_queue.empty():
-		packet = standard_serial_queue.get()
-	# Play the appropriate track:
-	subprocess.run(["aplay", "-q", path_to_test_audio + burst_track_list[mode]], stdout=subprocess.DEVNULL)
-	time.sleep(1)
-	# Count the received packets from each device:
-	test_count = 0
-	standard_count = 0
-	while not test_serial_queue.empty():
-		packet = test_serial_queue.get()
-		test_count += 1
-	print(f"Test device heard {test_count} packets.")
-	while not standard_serial_queue.empty():
-		packet = standard_serial_queue.get()
-		standard_count += 1
-	print(f"Standard device heard {standard_count} packets.")
-	if test_count > (standard_count - ((test_count + standard_count) * 0.07)):
-		print(f"{time.asctime()}{pass_text}")
-	else:
-		print(f"{time.asctime()}{fail_text}")
+def MakeRig(args):
+	rig_settings = dict(test_serial_port=test_serial_port, test_serial_port_baud=test_serial_port_baud,
+		standard_serial_port=standard_serial_port, standard_serial_port_baud=standard_serial_port_baud,
+		soundcard_volume=soundcard_volume, path_to_test_audio=path_to_test_audio,
+		test_callsign=test_callsign, standard_callsign=standard_callsign, reset_time=reset_time,
+		reset_history_file=reset_history_file, reset_holdoff=reset_holdoff, frame_timeout=frame_timeout,
+		beacon_interval=beacon_interval, quiet_time=quiet_time, audio_sink=args.audio_sink,
+		early_stop=early_stop and not args.no_early_stop, sequential_alpha=sequential_alpha, sequential_beta=sequential_beta,
+		capture_file=args.capture)
+	if args.simulate:
+		import validate_simulator as vsim
+		rig_settings["reset_history_file"] = None
+		return vsim.SimulatedRig(time_scale=args.simulate, **rig_settings)
+	import validate_rig as vrig
+	import validate_gpio_functions as vgpio
+	if args.gpio != "auto":
+		vgpio.UseBackend(vgpio.MakeBackend(args.gpio))
+	return vrig.Rig(**rig_settings)
 
-"""
-Check AWGN track performance.
-"""
-print(f"{time.asctime()} Testing AWGN TRACK PERFORMANCE.")
-vthread.ClearQueue(standard_serial_queue)
-vthread.ClearQueue(test_serial_queue)
-subprocess.run(["amixer", "sset", "'Master'", f"{soundcard_volume}"], stdout=subprocess.DEVNULL)
-for mode in range(16):
-	print(f"Playing {awgn_track_list[mode]} for mode {mode_list[mode]}.")
-	# Set the mode switches
-	vgpio.SetTestDeviceMode(mode)
-	vgpio.SetStandardDeviceMode(mode)
-	# Wait for device reset
-	time.sleep(reset_time)
-	# Empty the serial queues
-	while not test_serial_queue.empty():
-		packet = test_serial_queue.get()
-	while not standard_serial_queue.empty():
-		packet = standard_serial_queue.get()
-	# Play the appropriate track:
-	subprocess.run(["aplay", "-q", path_to_test_audio + awgn_track_list[mode]], stdout=subprocess.DEVNULL)
-	time.sleep(1)
-	# Count the received packets from each device:
-	test_count = 0
-	standard_count = 0
-	while not test_serial_queue.empty():
-		packet = test_serial_queue.get()
-		test_count += 1
-	print(f"Test device heard {test_count} packets.")
-	while not standard_serial_queue.empty():
-		packet = standard_serial_queue.get()
-		standard_count += 1
-	print(f"Standard device heard {standard_count} packets.")
-	if test_count > (standard_count - ((test_count + standard_count) * 0.07)):
-		print(f"{time.asctime()}{pass_text}")
+def SearchThresholds(args, rig, modes):
+	import validate_threshold as vthreshold
+	if args.threshold_search == "ebn0":
+		import validate_channel as vchannel
+		stimulus = vthreshold.EbN0Stimulus(rig, vchannel.VariantCache(channel_cache_dir, channel_cache_bytes), path_to_test_audio)
 	else:
-		print(f"{time.asctime()}{fail_text}")
-
-
-
-"""
-Check BEACON PACKET function.
-"""
-print(f"{time.asctime()} Testing BEACON FUNCTION in all applicable modes.")
-vthread.ClearQueue(standard_serial_queue)
-vthread.ClearQueue(test_serial_queue)
-for mode in range(16):
-	if beacon_mode_list[mode] > 0:
-		print(f"{time.asctime()} Mode {mode_list[mode]}.")
-		vgpio.SetTestDeviceMode(mode)
-		vgpio.SetStandardDeviceMode(beacon_mode_list[mode])
-		time.sleep(reset_time)
-		test_serial_port_obj.write(vpacket.EncodeKISSFrame(0x09, [0xF0, 0x01])) # Set beacon interval to 1 minute
-		packet = vpacket.GenerateUIPacket(test_callsign, standard_callsign, "nothing to see here ", 0)
-		#tx_metadata = vpacket.GetFrameMeta(packet)
-		#print(f"{time.asctime()} Packet CRC is {vpacket.GetCRC(packet)}.")
-		#print(f"{time.asctime()} Packet payload: {str(tx_metadata['Payload'])}")
-		test_serial_port_obj.write(vpacket.EncodeKISSFrame(0,packet))
-		time.sleep(60)
-		test_serial_port_obj.write(vpacket.EncodeKISSFrame(0,packet))
-		time.sleep(60)
-		count = 0
-		while not standard_serial_queue.empty():
-			packet = standard_serial_queue.get()
-			rx_metadata = vpacket.GetFrameMeta(packet)
-			print(f'{time.asctime()} STANDARD device heard packet from {rx_metadata["SOURCE"]} to {rx_metadata["DEST"]} CRC {rx_metadata["CRC"]}.')
-			print(f"{time.asctime()} Packet payload: {str(rx_metadata['Payload'])}")
-			count += 1
-		print(f"Standard device heard {count} packets.")
-		if count > 0:
-			print(f"{time.asctime()}{pass_text}")
-		else:
-			print(f"{time.asctime()}{fail_text}")
-
-"""
-Check BEACON PACKET DISABLE function.
-"""
-print(f"{time.asctime()} Testing BEACON DISABLE FUNCTION.")
-vthread.ClearQueue(standard_serial_queue)
-vthread.ClearQueue(test_serial_queue)
-mode = 1
-print(f"{time.asctime()} Mode {mode_list[mode]}.")
-vgpio.SetTestDeviceMode(mode)
-vgpio.SetStandardDeviceMode(beacon_mode_list[mode])
-time.sleep(reset_time)
-test_serial_port_obj.write(vpacket.EncodeKISSFrame(0x09, [0xF0, 0x00])) # Set beacon interval to off
-packet = vpacket.GenerateUIPacket(test_callsign, standard_callsign, "nothing to see here ", 0)
-#tx_metadata = vpacket.GetFrameMeta(packet)
-#print(f"{time.asctime()} Packet CRC is {vpacket.GetCRC(packet)}.")
-#print(f"{time.asctime()} Packet payload: {str(tx_metadata['Payload'])}")
-test_serial_port_obj.write(vpacket.EncodeKISSFrame(0,packet))
-time.sleep(60)
-test_serial_port_obj.write(vpacket.EncodeKISSFrame(0,packet))
-time.sleep(60)
-count = 0
-while not standard_serial_queue.empty():
-	packet = standard_serial_queue.get()
-	rx_metadata = vpacket.GetFrameMeta(packet)
-	print(f'{time.asctime()} STANDARD device heard packet from {rx_metadata["SOURCE"]} to {rx_metadata["DEST"]} CRC {rx_metadata["CRC"]}.')
-	print(f"{time.asctime()} Packet payload: {str(rx_metadata['Payload'])}")
-	count += 1
-print(f"Standard device heard {count} packets.")
-if count > 0:
-	print(f"{time.asctime()}{fail_text}")
-else:
-	print(f"{time.asctime()}{pass_text}")
+		stimulus = vthreshold.VolumeStimulus(rig)
+	rig.Open()
+	try:
+		searches = vthreshold.RunThresholdSearch(rig, modes, stimulus)
+	except (OSError, ValueError) as error:
+		print(f"{time.asctime()} Threshold search failed: {error}")
+		return 5
+	finally:
+		rig.Close()
+	print(f"{time.asctime()} 50% decode {stimulus.name} per device, with 95% confidence intervals:")
+	for line in vthreshold.Report(searches, stimulus):
+		print(line)
+	return 0
 
-"""
-Check TARPNstat auto host meta-frame over USB
-"""
-print(f"{time.asctime()} Testing TARPNstat auto host meta-frame.")
-vthread.ClearQueue(standard_serial_queue)
-vthread.ClearQueue(test_serial_queue)
-mode = 1
-print(f"{time.asctime()} Mode {mode_list[mode]}.")
-vgpio.SetTestDeviceMode(mode)
-vgpio.SetStandardDeviceMode(beacon_mode_list[mode])
-time.sleep(reset_time)
-packet = vpacket.GenerateUIPacket(test_callsign, standard_callsign, " TARPNstat", 0)
-metadata = vpacket.GetFrameMeta(packet)
-print(f'{time.asctime()} TEST device sending {metadata["SOURCE"]} to {metadata["DEST"]} CRC {metadata["CRC"]}.')
-print(f"{time.asctime()} Packet payload: {str(metadata['Payload'])}")
-test_serial_port_obj.write(vpacket.EncodeKISSFrame(0,packet))
-time.sleep(1)
-count = 0
-while not test_serial_queue.empty():
-	packet = test_serial_queue.get()
-	metadata = vpacket.GetFrameMeta(packet)
-	print(f'{time.asctime()} TEST device heard packet from {metadata["SOURCE"]} to {metadata["DEST"]} CRC {metadata["CRC"]}.')
-	print(f"{time.asctime()} Packet payload: {str(metadata['Payload'])}")
-	count += 1
-print(f"TEST device heard {count} packets.")
-if count > 0:
-	print(f"{time.asctime()}{pass_text}")
-else:
-	print(f"{time.asctime()}{fail_text}")
+def RunTests(args, rig, schedule):
+	store = None
+	recorder = None
+	if args.results:
+		import validate_results as vresults
+		store = vresults.ResultsStore(args.results)
+		run_id = store.BeginRun(args.firmware, args.note)
+		print(f"{time.asctime()} Recording results as run {run_id} in {args.results}.")
+		def recorder(case, verdict, started, duration):
+			track = case.Track()
+			store.RecordCase(run_id, case, verdict, started, duration, rig.loss_maps.get(track) if track else None)
+	try:
+		rig.Open()
+		try:
+			results = vtests.RunSchedule(rig, schedule, recorder)
+		finally:
+			# Release the GPIO lines, serial ports and I/O thread however the run ends.
+			rig.Close()
+		if store is not None:
+			store.RecordLatency(run_id, rig.latency)
+	finally:
+		if store is not None:
+			store.Close()
 
+	failures = [case.name for case, verdict in results if verdict is False]
+	print(f"{time.asctime()} {len([verdict for case, verdict in results if verdict is not None])} tests run, {len(failures)} failed.")
+	for name in failures:
+		print(f"{time.asctime()} FAILED {name}")
+	if rig.latency.samples:
+		print(f"{time.asctime()} Latency from stimulus to KISS frame arrival, p50-air being p50 less theoretical airtime:")
+		for line in rig.latency.Report():
+			print(line)
+	if rig.playback_saved:
+		print(f"{time.asctime()} Early verdicts on {len(rig.playback_saved)} tracks saved {sum(rig.playback_saved.values()):.1f} s of playback.")
+	return 0
 
+def main(argv=None):
+	args = MakeParser().parse_args(argv)
+	planning = args.list or args.dry_run
+	try:
+		mode_table = vmodes.MODE_TABLE
+		if args.synthesize and not planning:
+			import validate_synth as vsynth
+			mode_table = vsynth.SynthesizeBurstTracks(mode_table, synth_cache_dir)
+		modes = SelectModes(args, mode_table)
+		phase_names = SelectPhases(args)
+		cases = vtests.BuildRegistry(mode_table, phase_names, modes)
+	except ValueError as error:
+		print(error)
+		return 2
 
+	if planning:
+		PrintPlan(vtests.Schedule(cases), args.dry_run)
+		return 0
 
+	if args.awgn_ebn0 is not None:
+		import validate_channel as vchannel
+		try:
+			mode_table = vchannel.ImpairAWGNTracks(mode_table, path_to_test_audio,
+				vchannel.VariantCache(channel_cache_dir, channel_cache_bytes), vchannel.Impairment(args.awgn_ebn0), modes)
+		except (OSError, ValueError) as error:
+			print(f"{time.asctime()} Unable to impair tracks: {error}")
+			return 5
+		if modes is not None:
+			modes = [mode_table[mode.pattern] for mode in modes]
+		cases = vtests.BuildRegistry(mode_table, phase_names, modes)
 
-test_serial_port_obj.close()
-standard_serial_port_obj.close()
-test_serial_thread.join()
-standard_serial_thread.join()
+	if not args.simulate and not CheckTracks(cases):
+		return 5
 
-vgpio.Cleanup()
+	schedule = vtests.Schedule(cases)
+	if not args.threshold_search:
+		print(f"{time.asctime()} Running {len(cases)} test cases with {vtests.CountModeChanges(schedule)} mode changes.")
+	rig = MakeRig(args)
+	if args.threshold_search:
+		return SearchThresholds(args, rig, modes if modes is not None else list(mode_table))
+	return RunTests(args, rig, schedule)
 
-sys.exit(0)
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,336 @@
+# validate_audio.py
+# Python3
+# Support validate.py
+# In-process playback of modem-test-audio tracks
+# 18 Oct 2026
+#
+# Tracks are memory-mapped and streamed to a sink in fixed-size periods, so
+# playing a track costs no process start or file open on the critical path.
+# The next tracks can be preloaded into the page cache while the TNCs reset.
+# Sinks:
+#   alsa     pyalsaaudio PCM device
+#   aplay    one long-running aplay reading raw PCM from a pipe
+#   null     discards the audio, paced in real (harness) time
+#   FILE.wav writes everything played to a WAV file, unpaced
+
+import io
+import mmap
+import time
+import struct
+import threading
+import subprocess
+import validate_clock as vclock
+
+PERIOD_FRAMES = 1024
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class WavFormat:
+	def __init__(self, channels, sample_rate, bits_per_sample):
+		self.channels = channels
+		self.sample_rate = sample_rate
+		self.bits_per_sample = bits_per_sample
+
+	@property
+	def frame_bytes(self):
+		return self.channels * (self.bits_per_sample // 8)
+
+	@property
+	def byte_rate(self):
+		return self.sample_rate * self.frame_bytes
+
+	def __eq__(self, other):
+		return isinstance(other, WavFormat) and (self.channels, self.sample_rate, self.bits_per_sample) == (other.channels, other.sample_rate, other.bits_per_sample)
+
+	def __repr__(self):
+		return f"WavFormat({self.channels}, {self.sample_rate}, {self.bits_per_sample})"
+
+def ParseWavHeader(data):
+	"""
+	Walks the RIFF chunks of a WAV file held in data (bytes, mmap or
+	memoryview). Returns (WavFormat, data_offset, data_length). Raises
+	ValueError for anything but integer PCM.
+	"""
+	if len(data) < 12 or data[0:4] != b'RIFF' or data[8:12] != b'WAVE':
+		raise ValueError("Not a RIFF/WAVE file")
+	wav_format = None
+	offset = 12
+	while offset + 8 <= len(data):
+		chunk_id = bytes(data[offset:offset + 4])
+		chunk_length = struct.unpack_from('<I', data, offset + 4)[0]
+		body = offset + 8
+		if chunk_id == b'fmt ':
+			format_tag, channels, sample_rate, byte_rate, block_align, bits = struct.unpack_from('<HHIIHH', data, body)
+			if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_length >= 40:
+				format_tag = struct.unpack_from('<H', data, body + 24)[0]
+			if format_tag != WAVE_FORMAT_PCM:
+				raise ValueError(f"Unsupported WAV format tag 0x{format_tag:04X}")
+			wav_format = WavFormat(channels, sample_rate, bits)
+		elif chunk_id == b'data':
+			if wav_format is None:
+				raise ValueError("WAV data chunk before fmt chunk")
+			# Some writers leave 0 or 0xFFFFFFFF when streaming; use what is there.
+			length = min(chunk_length, len(data) - body)
+			return wav_format, body, length - (length % wav_format.frame_bytes)
+		offset = body + chunk_length + (chunk_length & 1)
+	raise ValueError("WAV file has no data chunk")
+
+def WavHeader(wav_format, data_length):
+	return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_length, b'WAVE', b'fmt ', 16,
+		WAVE_FORMAT_PCM, wav_format.channels, wav_format.sample_rate, wav_format.byte_rate,
+		wav_format.frame_bytes, wav_format.bits_per_sample, b'data', data_length)
+
+class WavFile:
+	"""
+	A memory-mapped WAV file. samples is a memoryview of the PCM data.
+	"""
+	def __init__(self, path):
+		self.path = path
+		with open(path, 'rb') as file:
+			self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			self.format, self.data_offset, self.data_length = ParseWavHeader(self.map)
+		except (ValueError, struct.error):
+			self.map.close()
+			raise
+		self.samples = memoryview(self.map)[self.data_offset:self.data_offset + self.data_length]
+
+	@property
+	def duration(self):
+		return self.data_length / self.format.byte_rate
+
+	def Preload(self):
+		# Pull the samples into the page cache so playback never waits on the disk.
+		if hasattr(self.map, 'madvise'):
+			self.map.madvise(mmap.MADV_WILLNEED)
+		page = mmap.PAGESIZE
+		touched = 0
+		for offset in range(0, self.data_length, page):
+			touched += self.samples[offset]
+		return touched
+
+	def Close(self):
+		self.samples.release()
+		self.map.close()
+
+class NullSink:
+	"""
+	Discards the audio, taking as long as playing it would on harness time.
+	"""
+	def Start(self, wav_format):
+		self.format = wav_format
+		self.due = vclock.Monotonic()
+
+	def Write(self, chunk):
+		self.due += len(chunk) / self.format.byte_rate
+		vclock.Sleep(self.due - vclock.Monotonic())
+
+	def Drain(self):
+		pass
+
+	def Close(self):
+		pass
+
+class FileSink:
+	"""
+	Appends everything played to one WAV file, as fast as it comes. Every
+	track played must have the same format.
+	"""
+	def __init__(self, path):
+		self.path = path
+		self.file = None
+		self.format = None
+		self.length = 0
+
+	def Start(self, wav_format):
+		if self.file is None:
+			self.file = open(self.path, 'wb')
+			self.format = wav_format
+			self.file.write(WavHeader(wav_format, 0))
+		elif wav_format != self.format:
+			raise ValueError(f"{self.path} holds {self.format}, cannot append {wav_format}")
+
+	def Write(self, chunk):
+		self.file.write(chunk)
+		self.length += len(chunk)
+
+	def Drain(self):
+		# Keep the header valid after every track, in case the run is cut short.
+		self.file.seek(0)
+		self.file.write(WavHeader(self.format, self.length))
+		self.file.seek(0, io.SEEK_END)
+		self.file.flush()
+
+	def Close(self):
+		if self.file is not None:
+			self.file.close()
+			self.file = None
+
+def AplayCommand(wav_format, device=None):
+	# aplay arguments to play raw PCM of wav_format from stdin.
+	sample_format = "U8" if wav_format.bits_per_sample == 8 else f"S{wav_format.bits_per_sample}_LE"
+	command = ["aplay", "-q", "-t", "raw", "-f", sample_format, "-c", str(wav_format.channels), "-r", str(wav_format.sample_rate)]
+	if device:
+		command += ["-D", device]
+	return command
+
+class AplaySink:
+	"""
+	One aplay process reading raw PCM from a pipe, started for the first
+	track and only restarted when the track format changes.
+	"""
+	def __init__(self, device=None):
+		self.device = device
+		self.process = None
+		self.format = None
+
+	def Start(self, wav_format):
+		if self.process is not None and wav_format == self.format:
+			self.written = 0
+			self.start_time = time.monotonic()
+			return
+		self.Close()
+		self.process = subprocess.Popen(AplayCommand(wav_format, self.device), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+		self.format = wav_format
+		self.written = 0
+		self.start_time = time.monotonic()
+
+	def Write(self, chunk):
+		self.process.stdin.write(chunk)
+		self.written += len(chunk)
+
+	def Drain(self):
+		# The pipe only blocks once aplay's buffer is full, so wait out the rest.
+		self.process.stdin.flush()
+		remaining = self.start_time + (self.written / self.format.byte_rate) - time.monotonic()
+		if remaining > 0:
+			time.sleep(remaining)
+
+	def Close(self):
+		if self.process is not None:
+			self.process.stdin.close()
+			self.process.wait()
+			self.process = None
+
+class AlsaSink:
+	"""
+	An ALSA PCM device through pyalsaaudio. Writes block once the device
+	buffer is full, which paces playback.
+	"""
+	def __init__(self, device="default"):
+		import alsaaudio
+		self.alsaaudio = alsaaudio
+		self.device = device
+		self.pcm = None
+		self.format = None
+
+	def Start(self, wav_format):
+		if self.pcm is not None and wav_format == self.format:
+			return
+		self.Close()
+		alsaaudio = self.alsaaudio
+		# WAV stores 24 bit samples packed in 3 bytes.
+		sample_formats = {8: alsaaudio.PCM_FORMAT_U8, 16: alsaaudio.PCM_FORMAT_S16_LE, 24: alsaaudio.PCM_FORMAT_S24_3LE, 32: alsaaudio.PCM_FORMAT_S32_LE}
+		if wav_format.bits_per_sample not in sample_formats:
+			raise ValueError(f"the ALSA sink cannot play {wav_format.bits_per_sample} bit audio")
+		sample_format = sample_formats[wav_format.bits_per_sample]
+		self.pcm = alsaaudio.PCM(alsaaudio.PCM_PLAYBACK, device=self.device, channels=wav_format.channels,
+			rate=wav_format.sample_rate, format=sample_format, periodsize=PERIOD_FRAMES)
+		self.format = wav_format
+
+	def Write(self, chunk):
+		self.pcm.write(bytes(chunk))
+
+	def Drain(self):
+		if hasattr(self.pcm, 'drain'):
+			self.pcm.drain()
+
+	def Close(self):
+		if self.pcm is not None:
+			self.pcm.close()
+			self.pcm = None
+
+def MakeSink(name="auto"):
+	"""
+	Returns a sink by name: "alsa", "aplay", "null" or a path ending in .wav.
+	"auto" picks alsa if pyalsaaudio is installed, otherwise aplay.
+	"""
+	if name.lower().endswith('.wav'):
+		return FileSink(name)
+	if name == "null":
+		return NullSink()
+	if name == "aplay":
+		return AplaySink()
+	if name == "alsa":
+		return AlsaSink()
+	if name == "auto":
+		try:
+			return AlsaSink()
+		except ImportError:
+			return AplaySink()
+	raise ValueError(f"Unknown audio sink '{name}'")
+
+class Player:
+	"""
+	Streams WAV files to sink in periods of period_frames frames. Preload()
+	maps and reads a track ahead of time on a background thread, Play()
+	plays it and returns its (start, end) time.monotonic_ns() timestamps.
+	Setting the threading.Event stop ends playback at the next period.
+	"""
+	def __init__(self, sink, period_frames=PERIOD_FRAMES):
+		self.sink = sink
+		self.period_frames = period_frames
+		self.loaded = {}
+		self.lock = threading.Lock()
+
+	def Load(self, path):
+		with self.lock:
+			wav = self.loaded.pop(path, None)
+		if wav is None:
+			wav = WavFile(path)
+		return wav
+
+	def Preload(self, path):
+		def LoadInBackground():
+			try:
+				wav = WavFile(path)
+				wav.Preload()
+			except (OSError, ValueError):
+				# Play() reports the problem when the track is needed.
+				return
+			with self.lock:
+				previous = self.loaded.get(path)
+				self.loaded[path] = wav
+			if previous is not None:
+				previous.Close()
+		thread = threading.Thread(target=LoadInBackground, daemon=True)
+		thread.start()
+		return thread
+
+	def Play(self, path, stop=None):
+		wav = self.Load(path)
+		try:
+			try:
+				self.sink.Start(wav.format)
+			except ValueError as error:
+				raise ValueError(f"{path}: {error}") from error
+			period_bytes = self.period_frames * wav.format.frame_bytes
+			start_time = time.monotonic_ns()
+			for offset in range(0, wav.data_length, period_bytes):
+				if stop is not None and stop.is_set():
+					break
+				with wav.samples[offset:offset + period_bytes] as chunk:
+					self.sink.Write(chunk)
+			self.sink.Drain()
+			end_time = time.monotonic_ns()
+		finally:
+			wav.Close()
+		return start_time, end_time
+
+	def Close(self):
+		with self.lock:
+			loaded = list(self.loaded.values())
+			self.loaded = {}
+		for wav in loaded:
+			wav.Close()
+		self.sink.Close()
@@ -0,0 +1,181 @@
+# validate_benchmark.py
+# Python3
+# Micro-benchmarks of the host-side packet, KISS and CRC paths
+# 18 Oct 2026
+#
+# Usage: python3 validate_benchmark.py [--output FILE] [--baseline FILE] [--filter TEXT]
+#
+# Each path runs over three frame mixes: 20 byte IDENT frames, 255 byte burst
+# frames, and escape-heavy frames whose payload is mostly 0xC0 and 0xDB.
+# The report gives operations and bytes per second, the peak memory
+# allocated during one operation, and the headroom over the 57600 baud
+# serial line, i.e. how many times faster than the line can deliver bytes
+# the path processes them. --output saves the results as JSON; --baseline
+# compares against an earlier file and exits 1 if any benchmark lost more
+# than --threshold of its speed.
+
+import sys
+import json
+import time
+import queue
+import random
+import platform
+import argparse
+import tracemalloc
+import crc
+import validate_packet_functions as vpacket
+import validate_serial_functions as vserial
+
+LINE_BAUD = 57600
+# 8N1: ten bit times per byte.
+LINE_BYTES_PER_SECOND = LINE_BAUD / 10
+USB_CHUNK = 64
+
+def MakeFrames(kind, count, rng):
+	frames = []
+	for index in range(count):
+		if kind == "ident":
+			frames.append(vpacket.GenerateUIPacket("N0CALL-1", "IDENT-0", "", 20))
+		elif kind == "burst":
+			frames.append(vpacket.GenerateUIPacket("N0CALL-1", "TEST-0", vpacket.RandomPrintableBytes(239, rng).decode(), 0))
+		else:
+			payload = bytes(rng.choice((0xC0, 0xDB, 0xC0, 0xDB, 0x41)) for k in range(239))
+			frames.append(bytes(vpacket.GetUIHeader("N0CALL-1", "TEST-0")) + payload)
+	return frames
+
+class StreamPort:
+	# Stands in for a serial port, handing out a KISS stream in USB-sized reads.
+	def __init__(self, stream):
+		self.stream = stream
+		self.offset = 0
+
+	def isOpen(self):
+		return self.offset < len(self.stream)
+
+	@property
+	def in_waiting(self):
+		return min(USB_CHUNK, len(self.stream) - self.offset)
+
+	def read(self, size):
+		data = self.stream[self.offset:self.offset + size]
+		self.offset += len(data)
+		return data
+
+def ParseStream(stream):
+	q = queue.Queue()
+	vserial.ParseKISSFromPort(StreamPort(stream), q)
+	return q.qsize()
+
+def ReadFields(frame):
+	meta = vpacket.GetFrameMeta(frame)
+	return meta['SOURCE'], meta['DEST'], meta['Control'], meta['Payload']
+
+def Benchmarks(mix, frames):
+	"""
+	Returns (name, function, arguments, bytes per call, operations per call)
+	for every benchmark over one frame mix.
+	"""
+	kiss_frames = [vpacket.EncodeKISSFrame(0, frame) for frame in frames]
+	stream = b''.join(kiss_frames)
+	callsigns = [f"N{index % 10}CALL-{index % 16}" for index in range(len(frames))]
+	frame_bytes = [len(frame) for frame in frames]
+	return [
+		(f"CalcCRC16/{mix}", crc.CalcCRC16, frames, frame_bytes, 1),
+		(f"CRC16/{mix}", crc.CRC16, frames, frame_bytes, 1),
+		(f"CalcCRC16Batch/{mix}", crc.CalcCRC16Batch, [frames], [sum(frame_bytes)], len(frames)),
+		(f"EncodeKISSFrame/{mix}", lambda frame: vpacket.EncodeKISSFrame(0, frame), frames, frame_bytes, 1),
+		(f"SplitKISSFrames/{mix}", vserial.SplitKISSFrames, [stream], [len(stream)], len(frames)),
+		(f"ParseKISSFromPort/{mix}", ParseStream, [stream], [len(stream)], len(frames)),
+		(f"GetFrameMeta/{mix}", ReadFields, frames, frame_bytes, 1),
+		(f"GenerateUIPacket/{mix}", lambda frame: vpacket.GenerateUIPacket("N0CALL-1", "TEST-0", "", len(frame) - 16), frames, frame_bytes, 1),
+		(f"StringCallsignToArray/{mix}", vpacket.StringCallsignToArray, callsigns, [len(callsign) for callsign in callsigns], 1) ]
+
+def TimeBenchmark(function, arguments, minimum_time):
+	# Best time per pass over arguments, repeating passes for at least minimum_time.
+	best = None
+	total = 0.0
+	while total < minimum_time or best is None:
+		start_time = time.perf_counter()
+		for argument in arguments:
+			function(argument)
+		elapsed = time.perf_counter() - start_time
+		total += elapsed
+		best = elapsed if best is None else min(best, elapsed)
+	return best
+
+def PeakAllocation(function, arguments, samples=50):
+	# Mean of the peak memory allocated while one call runs, in bytes.
+	tracemalloc.start()
+	try:
+		peaks = []
+		for argument in arguments[:samples]:
+			tracemalloc.reset_peak()
+			before = tracemalloc.get_traced_memory()[0]
+			function(argument)
+			peaks.append(tracemalloc.get_traced_memory()[1] - before)
+	finally:
+		tracemalloc.stop()
+	return sum(peaks) / len(peaks)
+
+def Run(frame_count=200, minimum_time=0.2, name_filter="", seed=1):
+	rng = random.Random(seed)
+	results = {}
+	for mix in ("ident", "burst", "escape"):
+		frames = MakeFrames(mix, frame_count, rng)
+		for name, function, arguments, byte_counts, operations in Benchmarks(mix, frames):
+			if name_filter and name_filter.lower() not in name.lower():
+				continue
+			# Cached paths are measured warm, as they run during a test.
+			function(arguments[0])
+			elapsed = TimeBenchmark(function, arguments, minimum_time)
+			calls = len(arguments)
+			bytes_per_second = sum(byte_counts) / elapsed
+			results[name] = {"ops_per_s": calls * operations / elapsed, "bytes_per_s": bytes_per_second,
+				"peak_bytes_per_op": PeakAllocation(function, arguments) / operations,
+				"line_headroom": bytes_per_second / LINE_BYTES_PER_SECOND}
+	return results
+
+def Compare(results, baseline, threshold):
+	# Returns the names of benchmarks that lost more than threshold of their speed.
+	regressions = []
+	for name, result in results.items():
+		base = baseline.get(name)
+		if base is None:
+			continue
+		change = (result["ops_per_s"] / base["ops_per_s"]) - 1
+		flag = ""
+		if change < -threshold:
+			regressions.append(name)
+			flag = "REGRESSED"
+		print(f"{name:<34}{base['ops_per_s']:>14.0f}{result['ops_per_s']:>14.0f}{change * 100:>+9.1f}% {flag}")
+	return regressions
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the packet, KISS and CRC hot paths.")
+	parser.add_argument("--frames", type=int, default=200, help="frames per mix (default 200)")
+	parser.add_argument("--min-time", type=float, default=0.2, help="seconds to repeat each benchmark for (default 0.2)")
+	parser.add_argument("--filter", default="", help="only run benchmarks whose name contains TEXT")
+	parser.add_argument("--output", default=None, metavar="FILE", help="save results as JSON")
+	parser.add_argument("--baseline", default=None, metavar="FILE", help="compare with results saved earlier")
+	parser.add_argument("--threshold", type=float, default=0.1, help="slowdown counted as a regression (default 0.1)")
+	args = parser.parse_args()
+
+	results = Run(args.frames, args.min_time, args.filter)
+	print(f"{'benchmark':<34}{'ops/s':>14}{'MB/s':>10}{'peak B/op':>12}{'x line':>10}")
+	for name, result in results.items():
+		print(f"{name:<34}{result['ops_per_s']:>14.0f}{result['bytes_per_s'] / 1e6:>10.2f}{result['peak_bytes_per_op']:>12.0f}{result['line_headroom']:>10.0f}")
+	if args.output:
+		with open(args.output, 'w') as f:
+			json.dump({"python": platform.python_version(), "machine": platform.machine(), "node": platform.node(),
+				"time": time.time(), "results": results}, f, indent=1)
+	if args.baseline:
+		with open(args.baseline) as f:
+			baseline = json.load(f)["results"]
+		print(f"{'benchmark':<34}{'baseline ops/s':>14}{'ops/s':>14}{'change':>10}")
+		regressions = Compare(results, baseline, args.threshold)
+		print(f"{len(regressions)} regressions against {args.baseline}.")
+		return 1 if regressions else 0
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,213 @@
+# validate_capture.py
+# Python3
+# Support validate.py
+# Append-only capture of serial traffic, and offline replay through the KISS decoder and track scoring
+# 18 Oct 2026
+#
+# A capture file starts with an 8 byte header, MAGIC, followed by records:
+#   time_ns  u64  time.monotonic_ns() of the read or write
+#   device   u8   DEVICE_TEST, DEVICE_STANDARD or DEVICE_HARNESS
+#   kind     u8   KIND_READ, KIND_WRITE or KIND_EVENT
+#   length   u32  bytes of data that follow
+#   data          raw port bytes, or a JSON object for events
+# all little-endian. Events mark case and track boundaries, so a replay can
+# cut the traffic the same way the run did:
+#   python3 validate.py --capture run.cap
+#   python3 validate_capture.py replay run.cap
+#   python3 validate_capture.py dump run.cap
+
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import threading
+import validate_serial_functions as vserial
+import validate_modes as vmodes
+import validate_sequential as vseq
+import validate_match as vmatch
+
+MAGIC = b'N9CAP\x00\x01\x00'
+RECORD = struct.Struct('<QBBI')
+DEVICE_TEST = 0
+DEVICE_STANDARD = 1
+DEVICE_HARNESS = 255
+DEVICE_NAMES = {DEVICE_TEST: "TEST", DEVICE_STANDARD: "STANDARD", DEVICE_HARNESS: "HARNESS"}
+KIND_READ = 0
+KIND_WRITE = 1
+KIND_EVENT = 2
+KIND_NAMES = {KIND_READ: "read", KIND_WRITE: "write", KIND_EVENT: "event"}
+
+class CaptureWriter:
+	"""
+	Appends records to a capture file. Safe to call from the I/O thread and
+	the test thread at once.
+	"""
+	def __init__(self, path):
+		self.path = path
+		self.file = open(path, 'ab')
+		if self.file.tell() == 0:
+			self.file.write(MAGIC)
+		self.lock = threading.Lock()
+
+	def Write(self, device, kind, data, time_ns=None):
+		if time_ns is None:
+			time_ns = time.monotonic_ns()
+		with self.lock:
+			self.file.write(RECORD.pack(time_ns, device, kind, len(data)))
+			self.file.write(data)
+
+	def Event(self, event, **fields):
+		fields["event"] = event
+		self.Write(DEVICE_HARNESS, KIND_EVENT, json.dumps(fields).encode())
+
+	def Close(self):
+		with self.lock:
+			self.file.close()
+
+class CapturingPort:
+	"""
+	Wraps a serial port so every write to it is captured as device.
+	Everything else passes through to the port.
+	"""
+	def __init__(self, serial_port, capture, device):
+		self.serial_port = serial_port
+		self.capture = capture
+		self.device = device
+
+	def write(self, data):
+		self.capture.Write(self.device, KIND_WRITE, bytes(data))
+		return self.serial_port.write(data)
+
+	def __getattr__(self, name):
+		return getattr(self.serial_port, name)
+
+def ReadRecords(path):
+	"""
+	Yields (time_ns, device, kind, data) for every record in the capture at
+	path. data is a memoryview into the memory-mapped file, valid until the
+	next record is requested. A record cut short by the end of the file,
+	e.g. from an interrupted run, ends the capture.
+	"""
+	with open(path, 'rb') as file:
+		with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+			if data[:len(MAGIC)] != MAGIC:
+				raise ValueError(f"{path} is not a capture file")
+			view = memoryview(data)
+			offset = len(MAGIC)
+			end = len(data)
+			try:
+				while offset + RECORD.size <= end:
+					time_ns, device, kind, length = RECORD.unpack_from(data, offset)
+					offset += RECORD.size
+					if offset + length > end:
+						break
+					with view[offset:offset + length] as record:
+						yield time_ns, device, kind, record
+					offset += length
+			finally:
+				view.release()
+
+class CaseTraffic:
+	# Frames each device sent to the host during one case, and its track.
+	def __init__(self, name, start_ns):
+		self.name = name
+		self.start_ns = start_ns
+		self.track = None
+		self.verdict = None
+		self.frames = {DEVICE_TEST: [], DEVICE_STANDARD: []}
+
+def SplitCases(path):
+	"""
+	Decodes the reads of a capture into KISS frames, stamped with their
+	read time, and groups them by the case that was running. Returns a list
+	of CaseTraffic.
+	"""
+	buffers = {DEVICE_TEST: b'', DEVICE_STANDARD: b''}
+	cases = []
+	current = None
+	for time_ns, device, kind, data in ReadRecords(path):
+		if kind == KIND_EVENT:
+			event = json.loads(bytes(data))
+			if event["event"] == "case_start":
+				current = CaseTraffic(event["name"], time_ns)
+				cases.append(current)
+			elif current is not None and event["event"] == "track_start":
+				current.track = event["track"]
+			elif current is not None and event["event"] == "case_end":
+				current.verdict = event.get("verdict")
+				current = None
+		elif kind == KIND_READ and device in buffers:
+			frames, buffers[device] = vserial.SplitKISSFrames(buffers[device] + bytes(data), time_ns)
+			if current is not None:
+				current.frames[device] += frames
+	return cases
+
+def ScoreTrack(traffic, tolerance=0.07, alpha=0.01, beta=0.01):
+	"""
+	Re-runs the burst/AWGN scoring on a case's captured frames, feeding
+	both devices' frames to the sequential comparison in arrival order.
+	Returns (verdict, decodes seen when the verdict settled or None, LossMap).
+	"""
+	packet_bytes, packet_count = vmodes.TrackPacketInfo(traffic.track)
+	comparison = vseq.SequentialComparison(packet_count, tolerance=tolerance, alpha=alpha, beta=beta)
+	arrivals = sorted([(frame.time_ns, DEVICE_TEST) for frame in traffic.frames[DEVICE_TEST]] +
+		[(frame.time_ns, DEVICE_STANDARD) for frame in traffic.frames[DEVICE_STANDARD]])
+	settled_at = None
+	for index, (time_ns, device) in enumerate(arrivals):
+		comparison.Update(device == DEVICE_TEST, device == DEVICE_STANDARD)
+		if comparison.decision is not None and settled_at is None:
+			settled_at = index + 1
+	verdict = comparison.decision if comparison.decision is not None else comparison.Passes(comparison.test_count, comparison.standard_count)
+	return verdict, settled_at, vmatch.MatchFrames(traffic.frames[DEVICE_TEST], traffic.frames[DEVICE_STANDARD])
+
+def Replay(path, tolerance=0.07, alpha=0.01, beta=0.01):
+	"""
+	Scores every track played in the capture at path and prints each new
+	verdict next to the recorded one. Returns the number of verdicts that
+	changed.
+	"""
+	changed = 0
+	for traffic in SplitCases(path):
+		if traffic.track is None:
+			continue
+		verdict, settled_at, loss_map = ScoreTrack(traffic, tolerance, alpha, beta)
+		recorded = {True: "PASS", False: "FAIL", None: "-"}[traffic.verdict]
+		replayed = "PASS" if verdict else "FAIL"
+		if recorded != "-" and recorded != replayed:
+			changed += 1
+		settled = f"settled after {settled_at} decodes" if settled_at else "not settled early"
+		print(f"{traffic.name:<32}{recorded:<6}{replayed:<6}{len(traffic.frames[DEVICE_TEST]):>4}/{len(traffic.frames[DEVICE_STANDARD]):<4} {settled}, {len(loss_map.missed)} missed, {len(loss_map.extra)} extra")
+	return changed
+
+def Dump(path):
+	start_ns = None
+	for time_ns, device, kind, data in ReadRecords(path):
+		if start_ns is None:
+			start_ns = time_ns
+		text = bytes(data).decode() if kind == KIND_EVENT else bytes(data).hex(' ')
+		print(f"{(time_ns - start_ns) / 1e9:>12.6f} {DEVICE_NAMES.get(device, device):<9}{KIND_NAMES.get(kind, kind):<6}{len(data):>6} {text}")
+
+def main():
+	parser = argparse.ArgumentParser(description="Replay captured N9600A serial traffic.")
+	parser.add_argument("command", choices=["replay", "dump"])
+	parser.add_argument("capture")
+	parser.add_argument("--tolerance", type=float, default=0.07)
+	parser.add_argument("--alpha", type=float, default=0.01)
+	parser.add_argument("--beta", type=float, default=0.01)
+	args = parser.parse_args()
+	try:
+		if args.command == "dump":
+			Dump(args.capture)
+			return 0
+		start_time = time.monotonic()
+		changed = Replay(args.capture, args.tolerance, args.alpha, args.beta)
+	except (OSError, ValueError) as error:
+		print(error)
+		return 2
+	print(f"{changed} verdicts changed, replayed in {time.monotonic() - start_time:.3f} s.")
+	return 1 if changed else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,284 @@
+# validate_channel.py
+# Python3
+# Support validate.py
+# Streaming channel simulator: calibrated AWGN, frequency offset and clipping applied to clean tracks
+# 18 Oct 2026
+#
+# A clean track is memory-mapped and processed in CHUNK_FRAMES blocks, so
+# memory use does not grow with the track. Noise is calibrated to Eb/N0 from
+# the mode's bit rate and the power of the track's active (non-silent)
+# audio. Rendered variants live in an LRU disk cache keyed by the source
+# file and every impairment parameter:
+#   python3 validate_channel.py render /home/pi/github/modem-test-audio 2_burst/AFSK_1200_AX25_50b_10x.wav --ebn0 8
+#   python3 validate_channel.py sweep /home/pi/github/modem-test-audio --ebn0 0,2,4,6,8,10,12,14,16,18
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import validate_audio as vaudio
+import validate_modes as vmodes
+
+CHANNEL_VERSION = 2
+CHUNK_FRAMES = 65536
+# Blocks quieter than this, relative to the loudest block, are gaps between packets.
+ACTIVE_THRESHOLD_DB = -20.0
+BLOCK_SECONDS = 0.01
+# Full scale is kept this many noise deviations above the clean peak, so fewer than 1 sample in 10000 clips.
+HEADROOM_SIGMAS = 4.0
+
+class Impairment:
+	"""
+	What the channel does to a track. ebn0 is in dB, None for no noise;
+	offset_hz shifts the whole spectrum; clip_db clips the audio that many
+	dB below the clean track's peak, None for no clipping. seed fixes the
+	noise.
+	"""
+	def __init__(self, ebn0=None, offset_hz=0.0, clip_db=None, seed=0):
+		self.ebn0 = ebn0
+		self.offset_hz = offset_hz
+		self.clip_db = clip_db
+		self.seed = seed
+
+	def Key(self):
+		return {"version": CHANNEL_VERSION, "ebn0": self.ebn0, "offset_hz": self.offset_hz, "clip_db": self.clip_db, "seed": self.seed}
+
+	def Label(self):
+		# Track name fields, e.g. "e8dB" for validate_modes.TrackEbN0.
+		return f"e{self.ebn0:g}dB" if self.ebn0 is not None else "clean"
+
+def FrameChunks(wav):
+	# Yields float64 (frames, channels) arrays of the track, CHUNK_FRAMES at a time.
+	frame_bytes = wav.format.frame_bytes
+	step = CHUNK_FRAMES * frame_bytes
+	for offset in range(0, wav.data_length - wav.data_length % frame_bytes, step):
+		with wav.samples[offset:offset + step] as chunk:
+			samples = np.frombuffer(chunk, dtype='<i2').astype(np.float64)
+		yield samples.reshape(-1, wav.format.channels)
+
+def MeasureSignal(wav):
+	"""
+	Returns (active power, peak) of the track, power being the mean square
+	sample value over BLOCK_SECONDS blocks within ACTIVE_THRESHOLD_DB of the
+	loudest block.
+	"""
+	block = max(1, int(wav.format.sample_rate * BLOCK_SECONDS))
+	block_powers = []
+	peak = 0.0
+	tail = np.zeros((0, wav.format.channels))
+	for chunk in FrameChunks(wav):
+		chunk = np.concatenate([tail, chunk])
+		whole = len(chunk) - len(chunk) % block
+		if whole:
+			block_powers.append(np.mean(chunk[:whole].reshape(-1, block * wav.format.channels) ** 2, axis=1))
+			peak = max(peak, np.abs(chunk[:whole]).max())
+		tail = chunk[whole:]
+	if not block_powers:
+		raise ValueError(f"{wav.path} is too short to measure")
+	block_powers = np.concatenate(block_powers)
+	active = block_powers[block_powers >= block_powers.max() * 10 ** (ACTIVE_THRESHOLD_DB / 10)]
+	return float(active.mean()), float(peak)
+
+def NoiseDeviation(signal_power, bit_rate, sample_rate, ebn0):
+	# Eb = S / Rb, and white noise of variance s^2 at sample rate fs has N0 = 2 s^2 / fs.
+	energy_per_bit = signal_power / bit_rate
+	noise_density = energy_per_bit / 10 ** (ebn0 / 10)
+	return np.sqrt(noise_density * sample_rate / 2)
+
+def HilbertTaps(half_length=64):
+	n = np.arange(-half_length, half_length + 1)
+	taps = np.zeros(len(n))
+	odd = n % 2 == 1
+	taps[odd] = 2 / (np.pi * n[odd])
+	return taps * np.hamming(len(n))
+
+class FrequencyShifter:
+	"""
+	Shifts one channel up by offset_hz as a single-sideband mixer: an FIR
+	Hilbert transformer forms the analytic signal, which is rotated by a
+	phase-continuous oscillator. Input history carries across chunks, and
+	the filter delay is removed, so chunked output matches one long pass.
+	"""
+	def __init__(self, offset_hz, sample_rate, half_length=64):
+		self.taps = HilbertTaps(half_length)
+		self.delay = half_length
+		self.step = 2 * np.pi * offset_hz / sample_rate
+		self.history = np.zeros(2 * half_length)
+		self.position = 0
+		self.skip = half_length
+
+	def Process(self, samples):
+		extended = np.concatenate([self.history, samples])
+		self.history = extended[-len(self.history):]
+		imaginary = np.convolve(extended, self.taps, mode='valid')
+		real = extended[self.delay:self.delay + len(imaginary)]
+		phase = self.step * np.arange(self.position, self.position + len(real))
+		self.position += len(real)
+		shifted = real * np.cos(phase) - imaginary * np.sin(phase)
+		# The first delay samples out of the filter precede the track.
+		skipped = min(self.skip, len(shifted))
+		self.skip -= skipped
+		return shifted[skipped:]
+
+	def Flush(self):
+		return self.Process(np.zeros(self.delay))
+
+def Impair(chunk, rng, gain, deviation, limit):
+	# Scales by gain, adds noise of standard deviation deviation, clips to +-limit and returns 16 bit PCM bytes.
+	chunk = chunk * gain
+	if deviation:
+		chunk = chunk + rng.normal(0.0, deviation, chunk.shape)
+	return np.clip(np.round(chunk), -limit, limit).astype('<i2').tobytes()
+
+def Headroom(peak, deviation, full_scale=32767.0):
+	# Gain that keeps peak plus HEADROOM_SIGMAS noise deviations within full_scale.
+	loudest = peak + HEADROOM_SIGMAS * deviation
+	if loudest <= full_scale:
+		return 1.0
+	return full_scale / loudest
+
+def Render(source_path, output_path, impairment, bit_rate):
+	"""
+	Writes source_path through the channel to output_path, a 16 bit PCM
+	WAV with the source's format. bit_rate calibrates the noise. At low
+	Eb/N0 the track is turned down, noise and all, so that the noise does
+	not clip at full scale and the requested Eb/N0 is what is written.
+	"""
+	wav = vaudio.WavFile(source_path)
+	try:
+		if wav.format.bits_per_sample != 16:
+			raise ValueError(f"{source_path}: only 16 bit tracks can be impaired, not {wav.format.bits_per_sample} bit")
+		signal_power, peak = MeasureSignal(wav)
+		rng = np.random.default_rng(impairment.seed)
+		deviation = 0.0
+		if impairment.ebn0 is not None:
+			deviation = NoiseDeviation(signal_power, bit_rate, wav.format.sample_rate, impairment.ebn0)
+		gain = Headroom(peak, deviation)
+		deviation *= gain
+		limit = 32767.0
+		if impairment.clip_db is not None:
+			limit = min(limit, gain * peak * 10 ** (-impairment.clip_db / 20))
+		shifters = None
+		if impairment.offset_hz:
+			shifters = [FrequencyShifter(impairment.offset_hz, wav.format.sample_rate) for channel in range(wav.format.channels)]
+		temporary = output_path + ".tmp"
+		with open(temporary, 'wb') as file:
+			file.write(vaudio.WavHeader(wav.format, wav.data_length - wav.data_length % wav.format.frame_bytes))
+			for chunk in FrameChunks(wav):
+				if shifters is not None:
+					chunk = np.column_stack([shifter.Process(chunk[:, index]) for index, shifter in enumerate(shifters)])
+				file.write(Impair(chunk, rng, gain, deviation, limit))
+			if shifters is not None:
+				file.write(Impair(np.column_stack([shifter.Flush() for shifter in shifters]), rng, gain, deviation, limit))
+		os.replace(temporary, output_path)
+	finally:
+		wav.Close()
+
+class VariantCache:
+	"""
+	Rendered variants in directory, at most max_bytes of them. Using a
+	variant refreshes its modification time; when the cache grows past
+	max_bytes the least recently used variants are deleted.
+	"""
+	def __init__(self, directory, max_bytes=4 * 1024 ** 3):
+		self.directory = os.path.abspath(directory)
+		self.max_bytes = max_bytes
+
+	def VariantName(self, source_path, impairment):
+		status = os.stat(source_path)
+		key = dict(impairment.Key(), source=os.path.abspath(source_path), size=status.st_size, mtime_ns=status.st_mtime_ns)
+		digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:12]
+		stem = os.path.basename(source_path).rsplit('.', 1)[0]
+		return f"{stem}_{impairment.Label()}_c{digest}.wav"
+
+	def Get(self, source_path, impairment, bit_rate):
+		# Returns the path of source_path through impairment, rendering it on a miss.
+		path = os.path.join(self.directory, self.VariantName(source_path, impairment))
+		if os.path.exists(path):
+			os.utime(path)
+			return path
+		os.makedirs(self.directory, exist_ok=True)
+		Render(source_path, path, impairment, bit_rate)
+		self.Evict(keep=path)
+		return path
+
+	def Evict(self, keep=None):
+		entries = []
+		for name in os.listdir(self.directory):
+			path = os.path.join(self.directory, name)
+			if name.endswith(".wav") and path != keep:
+				status = os.stat(path)
+				entries.append((status.st_mtime_ns, status.st_size, path))
+		total = sum(size for mtime, size, path in entries)
+		if keep is not None:
+			total += os.path.getsize(keep)
+		for mtime, size, path in sorted(entries):
+			if total <= self.max_bytes:
+				break
+			os.remove(path)
+			total -= size
+
+def ImpairAWGNTracks(mode_table, root, cache, impairment, modes=None):
+	"""
+	Returns a copy of mode_table whose AWGN phase plays the burst track of
+	each of modes (all by default) through impairment, instead of the
+	corpus AWGN track.
+	"""
+	patterns = set(mode.pattern for mode in (modes if modes is not None else mode_table))
+	impaired = []
+	for mode in mode_table:
+		if mode.pattern in patterns:
+			track = cache.Get(os.path.join(root, mode.burst_track), impairment, mode.bit_rate)
+			mode = vmodes.Mode(mode.pattern, mode.name, mode.bit_rate, mode.burst_track, track, mode.beacon_mode)
+		impaired.append(mode)
+	return vmodes.ModeTable(impaired)
+
+def main():
+	parser = argparse.ArgumentParser(description="Add AWGN, frequency offset and clipping to modem-test-audio tracks.")
+	parser.add_argument("command", choices=["render", "sweep"])
+	parser.add_argument("root")
+	parser.add_argument("track", nargs="?", help="track to render, relative to root")
+	parser.add_argument("--ebn0", default="", help="Eb/N0 in dB, comma separated for a sweep")
+	parser.add_argument("--offset", type=float, default=0.0, metavar="HZ", help="frequency offset")
+	parser.add_argument("--clip", type=float, default=None, metavar="DB", help="clip this far below the track's peak")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--modes", default="", help="modes to sweep (default all)")
+	parser.add_argument("--cache", default="channel_cache")
+	parser.add_argument("--cache-size", type=float, default=4.0, metavar="GB")
+	args = parser.parse_args()
+	try:
+		levels = [float(level) for level in args.ebn0.split(",") if level.strip()] or [None]
+		if args.command == "render":
+			if args.track is None:
+				raise ValueError("render needs a track")
+			tracks = [(args.track, vmodes.MODE_TABLE.by_name[vmodes.TrackModeName(args.track)].bit_rate)]
+		else:
+			modes = vmodes.MODE_TABLE.Select(args.modes.split(",")) if args.modes else list(vmodes.MODE_TABLE)
+			tracks = [(mode.burst_track, mode.bit_rate) for mode in modes]
+	except (ValueError, KeyError) as error:
+		print(f"Bad arguments: {error}")
+		return 2
+	cache = VariantCache(args.cache, int(args.cache_size * 1024 ** 3))
+	start_time = time.perf_counter()
+	audio_seconds = 0.0
+	for track, bit_rate in tracks:
+		for level in levels:
+			impairment = Impairment(level, args.offset, args.clip, args.seed)
+			try:
+				path = cache.Get(os.path.join(args.root, track), impairment, bit_rate)
+			except (OSError, ValueError) as error:
+				print(error)
+				return 1
+			wav = vaudio.WavFile(path)
+			audio_seconds += wav.duration
+			wav.Close()
+			print(path)
+	elapsed = time.perf_counter() - start_time
+	print(f"{audio_seconds:.1f} s of audio in {elapsed:.2f} s.")
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,34 @@
+# validate_clock.py
+# Python3
+# Support validate.py
+# Clock used for every harness wait, so a simulated rig can run faster than real time
+# 18 Oct 2026
+
+import time
+
+time_scale = 1.0
+_real_origin = time.monotonic()
+_virtual_origin = _real_origin
+
+def SetTimeScale(scale):
+	"""
+	Makes harness time run scale times faster than real time from now on.
+	Monotonic() stays continuous across the change.
+	"""
+	global time_scale, _real_origin, _virtual_origin
+	now = time.monotonic()
+	_virtual_origin = Monotonic()
+	_real_origin = now
+	time_scale = float(scale)
+
+def Monotonic():
+	return _virtual_origin + ((time.monotonic() - _real_origin) * time_scale)
+
+def RealTime(seconds):
+	# Real seconds that pass while seconds of harness time go by, for timeouts
+	# handed to blocking calls such as queue.get.
+	return seconds / time_scale
+
+def Sleep(seconds):
+	if seconds > 0:
+		time.sleep(seconds / time_scale)
@@ -4,86 +4,159 @@
 # Nino Carrillo
 # 20 Jan 2024
 
+# Raspberry Pi BCM GPIO numbers of the TNC switch lines, MODE3 first.
+TEST_MODE_PINS = (17, 18, 27, 22)
+STANDARD_MODE_PINS = (24, 25, 5, 6)
+TEST_TX_PIN = 23
+ALL_PINS = TEST_MODE_PINS + (TEST_TX_PIN,) + STANDARD_MODE_PINS
 
-import RPi.GPIO as gpio
+def ModeLevels(pins, mode_pattern):
+	# Maps MODE3..MODE0 pins to the bits of mode_pattern.
+	return {pin: (mode_pattern >> (3 - bit)) & 1 for bit, pin in enumerate(pins)}
+
+class RPiGPIOBackend:
+	"""
+	RPi.GPIO, writing all changed lines with one list-form output call.
+	RPi.GPIO still sets the lines one after another inside that call.
+	"""
+	def __init__(self, module=None):
+		if module is None:
+			import RPi.GPIO as module
+		self.gpio = module
+
+	def Setup(self):
+		self.gpio.setmode(self.gpio.BCM)
+		self.gpio.setup(list(ALL_PINS), self.gpio.OUT, initial=self.gpio.LOW)
+
+	def Write(self, levels):
+		pins = list(levels)
+		self.gpio.output(pins, [self.gpio.HIGH if levels[pin] else self.gpio.LOW for pin in pins])
+
+	def Cleanup(self):
+		self.gpio.cleanup()
+
+class GpiodBackend:
+	"""
+	Linux GPIO character device through libgpiod. All lines are held in one
+	line request, so any set of lines, including all eight MODE lines of both
+	devices, changes in a single ioctl. Supports the libgpiod 2 and 1 Python
+	bindings.
+	"""
+	def __init__(self, chip_path="/dev/gpiochip0", consumer="n9600a-validate"):
+		import gpiod
+		self.gpiod = gpiod
+		self.chip_path = chip_path
+		self.consumer = consumer
+		self.values = {pin: 0 for pin in ALL_PINS}
+		self.request = None
+
+	def Setup(self):
+		gpiod = self.gpiod
+		self.v2 = hasattr(gpiod, "request_lines")
+		if self.v2:
+			from gpiod.line import Direction, Value
+			self.active = Value.ACTIVE
+			self.inactive = Value.INACTIVE
+			settings = gpiod.LineSettings(direction=Direction.OUTPUT, output_value=Value.INACTIVE)
+			self.request = gpiod.request_lines(self.chip_path, consumer=self.consumer, config={ALL_PINS: settings})
+		else:
+			self.chip = gpiod.Chip(self.chip_path)
+			self.request = self.chip.get_lines(list(ALL_PINS))
+			self.request.request(consumer=self.consumer, type=gpiod.LINE_REQ_DIR_OUT, default_vals=[0] * len(ALL_PINS))
+
+	def Write(self, levels):
+		self.values.update(levels)
+		if self.v2:
+			self.request.set_values({pin: self.active if levels[pin] else self.inactive for pin in levels})
+		else:
+			# libgpiod 1 bulk requests always write every line.
+			self.request.set_values([self.values[pin] for pin in ALL_PINS])
+
+	def Cleanup(self):
+		if self.request is not None:
+			self.request.release()
+			self.request = None
+
+class MockGPIOBackend:
+	"""
+	In-memory lines for running without a Pi. Every Write is kept in writes,
+	so callers can check which lines changed together.
+	"""
+	def __init__(self):
+		self.pins = {}
+		self.writes = []
+
+	def Setup(self):
+		self.pins = {pin: 0 for pin in ALL_PINS}
+
+	def Write(self, levels):
+		self.pins.update(levels)
+		self.writes.append(dict(levels))
+
+	def Cleanup(self):
+		self.pins = {}
+
+BACKENDS = {"rpi": RPiGPIOBackend, "gpiod": GpiodBackend, "mock": MockGPIOBackend}
+
+backend = None
+
+def UseBackend(new_backend):
+	global backend
+	backend = new_backend
+
+def MakeBackend(name="auto"):
+	"""
+	Returns a backend by name. "auto" picks RPi.GPIO if it is installed and
+	works, then libgpiod. RPi.GPIO raises RuntimeError on import on boards
+	it does not support, such as the Pi 5.
+	"""
+	if name != "auto":
+		return BACKENDS[name]()
+	errors = []
+	try:
+		return RPiGPIOBackend()
+	except (ImportError, RuntimeError) as error:
+		errors.append(f"RPi.GPIO: {error}")
+	try:
+		return GpiodBackend()
+	except ImportError as error:
+		errors.append(f"gpiod: {error}")
+	raise ImportError("Neither RPi.GPIO nor gpiod is usable (" + "; ".join(errors) + ")")
+
+def GetBackend():
+	if backend is None:
+		UseBackend(MakeBackend())
+	return backend
 
 def Cleanup():
-	gpio.cleanup()
+	GetBackend().Cleanup()
 	return
 
 def SetupGPIO():
-	gpio.setmode(gpio.BCM)
-	# Test Device MODE3 Switch
-	gpio.setup(17,gpio.OUT)
-	gpio.output(17, gpio.LOW)
-	# Test Device MODE2 Switch
-	gpio.setup(18,gpio.OUT)
-	gpio.output(18,gpio.LOW)
-	# Test Device MODE1 Switch
-	gpio.setup(27,gpio.OUT)
-	gpio.output(27,gpio.LOW)
-	# Test Device MODE0 Switch
-	gpio.setup(22,gpio.OUT)
-	gpio.output(22,gpio.LOW)
-	# Test Device Test_TX Button
-	gpio.setup(23,gpio.OUT)
-	gpio.output(23,gpio.LOW)
-	# Standard Device MODE3 Switch
-	gpio.setup(24,gpio.OUT)
-	gpio.output(24,gpio.LOW)
-	# Standard Device MODE2 Switch
-	gpio.setup(25,gpio.OUT)
-	gpio.output(25,gpio.LOW)
-	# Standard Device MODE1 Switch
-	gpio.setup(5,gpio.OUT)
-	gpio.output(5,gpio.LOW)
-	# Standard Device MODE0 Switch
-	gpio.setup(6,gpio.OUT)
-	gpio.output(6,gpio.LOW)
+	# Test Device MODE3..MODE0 Switches, Test_TX Button and Standard Device
+	# MODE3..MODE0 Switches, all outputs starting LOW.
+	GetBackend().Setup()
+	return
+
+def SetModes(test_mode_pattern, standard_mode_pattern):
+	# Switch both devices together, in one write where the backend allows it.
+	levels = ModeLevels(TEST_MODE_PINS, test_mode_pattern)
+	levels.update(ModeLevels(STANDARD_MODE_PINS, standard_mode_pattern))
+	GetBackend().Write(levels)
 	return
 
 def SetTestDeviceMode(mode_pattern):
-	if mode_pattern & 8:
-		gpio.output(17,gpio.HIGH)
-	else:
-		gpio.output(17,gpio.LOW)
-	if mode_pattern & 4:
-		gpio.output(18,gpio.HIGH)
-	else:
-		gpio.output(18,gpio.LOW)
-	if mode_pattern & 2:
-		gpio.output(27,gpio.HIGH)
-	else:
-		gpio.output(27,gpio.LOW)
-	if mode_pattern & 1:
-		gpio.output(22,gpio.HIGH)
-	else:
-		gpio.output(22,gpio.LOW)
+	GetBackend().Write(ModeLevels(TEST_MODE_PINS, mode_pattern))
 	return
 
 def SetStandardDeviceMode(mode_pattern):
-	if mode_pattern & 8:
-		gpio.output(24,gpio.HIGH)
-	else:
-		gpio.output(24,gpio.LOW)
-	if mode_pattern & 4:
-		gpio.output(25,gpio.HIGH)
-	else:
-		gpio.output(25,gpio.LOW)
-	if mode_pattern & 2:
-		gpio.output(5,gpio.HIGH)
-	else:
-		gpio.output(5,gpio.LOW)
-	if mode_pattern & 1:
-		gpio.output(6,gpio.HIGH)
-	else:
-		gpio.output(6,gpio.LOW)
+	GetBackend().Write(ModeLevels(STANDARD_MODE_PINS, mode_pattern))
 	return
 
 def AssertTestTXButton():
-	gpio.output(23,gpio.HIGH)
+	GetBackend().Write({TEST_TX_PIN: 1})
 	return
 
 def ReleaseTestTXButton():
-	gpio.output(23,gpio.LOW)
-	return
\ No newline at end of file
+	GetBackend().Write({TEST_TX_PIN: 0})
+	return
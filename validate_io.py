@@ -0,0 +1,147 @@
+# validate_io.py
+# Python3
+# Support validate.py
+# One I/O thread serving any number of KISS serial ports through selectors
+# 18 Oct 2026
+#
+# Each port's decoded frames go into a bounded FrameRing instead of an
+# unbounded queue.Queue. When a ring is full the oldest frame is dropped and
+# counted, so a stalled consumer can never exhaust memory. Stop() wakes the
+# loop through a pipe, so shutdown does not wait out any read timeout.
+
+import os
+import time
+import queue
+import selectors
+import threading
+import collections
+import validate_serial_functions as vserial
+
+READ_SIZE = 4096
+
+class FrameRing:
+	"""
+	Bounded FIFO of frames with the parts of the queue.Queue interface the
+	harness uses: put, get, get_nowait, empty and qsize. put never blocks;
+	if the ring holds capacity frames the oldest is dropped and counted in
+	overflows.
+	"""
+	def __init__(self, capacity=4096):
+		self.capacity = capacity
+		self.frames = collections.deque(maxlen=capacity)
+		self.ready = threading.Condition()
+		self.overflows = 0
+		self.total = 0
+
+	def put(self, frame):
+		with self.ready:
+			if len(self.frames) == self.capacity:
+				self.overflows += 1
+			self.frames.append(frame)
+			self.total += 1
+			self.ready.notify()
+
+	def get(self, block=True, timeout=None):
+		with self.ready:
+			if block and not self.ready.wait_for(lambda: self.frames, timeout):
+				raise queue.Empty
+			if not self.frames:
+				raise queue.Empty
+			return self.frames.popleft()
+
+	def get_nowait(self):
+		return self.get(block=False)
+
+	def empty(self):
+		return not self.frames
+
+	def qsize(self):
+		return len(self.frames)
+
+class KISSPort:
+	"""
+	A serial port (anything with fileno()) whose KISS stream the IOLoop
+	splits into frames for ring. on_read, if given, is called with every
+	chunk read and its time.monotonic_ns().
+	"""
+	def __init__(self, name, serial_port, ring, on_read=None):
+		self.name = name
+		self.serial_port = serial_port
+		self.ring = ring
+		self.on_read = on_read
+		self.fd = serial_port.fileno()
+		self.buffer = b''
+		self.bytes_read = 0
+		self.open = True
+
+	def Read(self):
+		# Only called once the selector reports the port readable, so the read returns at once.
+		try:
+			data = os.read(self.fd, READ_SIZE)
+		except BlockingIOError:
+			return True
+		except OSError:
+			return False
+		if not data:
+			return False
+		read_time = time.monotonic_ns()
+		self.bytes_read += len(data)
+		if self.on_read is not None:
+			self.on_read(data, read_time)
+		if vserial.FEND not in data:
+			self.buffer += data
+			return True
+		frames, self.buffer = vserial.SplitKISSFrames(self.buffer + data, read_time)
+		for frame in frames:
+			self.ring.put(frame)
+		return True
+
+class IOLoop:
+	"""
+	Reads every added port on one thread. Start() after adding the ports,
+	Stop() before closing them.
+	"""
+	def __init__(self):
+		self.selector = selectors.DefaultSelector()
+		self.ports = []
+		self.wake_read, self.wake_write = os.pipe()
+		self.selector.register(self.wake_read, selectors.EVENT_READ, None)
+		self.thread = None
+		self.running = False
+
+	def Add(self, name, serial_port, ring, on_read=None):
+		port = KISSPort(name, serial_port, ring, on_read)
+		self.ports.append(port)
+		self.selector.register(port.fd, selectors.EVENT_READ, port)
+		return port
+
+	def Start(self):
+		self.running = True
+		self.thread = threading.Thread(target=self.Run, daemon=True)
+		self.thread.start()
+
+	def Run(self):
+		while self.running:
+			for key, events in self.selector.select():
+				port = key.data
+				if port is None:
+					# Woken by Stop().
+					self.running = False
+					break
+				if not port.Read():
+					# Port closed or failed; stop watching it.
+					port.open = False
+					self.selector.unregister(port.fd)
+
+	def Stop(self):
+		if self.thread is not None:
+			os.write(self.wake_write, b'\x00')
+			self.thread.join()
+			self.thread = None
+		self.selector.close()
+		os.close(self.wake_read)
+		os.close(self.wake_write)
+
+	def Statistics(self):
+		# (name, bytes read, frames received, frames dropped) per port.
+		return [(port.name, port.bytes_read, port.ring.total, port.ring.overflows) for port in self.ports]
@@ -0,0 +1,59 @@
+# validate_latency.py
+# Python3
+# Support validate.py
+# Latency from stimulus (TEST_TX press, KISS write, audio start) to KISS frame arrival
+# 18 Oct 2026
+#
+# Stimuli and received frames are both stamped with time.monotonic_ns(). Each
+# sample is kept with the theoretical airtime of its frame, so the report
+# shows how much of the latency is key-up, decode and USB delivery rather
+# than time on air. Kinds of sample:
+#   button_usb       TEST_TX press to the TEST device's USB test packet
+#   button_loopback  TEST_TX press to the TEST device's loopback decode
+#   button_air       TEST_TX press to the STANDARD device's decode
+#   kiss_air         KISS frame written to TEST to the STANDARD device's decode
+#   audio_test       track start to the TEST device's first decode
+#   audio_standard   track start to the STANDARD device's first decode
+
+import validate_clock as vclock
+
+def Percentile(ordered, fraction):
+	# Nearest-rank percentile of an already sorted list.
+	if not ordered:
+		return None
+	return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+class LatencyRecorder:
+	def __init__(self):
+		# (mode name, kind): [(latency seconds, airtime seconds)]
+		self.samples = {}
+
+	def Record(self, mode_name, kind, stimulus_ns, frame, airtime):
+		"""
+		Records the latency from stimulus_ns to the arrival of frame, a
+		validate_serial_functions.KISSFrame. Frames without a timestamp are
+		ignored. Latencies are in harness seconds, like airtime.
+		"""
+		time_ns = getattr(frame, 'time_ns', None)
+		if time_ns is None or stimulus_ns is None:
+			return
+		latency = (time_ns - stimulus_ns) * vclock.time_scale / 1e9
+		self.samples.setdefault((mode_name, kind), []).append((latency, airtime))
+
+	def Summary(self):
+		"""
+		Returns (mode name, kind, count, min, p50, p99, median airtime) rows,
+		all times in seconds.
+		"""
+		rows = []
+		for (mode_name, kind), samples in sorted(self.samples.items()):
+			latencies = sorted(latency for latency, airtime in samples)
+			airtimes = sorted(airtime for latency, airtime in samples)
+			rows.append((mode_name, kind, len(latencies), latencies[0], Percentile(latencies, 0.5), Percentile(latencies, 0.99), Percentile(airtimes, 0.5)))
+		return rows
+
+	def Report(self):
+		lines = [f"{'mode':<18}{'latency':<18}{'n':>4}{'min ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'airtime':>10}{'p50-air':>10}"]
+		for mode_name, kind, count, minimum, p50, p99, airtime in self.Summary():
+			lines.append(f"{mode_name:<18}{kind:<18}{count:>4}{minimum * 1e3:>10.1f}{p50 * 1e3:>10.1f}{p99 * 1e3:>10.1f}{airtime * 1e3:>10.1f}{(p50 - airtime) * 1e3:>10.1f}")
+		return lines
@@ -0,0 +1,195 @@
+# validate_manifest.py
+# Python3
+# Support validate.py
+# Index of the modem-test-audio corpus: WAV format, duration, checksum and contents of every track
+# 18 Oct 2026
+#
+# Build or refresh the index, hashing only new or changed files:
+#   python3 validate_manifest.py build /home/pi/github/modem-test-audio/
+# Check the tracks a run needs against it:
+#   python3 validate_manifest.py check /home/pi/github/modem-test-audio/ --modes PSK
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+import validate_modes as vmodes
+
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+def HashFile(path):
+	# hashlib and validate_audio are only imported when a track has to be read,
+	# which keeps planning a run (validate.py --dry-run) fast.
+	import hashlib
+	digest = hashlib.sha256()
+	with open(path, 'rb') as file:
+		for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+			digest.update(block)
+	return digest.hexdigest()
+
+def DescribeTrack(root, track):
+	"""
+	Reads one track and returns its manifest entry. problem is None for a
+	usable track, otherwise it says what is wrong with the file.
+	"""
+	import validate_audio as vaudio
+	path = os.path.join(root, track)
+	status = os.stat(path)
+	packet_bytes, packet_count = vmodes.TrackPacketInfo(track)
+	entry = {"size": status.st_size, "mtime_ns": status.st_mtime_ns, "sha256": HashFile(path),
+		"mode": vmodes.TrackModeName(track), "packet_bytes": packet_bytes, "packet_count": packet_count,
+		"noise_level": vmodes.TrackNoiseLevel(track), "problem": None}
+	try:
+		with open(path, 'rb') as file:
+			data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			wav_format, data_offset, data_length = vaudio.ParseWavHeader(data)
+			declared_length = struct.unpack_from('<I', data, data_offset - 4)[0]
+		finally:
+			data.close()
+	except (ValueError, struct.error, OSError) as error:
+		entry["problem"] = str(error) or "Unreadable WAV header"
+		return entry
+	entry.update({"channels": wav_format.channels, "sample_rate": wav_format.sample_rate,
+		"bits_per_sample": wav_format.bits_per_sample, "data_offset": data_offset,
+		"data_length": data_length, "duration": data_length / wav_format.byte_rate})
+	if declared_length not in (0, 0xFFFFFFFF) and declared_length > data_length + wav_format.frame_bytes:
+		entry["problem"] = f"Truncated, {data_length} of {declared_length} data bytes present"
+	elif data_length == 0:
+		entry["problem"] = "No audio data"
+	return entry
+
+class Manifest:
+	"""
+	Track entries keyed by path relative to the corpus root, with '/'
+	separators as in validate_modes.MODE_TABLE.
+	"""
+	def __init__(self, root, tracks=None):
+		self.root = root
+		self.tracks = tracks if tracks is not None else {}
+
+	@classmethod
+	def Load(cls, index_file, root):
+		# A missing, unreadable or outdated index gives an empty manifest.
+		try:
+			with open(index_file) as f:
+				index = json.load(f)
+		except (OSError, ValueError):
+			return cls(root)
+		if index.get("version") != MANIFEST_VERSION:
+			return cls(root)
+		return cls(root, index.get("tracks", {}))
+
+	def Save(self, index_file):
+		with open(index_file, 'w') as f:
+			json.dump({"version": MANIFEST_VERSION, "root": self.root, "tracks": self.tracks}, f, indent=1, sort_keys=True)
+
+	def IsCurrent(self, track, status):
+		entry = self.tracks.get(track)
+		return entry is not None and entry["size"] == status.st_size and entry["mtime_ns"] == status.st_mtime_ns
+
+	def Refresh(self, track):
+		"""
+		Stats track and re-reads it only if it is new or its size or mtime
+		changed. Returns its entry, or None if the file does not exist.
+		"""
+		try:
+			status = os.stat(os.path.join(self.root, track))
+		except OSError:
+			self.tracks.pop(track, None)
+			return None
+		if not self.IsCurrent(track, status):
+			self.tracks[track] = DescribeTrack(self.root, track)
+		return self.tracks[track]
+
+	def Scan(self):
+		"""
+		Brings the whole corpus into the manifest. Returns the number of
+		files that had to be read.
+		"""
+		found = set()
+		read_count = 0
+		for directory, subdirectories, files in os.walk(self.root):
+			subdirectories[:] = [name for name in subdirectories if not name.startswith('.')]
+			for name in files:
+				if not name.lower().endswith('.wav'):
+					continue
+				track = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/')
+				found.add(track)
+				status = os.stat(os.path.join(directory, name))
+				if not self.IsCurrent(track, status):
+					self.tracks[track] = DescribeTrack(self.root, track)
+					read_count += 1
+		for track in set(self.tracks) - found:
+			del self.tracks[track]
+		return read_count
+
+	def Check(self, tracks):
+		"""
+		Refreshes each of tracks and returns a list of (track, problem) for
+		those that are missing or unusable.
+		"""
+		problems = []
+		for track in sorted(set(tracks)):
+			entry = self.Refresh(track)
+			if entry is None:
+				problems.append((track, "Missing"))
+			elif entry["problem"]:
+				problems.append((track, entry["problem"]))
+		return problems
+
+	def Duration(self, track):
+		entry = self.tracks.get(track)
+		if entry is None:
+			return None
+		return entry.get("duration")
+
+manifest = None
+
+def UseManifest(new_manifest):
+	global manifest
+	manifest = new_manifest
+
+def TrackDuration(track):
+	# Exact playing time of track from the manifest in use, or None.
+	if manifest is None:
+		return None
+	return manifest.Duration(track)
+
+def RequiredTracks(cases):
+	return [case.Track() for case in cases if case.Track() is not None]
+
+def main():
+	import validate_tests as vtests
+	parser = argparse.ArgumentParser(description="Index the modem-test-audio corpus.")
+	parser.add_argument("command", choices=["build", "check"])
+	parser.add_argument("root")
+	parser.add_argument("--index", default="track_manifest.json")
+	parser.add_argument("--modes", default="")
+	parser.add_argument("--phases", default="burst,awgn")
+	args = parser.parse_args()
+	index = Manifest.Load(args.index, args.root)
+	if args.command == "build":
+		read_count = index.Scan()
+		index.Save(args.index)
+		bad = [(track, entry["problem"]) for track, entry in sorted(index.tracks.items()) if entry["problem"]]
+		print(f"{len(index.tracks)} tracks indexed, {read_count} read, {len(bad)} unusable.")
+	else:
+		try:
+			modes = vmodes.MODE_TABLE.Select(args.modes.split(",")) if args.modes else None
+			cases = vtests.BuildRegistry(vmodes.MODE_TABLE, [name.strip() for name in args.phases.split(",") if name.strip()], modes)
+		except ValueError as error:
+			print(error)
+			return 2
+		bad = index.Check(RequiredTracks(cases))
+		index.Save(args.index)
+		print(f"{len(set(RequiredTracks(cases)))} tracks checked, {len(bad)} unusable.")
+	for track, problem in bad:
+		print(f"{track}: {problem}")
+	return 1 if bad else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,129 @@
+# validate_match.py
+# Python3
+# Support validate.py
+# Match the packets decoded by the TEST and STANDARD devices from one track
+# 18 Oct 2026
+
+import crc
+import validate_clock as vclock
+import validate_packet_functions as vpacket
+
+def FrameKeys(frames):
+	"""
+	Returns one (CRC, payload hash) key per frame. The CRC covers the whole
+	frame and the payload hash guards against CRC collisions. Large lists
+	of frames have their CRCs computed in one batch.
+	"""
+	if len(frames) >= vpacket.BATCH_CRC_MIN_FRAMES:
+		crcs = [int(fcs) for fcs in crc.CalcCRC16Batch(frames)]
+	else:
+		crcs = [crc.CRC16(frame) for frame in frames]
+	return [(crcs[index], hash(bytes(frame[vpacket.AX25Frame(frame).payload_offset:]))) for index, frame in enumerate(frames)]
+
+class LossMap:
+	"""
+	Per-packet comparison of one track. positions maps each distinct packet
+	heard by either device to its position, from 1, and missed, extra and
+	duplicates hold positions:
+	  missed             heard by STANDARD but not by TEST
+	  extra              heard by TEST but not by STANDARD
+	  test_duplicates    heard more than once by TEST
+	  standard_duplicates heard more than once by STANDARD
+	With timed set, positions are packet numbers within the track and
+	packet_count is the number of packets in it; otherwise they are decode
+	order, and packets neither device heard have no position.
+	Tracks that repeat identical packets can only be compared by count.
+	"""
+	def __init__(self, positions, test_counts, standard_counts, timed=False, packet_count=None):
+		self.positions = positions
+		self.test_counts = test_counts
+		self.standard_counts = standard_counts
+		self.timed = timed
+		self.packet_count = packet_count
+		self.matched = sorted(positions[key] for key in test_counts if key in standard_counts)
+		self.missed = sorted(positions[key] for key in standard_counts if key not in test_counts)
+		self.extra = sorted(positions[key] for key in test_counts if key not in standard_counts)
+		self.test_duplicates = sorted(positions[key] for key, count in test_counts.items() if count > 1)
+		self.standard_duplicates = sorted(positions[key] for key, count in standard_counts.items() if count > 1)
+
+	def Map(self):
+		"""
+		One character per position: '.' both, 'M' missed by TEST, '+' TEST
+		only and, on a timed map, '-' heard by neither.
+		"""
+		length = max(list(self.positions.values()) + [self.packet_count or 0])
+		marks = ['-'] * length
+		for position in self.matched:
+			marks[position - 1] = '.'
+		for position in self.missed:
+			marks[position - 1] = 'M'
+		for position in self.extra:
+			marks[position - 1] = '+'
+		return ''.join(marks)
+
+	def Order(self):
+		return "track position" if self.timed else "decode order"
+
+	def Summary(self):
+		return (f"{len(self.matched)} matched, {len(self.missed)} missed by TEST {self.missed}, "
+			f"{len(self.extra)} heard only by TEST {self.extra}, "
+			f"{len(self.test_duplicates)} TEST and {len(self.standard_duplicates)} STANDARD duplicates")
+
+def OrderedCounts(keys):
+	# Occurrence counts in first-arrival order (dicts keep insertion order).
+	counts = {}
+	for key in keys:
+		counts[key] = counts.get(key, 0) + 1
+	return counts
+
+def TrackPositions(test_frames, standard_frames, keys, start_ns, packet_time, packet_count=None):
+	"""
+	Position of each key in the track, from the first arrival of its frame:
+	packet n is decoded once it has been played, n packet_time harness
+	seconds after start_ns. Returns None if a frame has no arrival time, or
+	if arrivals are too uneven to give every packet its own position.
+	"""
+	arrivals = {}
+	for frame, key in zip(list(test_frames) + list(standard_frames), keys):
+		time_ns = getattr(frame, 'time_ns', None)
+		if time_ns is None:
+			return None
+		arrivals[key] = min(arrivals.get(key, time_ns), time_ns)
+	positions = {}
+	for key, time_ns in arrivals.items():
+		position = max(1, round((time_ns - start_ns) * vclock.time_scale / 1e9 / packet_time))
+		positions[key] = min(position, packet_count) if packet_count else position
+	if len(set(positions.values())) < len(positions):
+		return None
+	return positions
+
+def MatchFrames(test_frames, standard_frames, start_ns=None, packet_time=None, packet_count=None):
+	"""
+	Joins the frames each device decoded from one track by key, in time
+	linear in the number of frames. Given the track's start_ns, in
+	time.monotonic_ns(), and packet_time in harness seconds, each packet's
+	position in the track comes from its arrival time. Otherwise packets
+	are numbered in the STANDARD device's arrival order, with packets only
+	TEST heard placed after the last packet both heard before them.
+	Returns a LossMap.
+	"""
+	test_keys = FrameKeys(test_frames)
+	standard_keys = FrameKeys(standard_frames)
+	test_counts = OrderedCounts(test_keys)
+	standard_counts = OrderedCounts(standard_keys)
+	if start_ns is not None and packet_time:
+		positions = TrackPositions(test_frames, standard_frames, test_keys + standard_keys, start_ns, packet_time, packet_count)
+		if positions is not None:
+			return LossMap(positions, test_counts, standard_counts, True, packet_count)
+	ranks = {key: (rank, 0) for rank, key in enumerate(standard_counts)}
+	anchor = -1
+	offset = 0
+	for key in test_counts:
+		if key in ranks:
+			anchor = ranks[key][0]
+			offset = 0
+		else:
+			offset += 1
+			ranks[key] = (anchor, offset)
+	positions = {key: position for position, key in enumerate(sorted(ranks, key=ranks.get), 1)}
+	return LossMap(positions, test_counts, standard_counts)
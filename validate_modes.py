@@ -0,0 +1,129 @@
+# validate_modes.py
+# Python3
+# Support validate.py
+# Table of N9600A MODE switch settings and the test material used for each
+# 18 Oct 2026
+
+class Mode:
+	"""
+	One MODE switch setting. pattern is the value driven onto MODE3..MODE0,
+	beacon_mode is the STANDARD device mode used to hear beacons sent in this
+	mode, or -1 if the beacon test does not apply.
+	"""
+	def __init__(self, pattern, name, bit_rate, burst_track, awgn_track, beacon_mode):
+		self.pattern = pattern
+		self.name = name
+		self.bit_rate = bit_rate
+		self.burst_track = burst_track
+		self.awgn_track = awgn_track
+		self.beacon_mode = beacon_mode
+
+	def __repr__(self):
+		return f"Mode({self.pattern}, {self.name})"
+
+def TrackPacketInfo(track):
+	"""
+	Returns (packet_bytes, packet_count) parsed from a modem-test-audio track
+	name, e.g. "2_burst/AFSK_1200_AX25_50b_10x.wav" gives (50, 10) and
+	"4_multiple_awgn/AFSK_1200_AX25_50b_50m_a3.wav" gives (50, 50). Missing
+	fields are None.
+	"""
+	packet_bytes = None
+	packet_count = None
+	for field in track.rsplit('/', 1)[-1].rsplit('.', 1)[0].split('_'):
+		if len(field) > 1 and field[:-1].isdigit():
+			if field[-1] == 'b' and packet_bytes is None:
+				packet_bytes = int(field[:-1])
+			elif field[-1] in 'xm' and packet_count is None:
+				packet_count = int(field[:-1])
+	return packet_bytes, packet_count
+
+def TrackModeName(track):
+	# "2_burst/GFSK_9600_IL2Pc_255b_10x.wav" is a GFSK_9600_IL2Pc track.
+	return '_'.join(track.rsplit('/', 1)[-1].split('_')[:3])
+
+def TrackNoiseLevel(track):
+	# The AWGN level of a "_a3" track, or None for a clean track.
+	for field in track.rsplit('/', 1)[-1].rsplit('.', 1)[0].split('_'):
+		if len(field) > 1 and field[0] == 'a' and field[1:].isdigit():
+			return int(field[1:])
+	return None
+
+def TrackEbN0(track):
+	# The Eb/N0 in dB of a validate_channel.py "_e8dB" variant, or None.
+	for field in track.rsplit('/', 1)[-1].rsplit('.', 1)[0].split('_'):
+		if len(field) > 3 and field[0] == 'e' and field.endswith('dB'):
+			try:
+				return float(field[1:-2])
+			except ValueError:
+				pass
+	return None
+
+def FrameAirtime(frame_bytes, bit_rate, frame_overhead=30):
+	# Seconds on air of one frame, with frame_overhead bytes of preamble, flags and FCS.
+	return (frame_bytes + frame_overhead) * 8 / bit_rate
+
+def TrackAirtime(track, bit_rate, frame_overhead=30, spacing=1.25):
+	"""
+	Rough playing time in seconds of a track: each packet plus frame_overhead
+	bytes of header, FCS and flags at bit_rate, stretched by spacing for
+	preambles and gaps between packets.
+	"""
+	packet_bytes, packet_count = TrackPacketInfo(track)
+	if packet_bytes is None or packet_count is None:
+		return None
+	return packet_count * (packet_bytes + frame_overhead) * 8 * spacing / bit_rate
+
+class ModeTable:
+	def __init__(self, modes):
+		self.modes = list(modes)
+		self.by_name = {mode.name: mode for mode in self.modes}
+
+	def __iter__(self):
+		return iter(self.modes)
+
+	def __len__(self):
+		return len(self.modes)
+
+	def __getitem__(self, pattern):
+		return self.modes[pattern]
+
+	def Select(self, selectors):
+		"""
+		Returns the modes matching any of selectors, in table order. A selector
+		is a MODE pattern number ("7"), an exact name ("AFSK_1200_AX25") or a
+		case-insensitive fragment of names ("PSK" selects BPSK, QPSK and DAPSK).
+		"""
+		selected = set()
+		for selector in selectors:
+			selector = selector.strip()
+			if not selector:
+				continue
+			if selector.isdigit():
+				matches = [self.modes[int(selector)]] if int(selector) < len(self.modes) else []
+			elif selector in self.by_name:
+				matches = [self.by_name[selector]]
+			else:
+				matches = [mode for mode in self.modes if selector.upper() in mode.name.upper()]
+			if not matches:
+				raise ValueError(f"No mode matches '{selector}'")
+			selected.update(mode.pattern for mode in matches)
+		return [mode for mode in self.modes if mode.pattern in selected]
+
+MODE_TABLE = ModeTable([
+	Mode(0, "GFSK_9600_AX25", 9600, "2_burst/GFSK_9600_AX25_255b_10x.wav", "4_multiple_awgn/GFSK_9600_AX25_50b_50m_a1.wav", 6),
+	Mode(1, "GFSK_9600_IL2P", 9600, "2_burst/GFSK_9600_IL2P_255b_10x.wav", "4_multiple_awgn/GFSK_9600_IL2Pc_50b_50m_a1.wav", 6),
+	Mode(2, "GFSK_9600_IL2Pc", 9600, "2_burst/GFSK_9600_IL2Pc_255b_10x.wav", "4_multiple_awgn/GFSK_9600_IL2Pc_50b_50m_a1.wav", 6),
+	Mode(3, "GFSK_4800_IL2P", 4800, "2_burst/GFSK_4800_IL2P_255b_10x.wav", "4_multiple_awgn/GFSK_4800_IL2Pc_50b_50m_a2.wav", 6),
+	Mode(4, "GFSK_4800_IL2Pc", 4800, "2_burst/GFSK_4800_IL2Pc_255b_10x.wav", "4_multiple_awgn/GFSK_4800_IL2Pc_50b_50m_a2.wav", 6),
+	Mode(5, "DAPSK_2400_IL2P", 2400, "2_burst/DAPSK_2400_IL2P_50b_10x.wav", "4_multiple_awgn/DAPSK_2400_IL2P_50b_50m_a2.wav", 6),
+	Mode(6, "AFSK_1200_AX25", 1200, "2_burst/AFSK_1200_AX25_50b_10x.wav", "4_multiple_awgn/AFSK_1200_AX25_50b_50m_a3.wav", -1),
+	Mode(7, "AFSK_1200_IL2P", 1200, "2_burst/AFSK_1200_IL2P_50b_10x.wav", "4_multiple_awgn/AFSK_1200_IL2P_50b_50m_a3.wav", 6),
+	Mode(8, "BPSK_300_IL2Pc", 300, "2_burst/BPSK_300_IL2Pc_50b_10x.wav", "4_multiple_awgn/BPSK_300_IL2Pc_50b_50m_a4.wav", 12),
+	Mode(9, "QPSK_600_IL2Pc", 600, "2_burst/QPSK_600_IL2Pc_50b_10x.wav", "4_multiple_awgn/QPSK_600_IL2Pc_50b_50m_a4.wav", 12),
+	Mode(10, "BPSK_1200_IL2Pc", 1200, "2_burst/BPSK_1200_IL2Pc_50b_10x.wav", "4_multiple_awgn/BPSK_1200_IL2Pc_50b_50m_a3.wav", 12),
+	Mode(11, "QPSK_2400_IL2Pc", 2400, "2_burst/QPSK_2400_IL2Pc_50b_10x.wav", "4_multiple_awgn/QPSK_2400_IL2Pc_50b_50m_a5.wav", 12),
+	Mode(12, "AFSK_300_AX25", 300, "2_burst/AFSK_300_AX25_50b_10x.wav", "4_multiple_awgn/AFSK_300_AX25_50b_50m_a4.wav", -1),
+	Mode(13, "AFSK_300_IL2P", 300, "2_burst/AFSK_300_IL2P_50b_10x.wav", "4_multiple_awgn/AFSK_300_IL2P_50b_50m_a4.wav", -1),
+	Mode(14, "AFSK_300_IL2Pc", 300, "2_burst/AFSK_300_IL2Pc_50b_10x.wav", "4_multiple_awgn/AFSK_300_IL2Pc_50b_50m_a4.wav", -1),
+	Mode(15, "BPSK_1200_IL2P", 1200, "2_burst/BPSK_1200_IL2P_50b_10x.wav", "4_multiple_awgn/BPSK_1200_IL2P_50b_50m_a3.wav", 12) ])
@@ -5,232 +5,308 @@
 # 20 Jan 2024
 
 import random
+import functools
 import crc
+import ax25_address
 
 def GetCRC(packet):
 	return crc.CalcCRC16(packet)
 
-def GetFrameMeta(packet):
-	this = {}
-	this['CRC'] = crc.CalcCRC16(packet)
-	count = len(packet)
-	index = 0
-	if (count > 14):
-		valid_header = 1
-		address_extension_bit = 0
-		index = 0
-		subfield_character_index = 0
-		subfield_index = 0
-		while address_extension_bit == 0:
-			working_character = int(packet[index])
-			if (working_character & 0b1) == 1:
-				address_extension_bit = 1
-			working_character = working_character >> 1
-			subfield_character_index = subfield_character_index + 1
-			if (subfield_character_index == 1):
-				buffer = ""
-				if (subfield_index == 0):
-					#print("To:", end='')
-					tag = "DEST"
-				elif (subfield_index == 1):
-					tag = "SOURCE"
-				else:
-					tag = "VIA" + str(subfield_index - 1)
-			if subfield_character_index < 7:
-				# This is a callsign character
-				if (working_character != 0) and (working_character != 0x20):
-					buffer += chr(working_character)
-			elif subfield_character_index == 7:
-				# This is the SSID characters
-				# Get bits
-				buffer += '-'
-				buffer += chr((working_character & 0b1111) + 0x30)
-				if (working_character & 0b10000000):
-					# C or H bit is set
-					buffer += '*'
-				# This field is complete
-				this[f'{tag}'] = buffer
-				subfield_character_index = 0
-				subfield_index = subfield_index + 1
-			index = index + 1
-			if index > count:
-				address_extension_bit = 1
-		# Control and PID fields
-		working_character = packet[index]
-		this['Control'] = working_character
-		poll_final_bit = (working_character & 0x10) >> 4
-		# determine what type of packet this is
-		if (working_character & 1) == 1:
-			# either a Supervisory or Unnumbered packet
-			frame_type = working_character & 3
-		else:
+def _BuildControlStrings():
+	u_frame_names = {0x6F: "SABME", 0x2F: "SABM", 0x43: "DISC", 0x0F: "DM", 0x63: "UA",
+		0x87: "FRMR", 0x03: "UI", 0xAF: "XID", 0xE3: "TEST"}
+	s_frame_names = ("RR", "RNR", "REJ", "SREJ")
+	control_strings = []
+	for control in range(256):
+		if (control & 1) == 0:
 			# Information packet
-			frame_type = 0
-			ax25_ns = (working_character >> 1) & 7
-			ax25_nr = (working_character >> 5) & 7
-
-		if frame_type == 1:
+			control_strings.append("I")
+		elif (control & 3) == 1:
 			# Supervisory packet
-			ax25_nr = (working_character >> 5) & 7
-
-		if frame_type == 3:
-			# Unnumbered packet, determine what type
-			ax25_u_control_field_type = working_character & 0xEF
+			control_strings.append(s_frame_names[(control >> 2) & 3])
 		else:
-			ax25_u_control_field_type = 0
-
-		if (ax25_u_control_field_type == 0x6F):
-			buffer = "SABME"
-		elif (ax25_u_control_field_type == 0x2F):
-			buffer = "SABM"
-		elif (ax25_u_control_field_type == 0x43):
-			buffer = "DISC"
-		elif (ax25_u_control_field_type == 0x0F):
-			buffer = "DM"
-		elif (ax25_u_control_field_type == 0x63):
-			buffer = "UA"
-		elif (ax25_u_control_field_type == 0x87):
-			buffer = "FRMR"
-		elif (ax25_u_control_field_type == 0x03):
-			buffer = "UI"
-		elif (ax25_u_control_field_type == 0xAF):
-			buffer = "XID"
-		elif (ax25_u_control_field_type == 0xE3):
-			buffer = "TEST"
-		this['ControlString'] = buffer
-
-		if (frame_type == 0) or (ax25_u_control_field_type == 3):
-			# This is an Information packet, or an Unnumbered Information packet, so
-			# there is a PID byte.
-			index = index + 1
-			working_character = packet[index]
-			this['PID'] = working_character
-			if (working_character == 1):
-				buffer = "ISO 8208"
-			if (working_character == 6):
-				buffer = "Compressed TCP/IP"
-			if (working_character == 7):
-				buffer = "Uncompressed TCP/IP"
-			if (working_character == 8):
-				buffer = "Segmentation Fragment"
-			if (working_character == 0xC3):
-				buffer = "TEXNET"
-			if (working_character == 0xC4):
-				buffer = "Link Quality Protocol"
-			if (working_character == 0xCA):
-				buffer = "Appletalk"
-			if (working_character == 0xCC):
-				buffer = "ARPA Internet Protocol"
-			if (working_character == 0xCD):
-				pbuffer = "ARPA Address Resolution"
-			if (working_character == 0xCF):
-				buffer = "TheNET (NET/ROM)"
-			if (working_character == 0xF0):
-				buffer = "No Layer 3"
-			if (working_character == 0xFF):
-				buffer = "Escape"
-			this['PIDString'] = buffer
-
-		index = index + 1
-		this['Payload'] = bytearray(packet[index:])
-	return this
+			# Unnumbered packet, ignore the poll/final bit
+			control_strings.append(u_frame_names.get(control & 0xEF, "U"))
+	return tuple(control_strings)
+
+CONTROL_STRINGS = _BuildControlStrings()
+
+# Information and Unnumbered Information packets carry a PID byte.
+CONTROL_HAS_PID = tuple(((control & 1) == 0) or ((control & 0xEF) == 0x03) for control in range(256))
+
+PID_STRINGS = {
+	0x01: "ISO 8208",
+	0x06: "Compressed TCP/IP",
+	0x07: "Uncompressed TCP/IP",
+	0x08: "Segmentation Fragment",
+	0xC3: "TEXNET",
+	0xC4: "Link Quality Protocol",
+	0xCA: "Appletalk",
+	0xCC: "ARPA Internet Protocol",
+	0xCD: "ARPA Address Resolution",
+	0xCF: "TheNET (NET/ROM)",
+	0xF0: "No Layer 3",
+	0xFF: "Escape" }
+
+class AX25Frame:
+	"""
+	Read-only view over the raw bytes of an AX.25 frame. Addresses and CRC are
+	decoded on first access and cached. Indexing with the GetFrameMeta keys
+	('DEST', 'SOURCE', 'VIA1', 'Control', 'PID', 'Payload', 'CRC', ...) is
+	supported, raising KeyError for fields the frame does not have.
+	"""
+	__slots__ = ('raw', '_header_length', '_addresses', '_fcs')
+
+	def __init__(self, packet):
+		if not isinstance(packet, (bytes, bytearray, memoryview)):
+			packet = bytes(packet)
+		self.raw = memoryview(packet)
+		self._header_length = None
+		self._addresses = None
+		self._fcs = None
+
+	def __len__(self):
+		return len(self.raw)
+
+	@property
+	def header_length(self):
+		# Length of the address fields, 0 if the frame is too short to hold them.
+		if self._header_length is None:
+			raw = self.raw
+			count = len(raw)
+			header_length = 0
+			if count > 14:
+				index = 6
+				while index < count and not (raw[index] & 1):
+					index += 7
+				header_length = min(index + 1, count)
+			self._header_length = header_length
+		return self._header_length
+
+	@property
+	def addresses(self):
+		if self._addresses is None:
+			raw = self.raw
+			self._addresses = tuple(ax25_address.DecodeAddress(raw[index:index + 7]) for index in range(0, self.header_length - 6, 7))
+		return self._addresses
+
+	@property
+	def dest(self):
+		return self['DEST']
+
+	@property
+	def source(self):
+		return self['SOURCE']
+
+	@property
+	def digipeaters(self):
+		return self.addresses[2:]
+
+	@property
+	def control(self):
+		return self['Control']
+
+	@property
+	def control_string(self):
+		return self['ControlString']
+
+	@property
+	def pid(self):
+		return self.get('PID')
+
+	@property
+	def pid_string(self):
+		return self.get('PIDString')
+
+	@property
+	def payload_offset(self):
+		header_length = self.header_length
+		if header_length == 0:
+			return 0
+		if header_length < len(self.raw) and CONTROL_HAS_PID[self.raw[header_length]]:
+			return header_length + 2
+		return header_length + 1
+
+	@property
+	def payload(self):
+		return self['Payload']
+
+	@property
+	def fcs(self):
+		if self._fcs is None:
+			self._fcs = crc.CRC16(self.raw)
+		return self._fcs
+
+	@property
+	def crc(self):
+		return crc.CRC16String(self.fcs)
+
+	def __getitem__(self, key):
+		if key == 'CRC':
+			return self.crc
+		header_length = self.header_length
+		if header_length:
+			if key == 'SOURCE' or key == 'DEST' or key.startswith('VIA'):
+				addresses = self.addresses
+				if key == 'DEST':
+					return addresses[0]
+				elif key == 'SOURCE' and len(addresses) > 1:
+					return addresses[1]
+				elif key[3:].isdigit() and 0 < int(key[3:]) <= len(addresses) - 2:
+					return addresses[int(key[3:]) + 1]
+			elif header_length < len(self.raw):
+				control = self.raw[header_length]
+				if key == 'Control':
+					return control
+				elif key == 'ControlString':
+					return CONTROL_STRINGS[control]
+				elif key == 'Payload':
+					return bytearray(self.raw[self.payload_offset:])
+				elif CONTROL_HAS_PID[control] and header_length + 1 < len(self.raw):
+					pid = self.raw[header_length + 1]
+					if key == 'PID':
+						return pid
+					elif key == 'PIDString':
+						return PID_STRINGS.get(pid, "Unknown")
+		raise KeyError(key)
+
+	def get(self, key, default=None):
+		try:
+			return self[key]
+		except KeyError:
+			return default
+
+	def __contains__(self, key):
+		return self.get(key) is not None
+
+def GetFrameMeta(packet):
+	return AX25Frame(packet)
+
+# Below this many frames the table CRC of each frame beats importing numpy for a batch.
+BATCH_CRC_MIN_FRAMES = 1000
+
+def ParseFrames(packets):
+	"""
+	Parses a list of raw frames into a columnar summary: a dictionary with
+	the frame count and lists of SOURCE, DEST and CRC, one entry per frame.
+	Addresses missing from a short frame are None. CRCs of large lists are
+	computed in one batch.
+	"""
+	frames = [AX25Frame(packet) for packet in packets]
+	summary = {'Count': len(frames), 'Frames': frames, 'SOURCE': [], 'DEST': [], 'CRC': []}
+	if len(frames) >= BATCH_CRC_MIN_FRAMES:
+		for frame, fcs in zip(frames, crc.CalcCRC16Batch([frame.raw for frame in frames])):
+			frame._fcs = int(fcs)
+	for frame in frames:
+		summary['SOURCE'].append(frame.get('SOURCE'))
+		summary['DEST'].append(frame.get('DEST'))
+		summary['CRC'].append(frame.crc)
+	return summary
 
 
 def StringCallsignToArray(input_string):
-	output = [0x20, 0x20, 0x20, 0x20, 0x20, 0x20, 0]
-	callsign_length = 0
-	ssid_digits = 0
-	ssid = [0,0]
-	currently_reading = 'callsign'
-	input_string = input_string.upper()
-	input_string = bytes(input_string, 'UTF-8')
-	for character in input_string:
-		if currently_reading == 'callsign':
-			if character == bytes('-', 'UTF-8')[0]:
-				currently_reading = 'ssid'
-			else:
-				output[callsign_length] = int(character)
-				callsign_length += 1
-				if callsign_length == 6:
-					currently_reading = 'hyphen'
-				# print(output)
-		elif currently_reading == 'hyphen':
-			if character != bytes('-', 'UTF-8')[0]:
-				pass
-			currently_reading = 'ssid'
-		elif currently_reading == 'ssid':
-			ssid[ssid_digits] = character - bytes('0', 'UTF-8')[0]
-			ssid_digits += 1
-			# print(ssid)
-	if ssid_digits == 1:
-		ssid = ssid[0]
-	elif ssid_digits == 2:
-		ssid = ssid[0] * 10 + ssid[1]
-	else:
-		ssid = 0
-	if ssid > 16:
-		ssid = 16
-	if ssid < 0:
-		ssid = 0
-	output[6] = ssid
+	callsign, ssid = ax25_address.ParseCallsign(input_string)
+	output = list(callsign)
+	output.append(ssid)
 	return output
 
+KISS_FEND = b'\xC0'
+KISS_FESC = b'\xDB'
+KISS_TFEND = b'\xDC'
+KISS_TFESC = b'\xDD'
+
+def EscapeKISS(packet):
+	packet = bytes(packet)
+	# FESC must be escaped first so the FESC bytes added for FEND are kept.
+	return packet.replace(KISS_FESC, KISS_FESC + KISS_TFESC).replace(KISS_FEND, KISS_FESC + KISS_TFEND)
+
 def EncodeKISSFrame(kiss_type_id, packet):
-	FESC = int(0xDB).to_bytes(1,'big')
-	FEND = int(0xC0).to_bytes(1,'big')
-	TFESC = int(0xDD).to_bytes(1,'big')
-	TFEND = int(0xDC).to_bytes(1,'big')
 	#KISS_PORT = 0
 	#KISS_COMMAND = 0
 	#KISS_TYPE_ID = (KISS_PORT * 16) + KISS_COMMAND
-	KISS_TYPE_ID = kiss_type_id.to_bytes(1,'big')
-	frame_index = 0
-	kiss_output_frame = bytearray()
-	while(frame_index < len(packet)):
-		kiss_byte = packet[frame_index]
-		if kiss_byte.to_bytes(1,'big') == FESC:
-			kiss_output_frame.extend(FESC)
-			kiss_output_frame.extend(TFESC)
-		elif kiss_byte.to_bytes(1, 'big') == FEND:
-			kiss_output_frame.extend(FESC)
-			kiss_output_frame.extend(TFEND)
-		else:
-			kiss_output_frame.extend(kiss_byte.to_bytes(1, 'big'))
-		frame_index += 1
-	kiss_output_frame = bytearray(FEND) + bytearray(KISS_TYPE_ID) + kiss_output_frame + bytearray(FEND)
+	escaped = EscapeKISS(packet)
+	kiss_output_frame = bytearray(len(escaped) + 3)
+	kiss_output_frame[0] = 0xC0
+	kiss_output_frame[1] = kiss_type_id
+	kiss_output_frame[2:-1] = escaped
+	kiss_output_frame[-1] = 0xC0
 	return kiss_output_frame
 
+def EncodeKISSFrames(kiss_type_id, packets):
+	"""
+	Encodes every packet in packets into one preallocated buffer of
+	back-to-back KISS frames, ready for a single serial write.
+	"""
+	escaped_packets = [EscapeKISS(packet) for packet in packets]
+	kiss_output = bytearray(sum(len(escaped) for escaped in escaped_packets) + (3 * len(escaped_packets)))
+	index = 0
+	for escaped in escaped_packets:
+		kiss_output[index] = 0xC0
+		kiss_output[index + 1] = kiss_type_id
+		index += 2
+		kiss_output[index:index + len(escaped)] = escaped
+		index += len(escaped)
+		kiss_output[index] = 0xC0
+		index += 1
+	return kiss_output
+
+# Maps a random byte onto the printable range 32..126. Bytes 190..255 would
+# make 32..97 more likely than 98..126, so they are deleted and drawn again.
+_PRINTABLE_TABLE = bytes(32 + (byte % 95) for byte in range(256))
+_UNEVEN_BYTES = bytes(range(190, 256))
+
+@functools.lru_cache(maxsize=256)
+def GetUIHeader(source_callsign_string, dest_callsign_string):
+	"""
+	Returns the 16 byte address, control and PID header of a UI packet from
+	source to dest. Headers are cached per callsign pair.
+	"""
+	header = bytearray(ax25_address.EncodeAddress(dest_callsign_string) + ax25_address.EncodeAddress(source_callsign_string))
+	# Destination SSID with CRR bits set
+	header[6] |= 0xE0
+	# Source SSID with Address Extension Bit and RR bits:
+	header[13] |= 0x61
+	# Control field for UI, PID for No Layer 3:
+	header += b'\x03\xF0'
+	return bytes(header)
+
+def RandomPrintableBytes(count, rng=random):
+	output = b''
+	while len(output) < count:
+		# About 3 in 4 random bytes are kept.
+		needed = count - len(output)
+		output += rng.randbytes(needed + (needed // 2) + 16).translate(_PRINTABLE_TABLE, _UNEVEN_BYTES)
+	return output[:count]
+
 def GenerateUIPacket(source_callsign_string, dest_callsign_string, payload, length):
-	source_callsign = StringCallsignToArray(source_callsign_string)
-	dest_callsign = StringCallsignToArray(dest_callsign_string)
-
-	# Assemble packet:
-	packet = bytearray()
-	# Add destination callsign, shifted left one bit:
-	for j in range(6):
-		packet.extend((dest_callsign[j]<<1).to_bytes(1,'big'))
-	# Add destination SSID with CRR bits set
-	packet.extend((((dest_callsign[6] & 0xF)<<1) | 0xE0).to_bytes(1,'big'))
-	# Add source callsign, shifted left one bit:
-	for k in range(6):
-		packet.extend((source_callsign[k]<<1).to_bytes(1,'big'))
-	# Add source SSID with Address Extension Bit and RR bits:
-	packet.extend((((source_callsign[6] & 0xF) << 1) | 0x61).to_bytes(1,'big'))
-
-	# Add Control field for UI:
-	packet.extend((0x03).to_bytes(1,'big'))
-	# Add PID for No Layer 3:
-	packet.extend((0xF0).to_bytes(1,'big'))
-
-	# convert payload string to byte array
+	# payload is padded with random printable characters up to length bytes.
 	payload = bytes(payload, 'UTF-8')
-	for character in payload:
-		packet.extend(character.to_bytes(1, 'big'))
-
+	packet = bytearray(GetUIHeader(source_callsign_string, dest_callsign_string))
+	packet += payload
 	random_count = length - len(payload)
 	if random_count > 0:
-		for j in range(0, length):
-			rand = random.randint(32,126)
-			packet.extend(bytearray(rand.to_bytes(1,'big')))
-
+		packet += RandomPrintableBytes(random_count)
 	return packet
+
+class UIPacketFactory:
+	"""
+	Builds UI packets from source to dest with payload padded to length
+	bytes of random printable characters. With a seed, the sequence of
+	generated packets is reproducible.
+	"""
+	def __init__(self, source_callsign_string, dest_callsign_string, payload="", length=0, seed=None):
+		self.header = GetUIHeader(source_callsign_string, dest_callsign_string)
+		self.payload = bytes(payload, 'UTF-8')
+		self.random_count = max(length - len(self.payload), 0)
+		self.rng = random.Random(seed)
+
+	def generate(self):
+		return self.header + self.payload + RandomPrintableBytes(self.random_count, self.rng)
+
+	def generate_many(self, n):
+		prefix = self.header + self.payload
+		random_count = self.random_count
+		if random_count == 0:
+			return [prefix] * n
+		fill = RandomPrintableBytes(random_count * n, self.rng)
+		return [prefix + fill[index:index + random_count] for index in range(0, random_count * n, random_count)]
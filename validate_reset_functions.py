@@ -0,0 +1,84 @@
+# validate_reset_functions.py
+# Python3
+# Support validate.py
+# Detect when the TNCs are back up after a MODE change, and learn per-mode reset times
+# 18 Oct 2026
+
+import os
+import json
+import queue
+import validate_clock as vclock
+import validate_packet_functions as vpacket
+
+class ResetTracker:
+	"""
+	Records how long each mode change took before both devices responded, and
+	turns the slowest observed time into a tighter reset timeout for that mode.
+	Modes that have never been measured get default_time.
+	"""
+	def __init__(self, default_time, margin=1.5, minimum_time=0.25, history_file=None):
+		self.default_time = default_time
+		self.margin = margin
+		self.minimum_time = minimum_time
+		self.history_file = history_file
+		self.history = {}
+		if history_file and os.path.exists(history_file):
+			try:
+				with open(history_file) as f:
+					self.history = json.load(f)
+			except (OSError, ValueError):
+				self.history = {}
+
+	def Key(self, test_mode, standard_mode):
+		return f"{test_mode}/{standard_mode}"
+
+	def Timeout(self, test_mode, standard_mode):
+		times = self.history.get(self.Key(test_mode, standard_mode))
+		if not times:
+			return self.default_time
+		return min(max(max(times) * self.margin, self.minimum_time), self.default_time)
+
+	def Record(self, test_mode, standard_mode, elapsed, keep=20):
+		times = self.history.setdefault(self.Key(test_mode, standard_mode), [])
+		times.append(round(elapsed, 4))
+		del times[:-keep]
+
+	def Save(self):
+		if self.history_file:
+			with open(self.history_file, 'w') as f:
+				json.dump(self.history, f, indent=1, sort_keys=True)
+
+def ProbeDevice(serial_port, q, probe_frame, timeout):
+	"""
+	Writes probe_frame to the device and waits up to timeout seconds for any
+	frame to come back on its queue. Returns True if the device answered.
+	"""
+	serial_port.write(probe_frame)
+	try:
+		q.get(timeout=vclock.RealTime(timeout))
+	except queue.Empty:
+		return False
+	return True
+
+def MakeTARPNstatProbe(source_callsign, dest_callsign):
+	# A TARPNstat UI frame makes the TNC send a meta-frame back to the host.
+	return vpacket.EncodeKISSFrame(0, vpacket.GenerateUIPacket(source_callsign, dest_callsign, " TARPNstat", 0))
+
+def WaitForReady(devices, timeout, holdoff=0.0, poll_interval=0.1):
+	"""
+	Probes each (serial_port, queue, probe_frame) device until every one has
+	answered. Probing starts after holdoff seconds, so a device that has not
+	yet noticed the MODE change is not mistaken for one that has finished
+	resetting. Returns the seconds taken since the call, or None if some
+	device had not answered after timeout seconds.
+	"""
+	start_time = vclock.Monotonic()
+	deadline = start_time + timeout
+	vclock.Sleep(min(holdoff, timeout))
+	pending = list(devices)
+	while pending:
+		remaining = deadline - vclock.Monotonic()
+		if remaining <= 0:
+			return None
+		pending = [device for device in pending if not ProbeDevice(device[0], device[1], device[2], min(poll_interval, remaining))]
+	return vclock.Monotonic() - start_time
@@ -0,0 +1,247 @@
+# validate_results.py
+# Python3
+# Support validate.py
+# SQLite store of validation results, and queries across runs
+# 18 Oct 2026
+#
+# validate.py records every run into results.db. To list the runs and find
+# regressions between two firmware builds, by run number or firmware label:
+#   python3 validate_results.py runs
+#   python3 validate_results.py compare 1.2.0 1.2.1
+#   python3 validate_results.py history burst:AFSK_1200_AX25
+
+import sys
+import time
+import queue
+import socket
+import sqlite3
+import argparse
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+	run_id INTEGER PRIMARY KEY,
+	started REAL NOT NULL,
+	firmware TEXT NOT NULL,
+	host TEXT NOT NULL,
+	note TEXT NOT NULL DEFAULT '');
+CREATE INDEX IF NOT EXISTS runs_firmware ON runs (firmware, run_id);
+CREATE TABLE IF NOT EXISTS cases (
+	run_id INTEGER NOT NULL REFERENCES runs (run_id),
+	name TEXT NOT NULL,
+	phase TEXT NOT NULL,
+	mode TEXT,
+	test_mode INTEGER NOT NULL,
+	standard_mode INTEGER NOT NULL,
+	verdict INTEGER,
+	test_count INTEGER,
+	standard_count INTEGER,
+	started REAL NOT NULL,
+	duration REAL NOT NULL,
+	PRIMARY KEY (run_id, name));
+CREATE INDEX IF NOT EXISTS cases_name ON cases (name, run_id);
+CREATE TABLE IF NOT EXISTS frames (
+	run_id INTEGER NOT NULL,
+	case_name TEXT NOT NULL,
+	position INTEGER NOT NULL,
+	crc INTEGER NOT NULL,
+	test_copies INTEGER NOT NULL,
+	standard_copies INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS frames_case ON frames (run_id, case_name);
+CREATE TABLE IF NOT EXISTS latency (
+	run_id INTEGER NOT NULL,
+	mode TEXT NOT NULL,
+	kind TEXT NOT NULL,
+	count INTEGER NOT NULL,
+	minimum REAL NOT NULL,
+	p50 REAL NOT NULL,
+	p99 REAL NOT NULL,
+	airtime REAL NOT NULL,
+	PRIMARY KEY (run_id, mode, kind));
+"""
+
+VERDICTS = {1: "PASS", 0: "FAIL", None: "-"}
+
+def Connect(path):
+	connection = sqlite3.connect(path)
+	connection.executescript(SCHEMA)
+	return connection
+
+class ResultsStore:
+	"""
+	Writes results to the SQLite database at path from a background thread,
+	so recording never holds up the test loop. Rows are queued and written
+	in batches of up to batch_size rows, one transaction per batch.
+	"""
+	def __init__(self, path, batch_size=500, flush_interval=0.5):
+		self.path = path
+		self.batch_size = batch_size
+		self.flush_interval = flush_interval
+		self.queue = queue.Queue()
+		self.error = None
+		# Create the schema here, so a bad path fails before the run starts.
+		Connect(path).close()
+		self.thread = threading.Thread(target=self.Writer, daemon=True)
+		self.thread.start()
+
+	def Writer(self):
+		connection = Connect(self.path)
+		running = True
+		while running:
+			batch = [self.queue.get()]
+			deadline = time.monotonic() + self.flush_interval
+			while len(batch) < self.batch_size:
+				try:
+					batch.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+				except queue.Empty:
+					break
+			if None in batch:
+				running = False
+			statements = {}
+			for item in batch:
+				if item is not None:
+					statements.setdefault(item[0], []).append(item[1])
+			try:
+				with connection:
+					for statement, rows in statements.items():
+						connection.executemany(statement, rows)
+			except sqlite3.Error as error:
+				self.error = error
+		connection.close()
+
+	def BeginRun(self, firmware, note=""):
+		# Written at once, since every later row needs the run_id.
+		connection = Connect(self.path)
+		with connection:
+			run_id = connection.execute("INSERT INTO runs (started, firmware, host, note) VALUES (?, ?, ?, ?)",
+				(time.time(), firmware, socket.gethostname(), note)).lastrowid
+		connection.close()
+		return run_id
+
+	def RecordCase(self, run_id, case, verdict, started, duration, loss_map=None):
+		"""
+		Queues the result of one validate_tests.TestCase, with the per-packet
+		results of its track if loss_map is given.
+		"""
+		test_count = None
+		standard_count = None
+		if loss_map is not None:
+			test_count = sum(loss_map.test_counts.values())
+			standard_count = sum(loss_map.standard_counts.values())
+			for key, position in loss_map.positions.items():
+				self.queue.put(("INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?)",
+					(run_id, case.name, position, key[0], loss_map.test_counts.get(key, 0), loss_map.standard_counts.get(key, 0))))
+		self.queue.put(("INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+			(run_id, case.name, case.phase.name, case.mode.name if case.mode else None, case.test_mode, case.standard_mode,
+			None if verdict is None else int(verdict), test_count, standard_count, started, duration)))
+
+	def RecordLatency(self, run_id, recorder):
+		# Queues the summary of a validate_latency.LatencyRecorder.
+		for row in recorder.Summary():
+			self.queue.put(("INSERT OR REPLACE INTO latency VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (run_id,) + row))
+
+	def Close(self):
+		self.queue.put(None)
+		self.thread.join()
+		if self.error is not None:
+			print(f"{time.asctime()} Writing results to {self.path} failed: {self.error}")
+
+def FindRun(connection, selector):
+	# A run number, or the latest run of a firmware label.
+	if selector.isdigit():
+		row = connection.execute("SELECT run_id FROM runs WHERE run_id = ?", (int(selector),)).fetchone()
+	else:
+		row = connection.execute("SELECT MAX(run_id) FROM runs WHERE firmware = ?", (selector,)).fetchone()
+	if row is None or row[0] is None:
+		raise ValueError(f"No run matches '{selector}'")
+	return row[0]
+
+def Share(test_count, standard_count):
+	if not test_count and not standard_count:
+		return None
+	return (test_count or 0) / ((test_count or 0) + (standard_count or 0))
+
+def Compare(connection, base_run, new_run, share_drop=0.05):
+	"""
+	Returns (name, base row, new row, regressed) for every case in both runs,
+	rows being (verdict, test_count, standard_count). A case regressed if it
+	went from PASS to FAIL, or TEST's share of decodes fell by more than
+	share_drop.
+	"""
+	rows = connection.execute("""SELECT a.name, a.verdict, a.test_count, a.standard_count, b.verdict, b.test_count, b.standard_count
+		FROM cases a JOIN cases b ON b.run_id = ? AND b.name = a.name WHERE a.run_id = ? ORDER BY a.test_mode, a.name""",
+		(new_run, base_run)).fetchall()
+	comparison = []
+	for name, base_verdict, base_test, base_standard, new_verdict, new_test, new_standard in rows:
+		regressed = base_verdict == 1 and new_verdict == 0
+		base_share = Share(base_test, base_standard)
+		new_share = Share(new_test, new_standard)
+		if base_share is not None and new_share is not None and new_share < base_share - share_drop:
+			regressed = True
+		comparison.append((name, (base_verdict, base_test, base_standard), (new_verdict, new_test, new_standard), regressed))
+	return comparison
+
+def CompareLatency(connection, base_run, new_run, growth=0.2, minimum_growth=0.001):
+	"""
+	Returns (mode, kind, base p50, new p50, base p99, new p99, regressed) for
+	every latency measured in both runs. A latency regressed if its p50 grew
+	by more than growth and by more than minimum_growth seconds.
+	"""
+	rows = connection.execute("""SELECT a.mode, a.kind, a.p50, b.p50, a.p99, b.p99 FROM latency a
+		JOIN latency b ON b.run_id = ? AND b.mode = a.mode AND b.kind = a.kind WHERE a.run_id = ? ORDER BY a.mode, a.kind""",
+		(new_run, base_run)).fetchall()
+	return [row + ((row[3] - row[2]) > max(row[2] * growth, minimum_growth),) for row in rows]
+
+def FormatCounts(row):
+	verdict, test_count, standard_count = row
+	if test_count is None:
+		return f"{VERDICTS[verdict]:<6}"
+	return f"{VERDICTS[verdict]:<6}{test_count:>4}/{standard_count:<4}"
+
+def main():
+	parser = argparse.ArgumentParser(description="Query stored N9600A validation results.")
+	parser.add_argument("--db", default="results.db")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+	runs_parser = subparsers.add_parser("runs", help="list stored runs")
+	runs_parser.add_argument("--last", type=int, default=20)
+	compare_parser = subparsers.add_parser("compare", help="show regressions from one run to another")
+	compare_parser.add_argument("base", help="run number or firmware label")
+	compare_parser.add_argument("new", help="run number or firmware label")
+	compare_parser.add_argument("--all", action="store_true", help="show every case, not just regressions")
+	history_parser = subparsers.add_parser("history", help="show one case across runs")
+	history_parser.add_argument("name")
+	args = parser.parse_args()
+
+	connection = Connect(args.db)
+	try:
+		if args.command == "runs":
+			for run_id, started, firmware, host, note, case_count, failures in connection.execute("""SELECT r.run_id, r.started, r.firmware, r.host, r.note,
+					COUNT(c.name), SUM(c.verdict = 0) FROM runs r LEFT JOIN cases c ON c.run_id = r.run_id
+					GROUP BY r.run_id ORDER BY r.run_id DESC LIMIT ?""", (args.last,)):
+				print(f"{run_id:>6} {time.asctime(time.localtime(started))} {firmware:<16}{host:<16}{case_count:>4} cases {failures or 0:>3} failed {note}")
+			return 0
+		if args.command == "history":
+			for run_id, firmware, verdict, test_count, standard_count in connection.execute("""SELECT c.run_id, r.firmware, c.verdict, c.test_count, c.standard_count
+					FROM cases c JOIN runs r ON r.run_id = c.run_id WHERE c.name = ? ORDER BY c.run_id""", (args.name,)):
+				print(f"{run_id:>6} {firmware:<16}{FormatCounts((verdict, test_count, standard_count))}")
+			return 0
+		base_run = FindRun(connection, args.base)
+		new_run = FindRun(connection, args.new)
+	except ValueError as error:
+		print(error)
+		return 2
+	regressions = 0
+	print(f"{'case':<40}{'run ' + str(base_run):<16}{'run ' + str(new_run):<16}")
+	for name, base_row, new_row, regressed in Compare(connection, base_run, new_run):
+		regressions += regressed
+		if regressed or args.all:
+			print(f"{name:<40}{FormatCounts(base_row):<16}{FormatCounts(new_row):<16}{'REGRESSED' if regressed else ''}")
+	for mode_name, kind, base_p50, new_p50, base_p99, new_p99, regressed in CompareLatency(connection, base_run, new_run):
+		regressions += regressed
+		if regressed or args.all:
+			print(f"{mode_name + ' ' + kind:<40}{base_p50 * 1e3:>7.1f}/{base_p99 * 1e3:<8.1f}{new_p50 * 1e3:>7.1f}/{new_p99 * 1e3:<8.1f}{'SLOWER' if regressed else ''}")
+	print(f"{regressions} regressions from run {base_run} to run {new_run}.")
+	return 1 if regressions else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
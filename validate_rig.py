@@ -0,0 +1,187 @@
+# validate_rig.py
+# Python3
+# Support validate.py
+# One TEST/STANDARD TNC pair with its GPIO, serial ports and sound card
+# 18 Oct 2026
+
+import os
+import time
+import subprocess
+import validate_clock as vclock
+import validate_gpio_functions as vgpio
+import validate_threading_functions as vthread
+import validate_serial_functions as vserial
+import validate_reset_functions as vreset
+import validate_audio as vaudio
+import validate_latency as vlatency
+import validate_io as vio
+import validate_capture as vcapture
+
+class Rig:
+	"""
+	Holds the serial ports, KISS reader queues and settings of one test rig,
+	and the mode switching, TEST_TX button and audio actions the test cases
+	use. Open() must be called before use and Close() at the end of a run.
+	"""
+	def __init__(self, test_serial_port="/dev/ttyACM0", test_serial_port_baud="57600",
+			standard_serial_port="/dev/ttyACM1", standard_serial_port_baud="57600",
+			soundcard_volume="80%", path_to_test_audio="/home/pi/github/modem-test-audio/",
+			test_callsign="0TEST0-5", standard_callsign="STNDRD-7", reset_time=2.0,
+			reset_history_file=None, reset_holdoff=0.25, frame_timeout=2.0,
+			beacon_interval=60.0, quiet_time=0.25, audio_sink="auto", early_stop=True,
+			sequential_alpha=0.01, sequential_beta=0.01, frame_buffer_size=4096, capture_file=None):
+		self.test_serial_port = test_serial_port
+		self.test_serial_port_baud = test_serial_port_baud
+		self.standard_serial_port = standard_serial_port
+		self.standard_serial_port_baud = standard_serial_port_baud
+		self.soundcard_volume = soundcard_volume
+		self.path_to_test_audio = path_to_test_audio
+		self.test_callsign = test_callsign
+		self.standard_callsign = standard_callsign
+		self.reset_time = reset_time
+		self.reset_holdoff = reset_holdoff
+		self.frame_timeout = frame_timeout
+		self.beacon_interval = beacon_interval
+		self.quiet_time = quiet_time
+		self.audio_sink = audio_sink
+		self.early_stop = early_stop
+		self.sequential_alpha = sequential_alpha
+		self.sequential_beta = sequential_beta
+		# Seconds of playback saved by stopping each track early.
+		self.playback_saved = {}
+		# validate_match.LossMap of the last play of each track.
+		self.loss_maps = {}
+		self.latency = vlatency.LatencyRecorder()
+		self.capture_file = capture_file
+		self.capture = None
+		self.player = None
+		self.last_playback = None
+		self.reset_tracker = vreset.ResetTracker(reset_time, minimum_time=reset_holdoff, history_file=reset_history_file)
+		self.current_modes = None
+		self.volume_set = False
+		# Bounded, so a stalled phase drops the oldest frames rather than growing without limit.
+		self.test_serial_queue = vio.FrameRing(frame_buffer_size)
+		self.standard_serial_queue = vio.FrameRing(frame_buffer_size)
+
+	def Open(self):
+		# Initialize Raspberry Pi GPIO for manipulation of MODE switches on TEST device
+		# and STANDARD device.
+		print(f"{time.asctime()} Initializing Raspberry Pi GPIO.")
+		vgpio.SetupGPIO()
+		vclock.Sleep(self.reset_time)
+		# Open serial port for TEST device and STANDARD device.
+		# One I/O thread reads both ports and parses KISS frames outside the main thread.
+		print(f"{time.asctime()} Opening TEST and STANDARD device serial ports, starting KISS I/O loop.")
+		self.test_serial_port_obj = vserial.OpenPort(self.test_serial_port, self.test_serial_port_baud, 3)
+		self.standard_serial_port_obj = vserial.OpenPort(self.standard_serial_port, self.standard_serial_port_baud, 4)
+		test_on_read = None
+		standard_on_read = None
+		if self.capture_file:
+			# Record every byte read from and written to both devices.
+			print(f"{time.asctime()} Capturing serial traffic to {self.capture_file}.")
+			capture = self.capture = vcapture.CaptureWriter(self.capture_file)
+			self.test_serial_port_obj = vcapture.CapturingPort(self.test_serial_port_obj, capture, vcapture.DEVICE_TEST)
+			self.standard_serial_port_obj = vcapture.CapturingPort(self.standard_serial_port_obj, capture, vcapture.DEVICE_STANDARD)
+			test_on_read = lambda data, time_ns: capture.Write(vcapture.DEVICE_TEST, vcapture.KIND_READ, data, time_ns)
+			standard_on_read = lambda data, time_ns: capture.Write(vcapture.DEVICE_STANDARD, vcapture.KIND_READ, data, time_ns)
+		self.io = vio.IOLoop()
+		self.io.Add("TEST", self.test_serial_port_obj, self.test_serial_queue, test_on_read)
+		self.io.Add("STANDARD", self.standard_serial_port_obj, self.standard_serial_queue, standard_on_read)
+		self.io.Start()
+		self.player = vaudio.Player(vaudio.MakeSink(self.audio_sink))
+		self.reset_devices = [(self.test_serial_port_obj, self.test_serial_queue, vreset.MakeTARPNstatProbe(self.test_callsign, self.standard_callsign)),
+					(self.standard_serial_port_obj, self.standard_serial_queue, vreset.MakeTARPNstatProbe(self.standard_callsign, self.test_callsign))]
+
+	def Close(self):
+		self.reset_tracker.Save()
+		self.io.Stop()
+		for name, bytes_read, frame_count, overflows in self.io.Statistics():
+			if overflows:
+				print(f"{time.asctime()} {name} device frame buffer overflowed, {overflows} of {frame_count} frames dropped.")
+		self.test_serial_port_obj.close()
+		self.standard_serial_port_obj.close()
+		if self.capture is not None:
+			self.capture.Close()
+		self.player.Close()
+		vgpio.Cleanup()
+
+	def SetModes(self, test_mode, standard_mode):
+		"""
+		Sets the MODE switches of both devices and waits for them to come out
+		of reset. Does nothing if the devices are already in these modes.
+		"""
+		if self.current_modes == (test_mode, standard_mode):
+			return
+		vgpio.SetModes(test_mode, standard_mode)
+		self.current_modes = (test_mode, standard_mode)
+		self.WaitForReset(test_mode, standard_mode)
+
+	def WaitForReset(self, test_mode, standard_mode):
+		# Detect the end of the reset by probing both devices with a TARPNstat
+		# frame, instead of always waiting the full reset_time.
+		timeout = self.reset_tracker.Timeout(test_mode, standard_mode)
+		self.ClearQueues()
+		elapsed = vreset.WaitForReady(self.reset_devices, timeout, holdoff=self.reset_holdoff)
+		if elapsed is None:
+			# No answer within the learned timeout, fall back to the full reset time.
+			vclock.Sleep(max(self.reset_time - timeout, 0))
+		else:
+			self.reset_tracker.Record(test_mode, standard_mode, elapsed)
+		# Let any traffic caused by the probes finish before the caller clears the queues.
+		vthread.WaitForFrames(self.test_serial_queue, quiet_time=self.quiet_time, timeout=self.reset_time, settle_time=0)
+		vthread.WaitForFrames(self.standard_serial_queue, quiet_time=self.quiet_time, timeout=self.reset_time, settle_time=0)
+		return elapsed
+
+	def ClearQueues(self):
+		vthread.ClearQueue(self.standard_serial_queue)
+		vthread.ClearQueue(self.test_serial_queue)
+
+	def PressTestTXButton(self, hold_time):
+		# Returns the time.monotonic_ns() at which the button was pressed.
+		press_time = time.monotonic_ns()
+		vgpio.AssertTestTXButton()
+		vclock.Sleep(hold_time)
+		vgpio.ReleaseTestTXButton()
+		return press_time
+
+	def WriteTest(self, kiss_frame):
+		# Returns the time.monotonic_ns() at which the frame was handed to the port.
+		write_time = time.monotonic_ns()
+		self.test_serial_port_obj.write(kiss_frame)
+		return write_time
+
+	def TrackPath(self, track):
+		# Corpus tracks are relative to path_to_test_audio; synthesized tracks are absolute.
+		return os.path.join(self.path_to_test_audio, track)
+
+	def PreloadTrack(self, track):
+		# Map and read the track in the background, e.g. while the TNCs reset.
+		self.player.Preload(self.TrackPath(track))
+
+	def Mark(self, event, **fields):
+		# Notes a harness event, such as the start of a case, in the capture.
+		if self.capture is not None:
+			self.capture.Event(event, **fields)
+
+	def PlayTrack(self, track, stop=None):
+		"""
+		Plays track and returns its (start, end) time.monotonic_ns() timestamps.
+		Setting the threading.Event stop cuts the track short.
+		"""
+		self.Mark("track_start", track=track)
+		start_time, end_time = self.PlayAudio(track, stop)
+		self.Mark("track_end", track=track)
+		self.last_playback = (track, start_time, end_time)
+		return start_time, end_time
+
+	def SetVolume(self, volume):
+		# Sets the sound card mixer to volume percent.
+		self.soundcard_volume = f"{volume:g}%"
+		subprocess.run(["amixer", "sset", "'Master'", self.soundcard_volume], stdout=subprocess.DEVNULL)
+		self.volume_set = True
+
+	def PlayAudio(self, track, stop):
+		if not self.volume_set:
+			subprocess.run(["amixer", "sset", "'Master'", f"{self.soundcard_volume}"], stdout=subprocess.DEVNULL)
+			self.volume_set = True
+		return self.player.Play(self.TrackPath(track), stop)
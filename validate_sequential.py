@@ -0,0 +1,61 @@
+# validate_sequential.py
+# Python3
+# Support validate.py
+# Sequential pass/fail decision for the burst and AWGN decode count comparison
+# 18 Oct 2026
+#
+# A track passes when test_count > standard_count - (test_count + standard_count) * tolerance,
+# i.e. when TEST makes up more than (1 - tolerance) / 2 of all decodes. Each
+# decode is treated as a Bernoulli trial, TEST or STANDARD, and Wald's
+# sequential probability ratio test decides between a TEST share of
+# threshold - indifference (fail) and threshold + indifference (pass).
+# Independently, the counts are checked against the packets still to come in
+# the track: once no remaining decodes can change the verdict, it is final.
+
+import math
+
+class SequentialComparison:
+	"""
+	Tracks both devices' decode counts while a track of packet_count packets
+	plays. Update() returns True or False once the verdict is settled, None
+	while it is not. alpha is the chance of stopping with FAIL when TEST in
+	fact meets the criterion by the indifference margin, beta the chance of
+	stopping with PASS when it misses it by that margin.
+	"""
+	def __init__(self, packet_count=None, tolerance=0.07, alpha=0.01, beta=0.01, indifference=0.05):
+		self.packet_count = packet_count
+		self.tolerance = tolerance
+		threshold = (1 - tolerance) / 2
+		share_pass = min(threshold + indifference, 0.999)
+		share_fail = max(threshold - indifference, 0.001)
+		self.test_step = math.log(share_pass / share_fail)
+		self.standard_step = math.log((1 - share_pass) / (1 - share_fail))
+		self.upper = math.log((1 - beta) / alpha)
+		self.lower = math.log(beta / (1 - alpha))
+		self.test_count = 0
+		self.standard_count = 0
+		self.log_ratio = 0.0
+		self.decision = None
+		self.reason = None
+
+	def Passes(self, test_count, standard_count):
+		return test_count > (standard_count - ((test_count + standard_count) * self.tolerance))
+
+	def Update(self, test_new=0, standard_new=0):
+		self.test_count += test_new
+		self.standard_count += standard_new
+		self.log_ratio += (test_new * self.test_step) + (standard_new * self.standard_step)
+		if self.decision is not None:
+			return self.decision
+		if self.packet_count is not None:
+			# Each device decodes each packet at most once.
+			if self.Passes(self.test_count, max(self.standard_count, self.packet_count)):
+				self.decision, self.reason = True, "settled"
+			elif not self.Passes(max(self.test_count, self.packet_count), self.standard_count):
+				self.decision, self.reason = False, "settled"
+		if self.decision is None:
+			if self.log_ratio >= self.upper:
+				self.decision, self.reason = True, "sequential test"
+			elif self.log_ratio <= self.lower:
+				self.decision, self.reason = False, "sequential test"
+		return self.decision
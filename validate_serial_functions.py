@@ -4,40 +4,67 @@
 # Nino Carrillo
 # 20 Jan 2024
 
-import serial
+import sys
+import time
+
+FEND = b'\xC0'
+FESC = b'\xDB'
+TFEND = b'\xDC'
+TFESC = b'\xDD'
+
+def UnescapeKISS(data):
+	if FESC in data:
+		# FESC TFEND must be replaced first, otherwise an escaped FESC followed
+		# by a literal TFEND would turn into a FEND.
+		data = data.replace(FESC + TFEND, FEND).replace(FESC + TFESC, FESC)
+	return data
+
+class KISSFrame(bytes):
+	"""
+	A received frame, with time_ns the time.monotonic_ns() at which the
+	read holding its closing FEND returned.
+	"""
+	def __new__(cls, data, time_ns):
+		frame = bytes.__new__(cls, data)
+		frame.time_ns = time_ns
+		return frame
+
+def SplitKISSFrames(data, time_ns=None):
+	"""
+	Splits a chunk of KISS stream on FEND. Returns a list of complete,
+	unescaped frames with the command byte removed, and the trailing bytes
+	of the incomplete frame to prepend to the next chunk. With time_ns the
+	frames are KISSFrames stamped with it.
+	"""
+	parts = data.split(FEND)
+	remainder = parts.pop()
+	frames = []
+	for part in parts:
+		if part:
+			frame = UnescapeKISS(part)[1:] # skip the command byte
+			frames.append(frame if time_ns is None else KISSFrame(frame, time_ns))
+	return frames, remainder
 
 def ParseKISSFromPort(serial_port, queue):
-	kiss_state = "non-escaped"
-	kiss_frame = []
-	frame_count = 0
+	buffer = b''
 	while serial_port.isOpen():
 		try:
-			input_data = serial_port.read(1)
+			# Take everything already waiting, or block for one byte up to the
+			# port timeout when the line is idle.
+			input_data = serial_port.read(serial_port.in_waiting or 1)
 			if input_data:
-				if kiss_state == "non-escaped":
-					if ord(input_data) == 0xDB: # FESC
-						kiss_state = "escaped"
-					elif ord(input_data) == 0xC0: # FEND
-						if len(kiss_frame) > 0:
-							frame_count += 1
-							queue.put(kiss_frame[1:]) # skip the command byte
-							kiss_frame = []
-						else:
-							kiss_frame = []
-					else:
-						kiss_frame.append(ord(input_data))
-				elif kiss_state == "escaped":
-					if ord(input_data) == 0xDD: # TFESC
-						kiss_frame.append(0xDB) # FESC
-						kiss_state = "non-escaped"
-					elif ord(input_data) == 0xDC: # TFEND
-						kiss_frame.append(0xC0) # FEND
-						kiss_state = "non-escaped"
-
+				if FEND not in input_data:
+					buffer += input_data
+					continue
+				frames, buffer = SplitKISSFrames(buffer + input_data, time.monotonic_ns())
+				for frame in frames:
+					queue.put(frame)
 		except:
 			break
 
 def OpenPort(port_name, port_baud, exit_error):
+	# pyserial is imported here, so the KISS helpers work without it.
+	import serial
 	try:
 		port_object = serial.Serial(port_name, baudrate=port_baud, bytesize=8, parity='N', stopbits=1, xonxoff=0, rtscts=0, timeout=3)
 	except:
@@ -0,0 +1,266 @@
+# validate_shard.py
+# Python3
+# Split a validation run across several rigs (Pi + TEST/STANDARD TNC pair)
+# 18 Oct 2026
+#
+# Each rig runs a worker that takes jobs over a TCP socket:
+#   python3 validate_shard.py worker --port 9600
+# The worker's rig uses the serial ports, callsigns, audio path and other
+# settings at the top of validate.py, and checks its tracks before each job.
+# A coordinator splits the selected test cases into one shard per worker,
+# weighted by expected duration, and merges the results into one report:
+#   python3 validate_shard.py coordinate --workers pi1:9600,pi2:9600 --phases burst,awgn
+# Without hardware, run N workers on simulated rigs on this host, time scaled:
+#   python3 validate_shard.py local 4 --simulate 1000
+#
+# Protocol: the coordinator sends one JSON line {"cases": [case names]} and
+# the worker answers with one JSON line {"results": [{"name", "verdict",
+# "duration"}], "elapsed": seconds}.
+
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+import argparse
+import threading
+import socketserver
+import validate_clock as vclock
+import validate_modes as vmodes
+import validate_tests as vtests
+
+reset_time = 2.0
+beacon_interval = 60.0
+
+def GroupWeight(group, reset_time, beacon_interval):
+	test_mode, standard_mode, cases = group
+	return reset_time + sum(case.Estimate(beacon_interval) for case in cases)
+
+def ShardSchedule(schedule, shard_count, reset_time=reset_time, beacon_interval=beacon_interval):
+	"""
+	Splits the mode groups of schedule into shard_count shards, always giving
+	the heaviest remaining group to the shard with the least expected run
+	time. Groups are never split, so each rig enters each mode pair once.
+	A beacon case leaves beacons on, so every shard with one also runs the
+	beacon disable cases.
+	Returns a list of (shard schedule, expected seconds), keeping the
+	schedule order within each shard.
+	"""
+	loads = [0.0] * shard_count
+	members = [[] for shard in range(shard_count)]
+	weights = [GroupWeight(group, reset_time, beacon_interval) for group in schedule]
+	for index in sorted(range(len(schedule)), key=lambda index: weights[index], reverse=True):
+		lightest = loads.index(min(loads))
+		members[lightest].append(index)
+		loads[lightest] += weights[index]
+	shards = []
+	for shard, load in zip(members, loads):
+		shard_schedule = [schedule[index] for index in sorted(shard)]
+		phases = set(case.phase.name for test_mode, standard_mode, group in shard_schedule for case in group)
+		if "beacon" in phases and "beacon_disable" not in phases:
+			for test_mode, standard_mode, group in schedule:
+				disable = [case for case in group if case.phase.name == "beacon_disable"]
+				if disable:
+					shard_schedule.append((test_mode, standard_mode, disable))
+					load += GroupWeight((test_mode, standard_mode, disable), reset_time, beacon_interval)
+		shards.append((shard_schedule, load))
+	return shards
+
+class Worker:
+	"""
+	Runs jobs for one rig, opened on first use with validate.py's settings
+	and rig_options, a list of validate.py options such as --audio-sink.
+	With time_scale set the rig is a validate_simulator.SimulatedRig running
+	time_scale times faster, otherwise a validate_rig.Rig.
+	"""
+	def __init__(self, time_scale=None, rig_options=()):
+		self.time_scale = time_scale
+		self.rig_options = list(rig_options)
+		self.rig = None
+		self.cases = {case.name: case for case in vtests.BuildRegistry(vmodes.MODE_TABLE)}
+
+	def OpenRig(self):
+		import validate
+		options = self.rig_options
+		if self.time_scale is not None:
+			options = options + ["--simulate", str(self.time_scale)]
+		self.rig = validate.MakeRig(validate.MakeParser().parse_args(options))
+		self.rig.Open()
+
+	def RunJob(self, job):
+		cases = [self.cases[name] for name in job["cases"]]
+		if self.time_scale is None:
+			import validate
+			if not validate.CheckTracks(cases):
+				raise ValueError("missing or unusable tracks, listed in the worker's output")
+		schedule = vtests.Schedule(cases)
+		results = []
+		def Record(case, verdict, started, duration):
+			# Harness seconds, like elapsed.
+			results.append({"name": case.name, "verdict": verdict, "duration": duration * vclock.time_scale})
+		if self.rig is None:
+			self.OpenRig()
+		start_time = vclock.Monotonic()
+		vtests.RunSchedule(self.rig, schedule, Record)
+		return {"results": results, "elapsed": vclock.Monotonic() - start_time}
+
+	def Close(self):
+		if self.rig is not None:
+			self.rig.Close()
+
+def MakeServer(worker, host, port):
+	class JobHandler(socketserver.StreamRequestHandler):
+		def handle(self):
+			line = self.rfile.readline()
+			if not line:
+				return
+			try:
+				reply = worker.RunJob(json.loads(line))
+			except (ValueError, KeyError) as error:
+				reply = {"error": str(error)}
+			self.wfile.write((json.dumps(reply) + "\n").encode())
+	socketserver.TCPServer.allow_reuse_address = True
+	return socketserver.TCPServer((host, port), JobHandler)
+
+def SendJob(address, case_names):
+	host, port = address.rsplit(':', 1)
+	with socket.create_connection((host, int(port))) as connection:
+		connection.sendall((json.dumps({"cases": case_names}) + "\n").encode())
+		reply = connection.makefile('rb').readline()
+	if not reply:
+		raise ConnectionError(f"Worker {address} closed the connection")
+	reply = json.loads(reply)
+	if "error" in reply:
+		raise RuntimeError(f"Worker {address}: {reply['error']}")
+	return reply
+
+def Coordinate(workers, cases):
+	"""
+	Shards cases across the worker addresses, runs all shards at once and
+	prints the merged report. Returns True if no case failed.
+	"""
+	shards = ShardSchedule(vtests.Schedule(cases), len(workers))
+	replies = [None] * len(workers)
+	errors = []
+	def RunShard(index):
+		names = [case.name for test_mode, standard_mode, group in shards[index][0] for case in group]
+		try:
+			replies[index] = SendJob(workers[index], names)
+		except (OSError, RuntimeError) as error:
+			errors.append(str(error))
+	start_time = vclock.Monotonic()
+	threads = [threading.Thread(target=RunShard, args=(index,)) for index in range(len(workers)) if shards[index][0]]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	wall_time = vclock.Monotonic() - start_time
+
+	results = {}
+	for index, reply in enumerate(replies):
+		if reply is None:
+			continue
+		for result in reply["results"]:
+			# A case run on several rigs, like beacon disable, fails if it failed on any.
+			if result["name"] not in results or result["verdict"] is False:
+				results[result["name"]] = (workers[index], result)
+	print(f"{time.asctime()} Merged report for {len(cases)} test cases on {len(workers)} rigs.")
+	failures = 0
+	for case in cases:
+		if case.name not in results:
+			print(f"{case.name:<32}{'-':<24}NOT RUN")
+			failures += 1
+			continue
+		worker, result = results[case.name]
+		verdict = {True: "PASS", False: "FAIL", None: "-"}[result["verdict"]]
+		if result["verdict"] is False:
+			failures += 1
+		print(f"{case.name:<32}{worker:<24}{verdict:<6}{result['duration']:>10.3f} s")
+	rig_time = 0.0
+	for index, (schedule, load) in enumerate(shards):
+		elapsed = replies[index]["elapsed"] if replies[index] else 0.0
+		rig_time += elapsed
+		print(f"Rig {workers[index]}: {len(schedule)} mode groups, expected {load:.1f} s, took {elapsed:.3f} s")
+	print(f"Wall clock {wall_time:.3f} s for {rig_time:.3f} s of rig time ({rig_time / max(wall_time, 1e-9):.2f}x).")
+	for error in errors:
+		print(error)
+	print(f"{failures} failed or not run.")
+	return failures == 0 and not errors
+
+def StartLocalWorker(time_scale):
+	"""
+	Starts a simulated worker in its own process, since each SimulatedRig
+	takes over the process-wide GPIO backend. Returns (process, address).
+	The worker's test output is discarded.
+	"""
+	process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", "--host", "127.0.0.1", "--port", "0", "--simulate", str(time_scale)],
+		stdout=subprocess.PIPE, text=True)
+	line = process.stdout.readline()
+	if not line:
+		process.wait()
+		raise RuntimeError("Simulated worker did not start")
+	threading.Thread(target=lambda: process.stdout.read(), daemon=True).start()
+	port = line.rstrip().rstrip('.').rsplit(':', 1)[1]
+	return process, f"127.0.0.1:{port}"
+
+def main():
+	parser = argparse.ArgumentParser(description="Shard N9600A validation across several rigs.")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+	worker_parser = subparsers.add_parser("worker", help="serve jobs for the rig attached to this host")
+	worker_parser.add_argument("--host", default="0.0.0.0")
+	worker_parser.add_argument("--port", type=int, default=9600)
+	worker_parser.add_argument("--simulate", type=float, default=None, metavar="SCALE", help="simulate the rig, running SCALE times faster than real time")
+	# The rest of the rig's settings are validate.py's.
+	worker_parser.add_argument("--gpio", default="auto", choices=["auto", "rpi", "gpiod", "mock"])
+	worker_parser.add_argument("--audio-sink", default="auto", metavar="SINK")
+	worker_parser.add_argument("--no-early-stop", action="store_true")
+	for name, help_text in [("coordinate", "split a run across workers"), ("local", "split a run across simulated rigs on this host")]:
+		sub = subparsers.add_parser(name, help=help_text)
+		if name == "coordinate":
+			sub.add_argument("--workers", required=True, help="comma separated host:port list")
+		else:
+			sub.add_argument("count", type=int)
+			sub.add_argument("--simulate", type=float, default=1000.0, metavar="SCALE", help="run the simulated rigs SCALE times faster than real time")
+		sub.add_argument("--modes", default="")
+		sub.add_argument("--phases", default="")
+	args = parser.parse_args()
+
+	if args.command == "worker":
+		rig_options = ["--gpio", args.gpio, "--audio-sink", args.audio_sink] + (["--no-early-stop"] if args.no_early_stop else [])
+		worker = Worker(args.simulate, rig_options)
+		server = MakeServer(worker, args.host, args.port)
+		print(f"{time.asctime()} Worker listening on {args.host}:{server.server_address[1]}.", flush=True)
+		try:
+			server.serve_forever()
+		except KeyboardInterrupt:
+			pass
+		server.server_close()
+		worker.Close()
+		return 0
+
+	try:
+		modes = vmodes.MODE_TABLE.Select(args.modes.split(",")) if args.modes else None
+		phase_names = [name.strip() for name in args.phases.split(",") if name.strip()] or None
+		cases = vtests.BuildRegistry(vmodes.MODE_TABLE, phase_names, modes)
+	except ValueError as error:
+		print(error)
+		return 2
+
+	if args.command == "coordinate":
+		return 0 if Coordinate([address.strip() for address in args.workers.split(",")], cases) else 1
+
+	# Harness seconds on the coordinator too, to compare with the workers' times.
+	vclock.SetTimeScale(args.simulate)
+	workers = []
+	try:
+		for index in range(args.count):
+			workers.append(StartLocalWorker(args.simulate))
+		return 0 if Coordinate([address for process, address in workers], cases) else 1
+	finally:
+		for process, address in workers:
+			process.terminate()
+			process.wait()
+
+if __name__ == "__main__":
+	sys.exit(main())
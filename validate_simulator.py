@@ -0,0 +1,280 @@
+# validate_simulator.py
+# Python3
+# Simulated TEST/STANDARD TNC pair for running validate.py without hardware
+# 18 Oct 2026
+#
+# Each emulated TNC sits behind a pty pair and speaks KISS to the harness.
+# A mock GPIO backend drives the emulators' MODE switches and TEST_TX button,
+# and the shared audio channel stands in for the sound card and the clip
+# leads between the TNCs. All waits run on validate_clock, sped up by the
+# time scale, so python3 validate.py --simulate 100 runs the full suite in
+# well under a minute.
+
+import os
+import time
+import pty
+import tty
+import math
+import random
+import select
+import threading
+import queue
+import validate_clock as vclock
+import validate_gpio_functions as vgpio
+import validate_serial_functions as vserial
+import validate_packet_functions as vpacket
+import validate_modes as vmodes
+import validate_rig as vrig
+
+def ChannelKey(mode_name):
+	# IL2P decoders also decode IL2Pc, so both framings share a channel key.
+	if mode_name.endswith('c'):
+		return mode_name[:-1]
+	return mode_name
+
+class SimulatedChannel:
+	"""
+	The audio node joining the sound card output, TEST TXA and RXA, and
+	STANDARD RXA. Everything sent on it is heard by every TNC whose mode
+	matches the channel key of the transmission.
+	"""
+	def __init__(self, seed=None):
+		self.tncs = []
+		self.rng = random.Random(seed)
+		self.lock = threading.Lock()
+		# Sound card mixer level in percent.
+		self.volume = 100.0
+
+	def Deliver(self, frame, channel_key, track=None):
+		# Every TNC listening on channel_key hears frame; if it comes from a track, only with the TNC's decode rate for it.
+		for tnc in self.tncs:
+			if tnc.Hears(channel_key):
+				if track is not None:
+					with self.lock:
+						heard = self.rng.random() < tnc.DecodeRate(track, self.volume)
+					if not heard:
+						continue
+				tnc.SendToHost(frame)
+
+	def PlayTrack(self, track, stop=None):
+		"""
+		Plays a modem-test-audio track: every packet named in the track
+		(e.g. 50 bytes 10 times for "_50b_10x") goes out at its airtime, and
+		each TNC decodes it with its DecodeRate(). Returns after the whole track,
+		or once the threading.Event stop is set.
+		"""
+		mode_name = vmodes.TrackModeName(track)
+		mode = vmodes.MODE_TABLE.by_name.get(mode_name)
+		packet_bytes, packet_count = vmodes.TrackPacketInfo(track)
+		if mode is None or packet_bytes is None or packet_count is None:
+			vclock.Sleep(1.0)
+			return
+		factory = vpacket.UIPacketFactory("TRACK-1", "TEST-0", length=packet_bytes, seed=track)
+		airtime = vmodes.TrackAirtime(track, mode.bit_rate) / packet_count
+		for frame in factory.generate_many(packet_count):
+			if stop is not None and stop.is_set():
+				return
+			vclock.Sleep(airtime)
+			self.Deliver(frame, ChannelKey(mode_name), track)
+
+class SimulatedTNC:
+	"""
+	One N9600A behind a pty. The harness opens port_name as if it were the
+	TNC's USB serial port.
+	"""
+	def __init__(self, name, channel, connected_tx=False, decode_rate=1.0, reset_duration=0.6, ebn0_threshold=6.0, volume_threshold=20.0):
+		self.name = name
+		self.channel = channel
+		self.connected_tx = connected_tx
+		self.decode_rate = decode_rate
+		# 50% decode points for validate_channel.py tracks and for the mixer level.
+		self.ebn0_threshold = ebn0_threshold
+		self.volume_threshold = volume_threshold
+		self.reset_duration = reset_duration
+		self.mode = 0
+		self.ready_time = 0.0
+		self.callsign = "NOCALL"
+		self.beacon_interval = 0
+		self.beacon_due = None
+		self.running = True
+		self.write_lock = threading.Lock()
+		self.master, self.slave = pty.openpty()
+		tty.setraw(self.slave)
+		self.port_name = os.ttyname(self.slave)
+		self.tx_queue = queue.Queue()
+		channel.tncs.append(self)
+		self.threads = [threading.Thread(target=self.ReadHost, daemon=True),
+			threading.Thread(target=self.Transmitter, daemon=True),
+			threading.Thread(target=self.BeaconTimer, daemon=True)]
+		for thread in self.threads:
+			thread.start()
+
+	def DecodeRate(self, track, volume, ebn0_spread=0.8, volume_spread=3.0):
+		"""
+		Chance of decoding one packet of track: decode_rate, reduced along
+		logistic curves as the track's Eb/N0 or the mixer volume falls
+		toward this TNC's thresholds.
+		"""
+		rate = self.decode_rate / (1 + math.exp((self.volume_threshold - volume) / volume_spread))
+		ebn0 = vmodes.TrackEbN0(track)
+		if ebn0 is not None:
+			rate /= 1 + math.exp((self.ebn0_threshold - ebn0) / ebn0_spread)
+		return rate
+
+	def Close(self):
+		self.running = False
+		self.tx_queue.put(None)
+		for thread in self.threads:
+			thread.join()
+		os.close(self.master)
+		os.close(self.slave)
+
+	def ModeName(self):
+		return vmodes.MODE_TABLE[self.mode].name
+
+	def Ready(self):
+		return vclock.Monotonic() >= self.ready_time
+
+	def Hears(self, channel_key):
+		return self.Ready() and ChannelKey(self.ModeName()) == channel_key
+
+	def SetMode(self, mode):
+		# A MODE switch change resets the TNC; it is deaf and mute until it is back up.
+		self.mode = mode
+		self.ready_time = vclock.Monotonic() + self.reset_duration
+
+	def SendToHost(self, frame):
+		with self.write_lock:
+			try:
+				os.write(self.master, vpacket.EncodeKISSFrame(0, frame))
+			except OSError:
+				pass
+
+	def Transmit(self, frame, channel_key=None):
+		if self.connected_tx:
+			self.tx_queue.put((frame, channel_key or ChannelKey(self.ModeName())))
+
+	def Transmitter(self):
+		# Sends one frame at a time, each taking its airtime in the current mode.
+		while True:
+			item = self.tx_queue.get()
+			if item is None:
+				return
+			frame, channel_key = item
+			vclock.Sleep(vmodes.FrameAirtime(len(frame), vmodes.MODE_TABLE[self.mode].bit_rate))
+			self.channel.Deliver(frame, channel_key)
+
+	def PressTestTX(self):
+		if not self.Ready():
+			return
+		frame = vpacket.GenerateUIPacket(f"{self.callsign}-0", "IDENT-0", f"{self.ModeName()} test packet ", 40)
+		self.SendToHost(frame)
+		self.Transmit(frame)
+
+	def BeaconTimer(self):
+		while self.running:
+			vclock.Sleep(0.5)
+			if self.beacon_due is not None and vclock.Monotonic() >= self.beacon_due and self.Ready():
+				self.beacon_due = vclock.Monotonic() + (self.beacon_interval * 60)
+				beacon_mode = vmodes.MODE_TABLE[self.mode].beacon_mode
+				if beacon_mode > 0:
+					channel_key = ChannelKey(vmodes.MODE_TABLE[beacon_mode].name)
+				else:
+					channel_key = ChannelKey(self.ModeName())
+				self.Transmit(vpacket.GenerateUIPacket(f"{self.callsign}-0", "BEACON-0", "N9600A beacon", 0), channel_key)
+
+	def ReadHost(self):
+		buffer = b''
+		while self.running:
+			readable, writable, failed = select.select([self.master], [], [], 0.05)
+			if not readable:
+				continue
+			try:
+				data = os.read(self.master, 4096)
+			except OSError:
+				return
+			parts = (buffer + data).split(vserial.FEND)
+			buffer = parts.pop()
+			for part in parts:
+				if part and self.Ready():
+					self.HandleKISS(vserial.UnescapeKISS(part))
+
+	def HandleKISS(self, kiss_frame):
+		command = kiss_frame[0] & 0x0F
+		data = kiss_frame[1:]
+		if command == 0x09 and len(data) >= 2 and data[0] == 0xF0:
+			# Beacon interval in minutes, 0 is off.
+			self.beacon_interval = data[1]
+			self.beacon_due = vclock.Monotonic() + (data[1] * 60) if data[1] else None
+		elif command == 0:
+			frame = vpacket.GetFrameMeta(data)
+			source = frame.get('SOURCE')
+			if source:
+				self.callsign = source.split('-')[0]
+			if bytes(frame.get('Payload') or b'').startswith(b' TARPNstat'):
+				# Answer with a status meta-frame to the host, nothing goes on air.
+				self.SendToHost(vpacket.GenerateUIPacket(f"{self.callsign}-0", "TARPN-0", f"TARPNstat mode {self.mode}", 0))
+			else:
+				self.Transmit(bytes(data))
+
+class SimulatedGPIO(vgpio.MockGPIOBackend):
+	"""
+	GPIO backend wired to the emulators: MODE line writes become emulator
+	MODE changes and the TEST_TX line becomes button presses.
+	"""
+	def __init__(self, test_tnc, standard_tnc):
+		vgpio.MockGPIOBackend.__init__(self)
+		self.test_tnc = test_tnc
+		self.standard_tnc = standard_tnc
+
+	def Pattern(self, pins):
+		pattern = 0
+		for pin in pins:
+			pattern = (pattern << 1) | (1 if self.pins.get(pin) else 0)
+		return pattern
+
+	def Write(self, levels):
+		pressed = levels.get(vgpio.TEST_TX_PIN) and not self.pins.get(vgpio.TEST_TX_PIN)
+		vgpio.MockGPIOBackend.Write(self, levels)
+		if any(pin in levels for pin in vgpio.TEST_MODE_PINS):
+			self.test_tnc.SetMode(self.Pattern(vgpio.TEST_MODE_PINS))
+		if any(pin in levels for pin in vgpio.STANDARD_MODE_PINS):
+			self.standard_tnc.SetMode(self.Pattern(vgpio.STANDARD_MODE_PINS))
+		if pressed:
+			self.test_tnc.PressTestTX()
+
+class SimulatedRig(vrig.Rig):
+	"""
+	A Rig whose TNCs, GPIO and sound card are emulated. time_scale speeds
+	up every harness wait and emulated airtime.
+	"""
+	def __init__(self, time_scale=100.0, test_decode_rate=1.0, standard_decode_rate=1.0, seed=None,
+			test_ebn0_threshold=6.0, standard_ebn0_threshold=6.5, **settings):
+		vclock.SetTimeScale(time_scale)
+		self.channel = SimulatedChannel(seed)
+		self.test_tnc = SimulatedTNC("TEST", self.channel, connected_tx=True, decode_rate=test_decode_rate, ebn0_threshold=test_ebn0_threshold)
+		self.standard_tnc = SimulatedTNC("STANDARD", self.channel, decode_rate=standard_decode_rate, ebn0_threshold=standard_ebn0_threshold)
+		self.gpio = SimulatedGPIO(self.test_tnc, self.standard_tnc)
+		vgpio.UseBackend(self.gpio)
+		settings["test_serial_port"] = self.test_tnc.port_name
+		settings["standard_serial_port"] = self.standard_tnc.port_name
+		settings["audio_sink"] = "null"
+		vrig.Rig.__init__(self, **settings)
+		self.channel.volume = float(self.soundcard_volume.rstrip('%'))
+
+	def PreloadTrack(self, track):
+		pass
+
+	def SetVolume(self, volume):
+		self.soundcard_volume = f"{volume:g}%"
+		self.channel.volume = volume
+
+	def PlayAudio(self, track, stop):
+		start_time = time.monotonic_ns()
+		self.channel.PlayTrack(track, stop)
+		return start_time, time.monotonic_ns()
+
+	def Close(self):
+		vrig.Rig.Close(self)
+		self.test_tnc.Close()
+		self.standard_tnc.Close()
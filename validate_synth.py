@@ -0,0 +1,199 @@
+# validate_synth.py
+# Python3
+# Support validate.py
+# Vectorized NumPy synthesizer of AX.25 test tracks for the AFSK 1200, AFSK 300 and GFSK 9600 modes
+# 18 Oct 2026
+#
+# Packets come from validate_packet_functions.UIPacketFactory and go through
+# HDLC framing (FCS, flags, bit-stuffing), NRZI and, for GFSK 9600, the
+# G3RUH scrambler, before modulation to 16 bit PCM. Every stage works on
+# whole NumPy arrays, so a 10x burst track renders far faster than real
+# time. Tracks are cached on disk under a name that follows the
+# modem-test-audio convention, so validate_modes.TrackPacketInfo and
+# TrackModeName read them like corpus tracks:
+#   python3 validate_synth.py AFSK_1200_AX25 --bytes 255 --count 10
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import crc
+import validate_packet_functions as vpacket
+import validate_audio as vaudio
+import validate_modes as vmodes
+
+SYNTH_VERSION = 2
+SAMPLE_RATE = 48000
+FLAG_BITS = np.unpackbits(np.frombuffer(b'\x7E', dtype=np.uint8), bitorder='little')
+
+class Modulation:
+	"""
+	How a mode is put on air. AFSK modes key mark_hz for a 1 and space_hz
+	for a 0 after NRZI; GFSK modes scramble the NRZI bits and send them as
+	Gaussian-filtered baseband with bandwidth-time product bt.
+	"""
+	def __init__(self, kind, baud, mark_hz=None, space_hz=None, bt=None, txdelay=0.3):
+		self.kind = kind
+		self.baud = baud
+		self.mark_hz = mark_hz
+		self.space_hz = space_hz
+		self.bt = bt
+		self.txdelay = txdelay
+
+MODULATIONS = {
+	"AFSK_1200_AX25": Modulation("afsk", 1200, mark_hz=1200, space_hz=2200),
+	"AFSK_300_AX25": Modulation("afsk", 300, mark_hz=1600, space_hz=1800),
+	"GFSK_9600_AX25": Modulation("gfsk", 9600, bt=0.5, txdelay=0.1) }
+
+def FrameBits(frame):
+	"""
+	HDLC bits of frame, least significant bit first: the frame and its FCS,
+	with a 0 stuffed after every run of five 1s. Flags are not included.
+	"""
+	fcs = crc.CRC16(frame)
+	data = np.frombuffer(bytes(frame) + bytes((fcs & 0xFF, fcs >> 8)), dtype=np.uint8)
+	bits = np.unpackbits(data, bitorder='little')
+	# Length of the run of 1s ending at each bit; a 0 goes after every fifth 1 in a run.
+	index = np.arange(len(bits))
+	last_zero = np.maximum.accumulate(np.where(bits == 0, index, -1))
+	run_length = index - last_zero
+	stuff_after = np.flatnonzero((bits == 1) & (run_length % 5 == 0))
+	return np.insert(bits, stuff_after + 1, 0)
+
+def PacketBits(frame, preamble_flags, postamble_flags=2):
+	return np.concatenate([np.tile(FLAG_BITS, preamble_flags), FrameBits(frame), np.tile(FLAG_BITS, postamble_flags)])
+
+def NRZI(bits, level=1):
+	# A 0 changes the line level, a 1 keeps it.
+	return (level ^ (np.cumsum(bits == 0) & 1)).astype(np.uint8)
+
+def Scramble(bits, state=0):
+	"""
+	G3RUH self-synchronizing scrambler, x^17 + x^12 + 1. The recursion runs
+	bit by bit in Python integers; at 9600 baud this is still far faster
+	than real time.
+	"""
+	out = bytearray(len(bits))
+	for index, bit in enumerate(bits.tolist()):
+		bit ^= ((state >> 11) ^ (state >> 16)) & 1
+		state = ((state << 1) | bit) & 0x1FFFF
+		out[index] = bit
+	return np.frombuffer(bytes(out), dtype=np.uint8), state
+
+def SymbolIndex(bit_count, baud, sample_rate):
+	# The bit being sent at each sample, for any ratio of sample rate to baud.
+	sample_count = -(-bit_count * sample_rate // baud)
+	return (np.arange(sample_count, dtype=np.int64) * baud) // sample_rate
+
+def ModulateAFSK(levels, modulation, sample_rate, phase=0.0):
+	frequency = np.where(levels[SymbolIndex(len(levels), modulation.baud, sample_rate)] == 1, modulation.mark_hz, modulation.space_hz)
+	# Phase-continuous: the phase is the running sum of frequency.
+	phases = phase + (2 * np.pi / sample_rate) * np.cumsum(frequency)
+	return np.sin(phases), phases[-1] % (2 * np.pi)
+
+def GaussianTaps(bt, samples_per_symbol, span=4):
+	sigma = np.sqrt(np.log(2)) / (2 * np.pi * bt) * samples_per_symbol
+	t = np.arange(-span * samples_per_symbol / 2, span * samples_per_symbol / 2 + 1)
+	taps = np.exp(-(t ** 2) / (2 * sigma ** 2))
+	return taps / taps.sum()
+
+def ModulateGFSK(levels, modulation, sample_rate):
+	baseband = (levels[SymbolIndex(len(levels), modulation.baud, sample_rate)].astype(np.float64) * 2) - 1
+	return np.convolve(baseband, GaussianTaps(modulation.bt, sample_rate / modulation.baud), mode='same')
+
+def RenderPacket(frame, modulation, sample_rate=SAMPLE_RATE):
+	# Audio samples, -1..1, of one packet with its preamble.
+	preamble_flags = max(1, int(np.ceil(modulation.txdelay * modulation.baud / 8)))
+	levels = NRZI(PacketBits(frame, preamble_flags))
+	if modulation.kind == "gfsk":
+		levels, state = Scramble(levels)
+		return ModulateGFSK(levels, modulation, sample_rate)
+	samples, phase = ModulateAFSK(levels, modulation, sample_rate)
+	return samples
+
+def RenderTrack(mode_name, packet_bytes, packet_count, seed=0, gap=0.25, amplitude=0.5, sample_rate=SAMPLE_RATE):
+	"""
+	Returns the 16 bit PCM samples (int16 array) of packet_count UI packets
+	with packet_bytes byte payloads, separated by gap seconds of silence.
+	"""
+	modulation = MODULATIONS[mode_name]
+	factory = vpacket.UIPacketFactory("TRACK-1", "TEST-0", length=packet_bytes, seed=seed)
+	silence = np.zeros(int(gap * sample_rate))
+	parts = [silence]
+	for frame in factory.generate_many(packet_count):
+		parts.append(RenderPacket(frame, modulation, sample_rate))
+		parts.append(silence)
+	samples = np.concatenate(parts) * (amplitude * 32767)
+	return np.clip(np.round(samples), -32768, 32767).astype('<i2')
+
+def TrackParameters(mode_name, packet_bytes, packet_count, seed=0, gap=0.25, amplitude=0.5, sample_rate=SAMPLE_RATE):
+	return {"version": SYNTH_VERSION, "mode": mode_name, "packet_bytes": packet_bytes, "packet_count": packet_count,
+		"seed": seed, "gap": gap, "amplitude": amplitude, "sample_rate": sample_rate}
+
+def TrackName(parameters):
+	# Corpus-style name with a hash of every parameter, e.g. AFSK_1200_AX25_255b_10x_s3f9a0c1d2e4b.wav
+	key = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode()).hexdigest()[:12]
+	return f"{parameters['mode']}_{parameters['packet_bytes']}b_{parameters['packet_count']}x_s{key}.wav"
+
+def WriteWav(path, samples, sample_rate=SAMPLE_RATE):
+	data = samples.tobytes()
+	temporary = path + ".tmp"
+	with open(temporary, 'wb') as file:
+		file.write(vaudio.WavHeader(vaudio.WavFormat(1, sample_rate, 16), len(data)))
+		file.write(data)
+	os.replace(temporary, path)
+
+def CachedTrack(cache_dir, mode_name, packet_bytes, packet_count, **options):
+	"""
+	Returns the path of the synthesized track, rendering it into cache_dir
+	only if no track with the same parameters is there yet.
+	"""
+	parameters = TrackParameters(mode_name, packet_bytes, packet_count, **options)
+	path = os.path.join(os.path.abspath(cache_dir), TrackName(parameters))
+	if not os.path.exists(path):
+		os.makedirs(cache_dir, exist_ok=True)
+		WriteWav(path, RenderTrack(mode_name, packet_bytes, packet_count, **options), parameters["sample_rate"])
+	return path
+
+def SynthesizeBurstTracks(mode_table, cache_dir, **options):
+	"""
+	Returns a copy of mode_table whose synthesizable modes play a
+	synthesized burst track, with the packet size and count of the corpus
+	track it replaces, instead of the corpus track.
+	"""
+	modes = []
+	for mode in mode_table:
+		if mode.name in MODULATIONS:
+			packet_bytes, packet_count = vmodes.TrackPacketInfo(mode.burst_track)
+			track = CachedTrack(cache_dir, mode.name, packet_bytes, packet_count, **options)
+			mode = vmodes.Mode(mode.pattern, mode.name, mode.bit_rate, track, mode.awgn_track, mode.beacon_mode)
+		modes.append(mode)
+	return vmodes.ModeTable(modes)
+
+def main():
+	parser = argparse.ArgumentParser(description="Synthesize an AX.25 test track.")
+	parser.add_argument("mode", choices=sorted(MODULATIONS))
+	parser.add_argument("--bytes", type=int, default=50, help="payload bytes per packet (default 50)")
+	parser.add_argument("--count", type=int, default=10, help="packets (default 10)")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--output", default=None, metavar="FILE", help="write here instead of the cache")
+	parser.add_argument("--cache", default="synth_cache")
+	args = parser.parse_args()
+	start_time = time.perf_counter()
+	if args.output:
+		samples = RenderTrack(args.mode, args.bytes, args.count, args.seed)
+		WriteWav(args.output, samples)
+		path = args.output
+	else:
+		path = CachedTrack(args.cache, args.mode, args.bytes, args.count, seed=args.seed)
+	elapsed = time.perf_counter() - start_time
+	wav = vaudio.WavFile(path)
+	print(f"{path}: {wav.duration:.2f} s of audio in {elapsed:.3f} s ({wav.duration / elapsed:.0f}x real time).")
+	wav.Close()
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
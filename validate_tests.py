@@ -0,0 +1,383 @@
+# validate_tests.py
+# Python3
+# Support validate.py
+# Registry of validation test cases and a scheduler that groups them by MODE setting
+# 18 Oct 2026
+
+import time
+import threading
+import validate_modes as vmodes
+import validate_manifest as vmanifest
+import validate_sequential as vseq
+import validate_match as vmatch
+import validate_clock as vclock
+import validate_threading_functions as vthread
+import validate_packet_functions as vpacket
+
+pass_text = "......................................................................PASS"
+fail_text = "......................................................................FAIL"
+
+def PrintResult(passed):
+	if passed:
+		print(f"{time.asctime()}{pass_text}")
+	else:
+		print(f"{time.asctime()}{fail_text}")
+	return passed
+
+def PrintFrames(device, summary, payload=False):
+	for frame in summary['Frames']:
+		print(f'{time.asctime()} {device} device heard packet from {frame.get("SOURCE")} to {frame.get("DEST")} CRC {frame["CRC"]}.')
+		if payload:
+			print(f"{time.asctime()} Packet payload: {str(frame.get('Payload'))}")
+
+def RecordLatency(rig, mode, kind, stimulus_time, frames, on_air=True):
+	# Phases with fixed MODE settings pass mode None; use the TEST device's mode.
+	if mode is None:
+		mode = vmodes.MODE_TABLE[rig.current_modes[0]]
+	for frame in frames:
+		airtime = vmodes.FrameAirtime(len(frame), mode.bit_rate) if on_air else 0.0
+		rig.latency.Record(mode.name, kind, stimulus_time, frame, airtime)
+
+def RunSetCallsign(rig, mode):
+	"""
+	Generate a UI frame to assign callsign to TEST device.
+	"""
+	print(f"{time.asctime()} Sending a UI Packet from {rig.test_callsign} to {rig.standard_callsign} to set TEST device callsign.")
+	packet = vpacket.GenerateUIPacket(rig.test_callsign, rig.standard_callsign, "nothing to see here ", 50)
+	print(f"{time.asctime()} Packet CRC is {vpacket.GetCRC(packet)}.")
+	rig.ClearQueues()
+	write_time = rig.WriteTest(vpacket.EncodeKISSFrame(0,packet))
+	frames = vthread.WaitForFrames(rig.standard_serial_queue, count=1, timeout=rig.frame_timeout)
+	RecordLatency(rig, mode, "kiss_air", write_time, frames)
+	PrintFrames("STANDARD", vpacket.ParseFrames(frames))
+	return None
+
+def RunCallsignAdoption(rig, mode):
+	"""
+	Check the TEST_TX button transmits a packet with the correct callsign.
+	"""
+	rig.ClearQueues()
+	press_time = rig.PressTestTXButton(.1)
+	frames = vthread.WaitForFrames(rig.standard_serial_queue, count=1, timeout=rig.frame_timeout)
+	RecordLatency(rig, mode, "button_air", press_time, frames)
+	summary = vpacket.ParseFrames(frames)
+	PrintFrames("STANDARD", summary)
+	expected = vpacket.GetFrameMeta(vpacket.GetUIHeader(rig.test_callsign, rig.standard_callsign))['SOURCE']
+	sources = summary['SOURCE']
+	return PrintResult(len(sources) > 0 and sources[-1] is not None and sources[-1][:-2] == expected[:-2])
+
+def RunLoopback(rig, mode):
+	"""
+	Check that the TEST_TX button sends a packet to the host over USB, and loopback works.
+	"""
+	rig.ClearQueues()
+	repeat_count = 3
+	frames = []
+	for repeat in range(repeat_count):
+		press_time = rig.PressTestTXButton(1)
+		# Each press gives a USB test packet and then its loopback decode.
+		new_frames = vthread.WaitForFrames(rig.test_serial_queue, count=(2 * (repeat + 1)) - len(frames), timeout=1 + (100 * 8 / mode.bit_rate))
+		RecordLatency(rig, mode, "button_usb", press_time, new_frames[:1], on_air=False)
+		RecordLatency(rig, mode, "button_loopback", press_time, new_frames[1:2])
+		frames += new_frames
+	summary = vpacket.ParseFrames(frames)
+	PrintFrames("TEST", summary)
+	return PrintResult(summary['Count'] > repeat_count)
+
+def PlayWhileCounting(rig, track, comparison, test_frames, standard_frames):
+	# Plays track on another thread, collecting decodes into the frame lists
+	# and feeding them to comparison as they arrive. Stops the track as soon
+	# as comparison has a verdict.
+	stop = threading.Event()
+	timestamps = []
+	errors = []
+	def Play():
+		try:
+			timestamps.extend(rig.PlayTrack(track, stop))
+		except Exception as error:
+			# Raised again below, rather than lost on the playback thread.
+			errors.append(error)
+	playback = threading.Thread(target=Play)
+	playback.start()
+	while playback.is_alive():
+		playback.join(vclock.RealTime(0.05))
+		test_new = vthread.DrainQueue(rig.test_serial_queue)
+		standard_new = vthread.DrainQueue(rig.standard_serial_queue)
+		test_frames += test_new
+		standard_frames += standard_new
+		comparison.Update(len(test_new), len(standard_new))
+		if comparison.decision is not None:
+			stop.set()
+	playback.join()
+	if errors:
+		raise errors[0]
+	return timestamps
+
+def SettleTime(track, packet_count):
+	# The last decode can take up to one packet time after the track ends.
+	settle_time = 1.0
+	duration = vmanifest.TrackDuration(track)
+	if duration is not None and packet_count:
+		settle_time = max(settle_time, duration / packet_count)
+	return settle_time
+
+def CountTrackDecodes(rig, track):
+	"""
+	Plays all of track and returns (TEST decodes, STANDARD decodes, packets
+	in the track), each count capped at the packets in the track.
+	"""
+	rig.ClearQueues()
+	packet_bytes, packet_count = vmodes.TrackPacketInfo(track)
+	rig.PlayTrack(track)
+	test_frames, standard_frames = vthread.WaitForFramesEach((rig.test_serial_queue, rig.standard_serial_queue), quiet_time=rig.quiet_time, timeout=SettleTime(track, packet_count))
+	return min(len(test_frames), packet_count), min(len(standard_frames), packet_count), packet_count
+
+def CompareTrackCounts(rig, mode, track):
+	rig.ClearQueues()
+	packet_bytes, packet_count = vmodes.TrackPacketInfo(track)
+	comparison = vseq.SequentialComparison(packet_count, alpha=rig.sequential_alpha, beta=rig.sequential_beta)
+	test_frames = []
+	standard_frames = []
+	print(f"Playing {track}.")
+	if rig.early_stop:
+		start_time, end_time = PlayWhileCounting(rig, track, comparison, test_frames, standard_frames)
+	else:
+		start_time, end_time = rig.PlayTrack(track)
+	# Harness seconds, which differ from the real ones on a time-scaled simulated rig.
+	played = (end_time - start_time) * vclock.time_scale / 1e9
+	print(f"{time.asctime()} Played {track} in {played:.3f} s.")
+	if comparison.decision is not None:
+		duration = vmanifest.TrackDuration(track) or vmodes.TrackAirtime(track, mode.bit_rate) or played
+		rig.playback_saved[track] = max(duration - played, 0.0)
+		print(f"{time.asctime()} Verdict {comparison.reason} after {comparison.test_count + comparison.standard_count} decodes, saved {rig.playback_saved[track]:.1f} s of playback.")
+		passed = comparison.decision
+	else:
+		# Count the received packets from each device, once the last decodes are in; both get the same window.
+		test_new, standard_new = vthread.WaitForFramesEach((rig.test_serial_queue, rig.standard_serial_queue), quiet_time=rig.quiet_time, timeout=SettleTime(track, packet_count))
+		test_frames += test_new
+		standard_frames += standard_new
+		comparison.Update(len(test_new), len(standard_new))
+		passed = comparison.Passes(comparison.test_count, comparison.standard_count)
+	print(f"Test device heard {comparison.test_count} packets.")
+	print(f"Standard device heard {comparison.standard_count} packets.")
+	track_time = vmanifest.TrackDuration(track) or vmodes.TrackAirtime(track, mode.bit_rate)
+	packet_time = None
+	if packet_count and track_time:
+		# The first decode is due once the first packet has been played.
+		packet_time = track_time / packet_count
+		for kind, frames in (("audio_test", test_frames), ("audio_standard", standard_frames)):
+			for frame in frames[:1]:
+				rig.latency.Record(mode.name, kind, start_time, frame, packet_time)
+	loss_map = vmatch.MatchFrames(test_frames, standard_frames, start_time, packet_time, packet_count)
+	rig.loss_maps[track] = loss_map
+	print(f"{time.asctime()} Packets by {loss_map.Order()} {loss_map.Summary()}.")
+	if loss_map.missed or loss_map.extra:
+		print(f"{time.asctime()} Loss map by {loss_map.Order()} {loss_map.Map()}")
+	return PrintResult(passed)
+
+def RunBurst(rig, mode):
+	"""
+	Check BURST track performance.
+	"""
+	return CompareTrackCounts(rig, mode, mode.burst_track)
+
+def RunAWGN(rig, mode):
+	"""
+	Check AWGN track performance.
+	"""
+	return CompareTrackCounts(rig, mode, mode.awgn_track)
+
+def WaitForBeacon(rig, kiss_type_payload):
+	rig.ClearQueues()
+	rig.WriteTest(vpacket.EncodeKISSFrame(0x09, kiss_type_payload))
+	packet = vpacket.GenerateUIPacket(rig.test_callsign, rig.standard_callsign, "nothing to see here ", 0)
+	# Stop waiting as soon as the first beacon is heard.
+	rig.WriteTest(vpacket.EncodeKISSFrame(0,packet))
+	frames = vthread.WaitForFrames(rig.standard_serial_queue, count=1, timeout=rig.beacon_interval)
+	if not frames:
+		rig.WriteTest(vpacket.EncodeKISSFrame(0,packet))
+		frames = vthread.WaitForFrames(rig.standard_serial_queue, count=1, timeout=rig.beacon_interval)
+	summary = vpacket.ParseFrames(frames)
+	PrintFrames("STANDARD", summary, payload=True)
+	print(f"Standard device heard {summary['Count']} packets.")
+	return summary['Count']
+
+def RunBeacon(rig, mode):
+	"""
+	Check BEACON PACKET function.
+	"""
+	return PrintResult(WaitForBeacon(rig, [0xF0, 0x01]) > 0) # Set beacon interval to 1 minute
+
+def RunBeaconDisable(rig, mode):
+	"""
+	Check BEACON PACKET DISABLE function.
+	"""
+	return PrintResult(WaitForBeacon(rig, [0xF0, 0x00]) == 0) # Set beacon interval to off
+
+def RunTARPNstat(rig, mode):
+	"""
+	Check TARPNstat auto host meta-frame over USB.
+	"""
+	rig.ClearQueues()
+	packet = vpacket.GenerateUIPacket(rig.test_callsign, rig.standard_callsign, " TARPNstat", 0)
+	metadata = vpacket.GetFrameMeta(packet)
+	print(f'{time.asctime()} TEST device sending {metadata["SOURCE"]} to {metadata["DEST"]} CRC {metadata["CRC"]}.')
+	print(f"{time.asctime()} Packet payload: {str(metadata['Payload'])}")
+	rig.WriteTest(vpacket.EncodeKISSFrame(0,packet))
+	summary = vpacket.ParseFrames(vthread.WaitForFrames(rig.test_serial_queue, count=1, timeout=rig.frame_timeout))
+	PrintFrames("TEST", summary, payload=True)
+	print(f"TEST device heard {summary['Count']} packets.")
+	return PrintResult(summary['Count'] > 0)
+
+def EstimateTrack(track, mode):
+	airtime = vmanifest.TrackDuration(track)
+	if airtime is None:
+		airtime = vmodes.TrackAirtime(track, mode.bit_rate)
+	if airtime is None:
+		airtime = 60.0
+	return airtime + 1
+
+class Phase:
+	"""
+	A kind of test. stage orders phases whose side effects must not overlap:
+	beacons stay enabled on the TEST device after the beacon phase, so it runs
+	after every phase that counts frames, and beacon disable runs last.
+	fixed_modes is the (TEST, STANDARD) MODE pair for phases that do not run
+	once per mode. estimate(mode, beacon_interval) gives the expected run time
+	of one case in seconds. track(mode) gives the audio track a case plays, if
+	any, so it can be loaded ahead of time.
+	"""
+	def __init__(self, name, title, function, stage, estimate, fixed_modes=None, track=None):
+		self.name = name
+		self.title = title
+		self.function = function
+		self.stage = stage
+		self.estimate = estimate
+		self.fixed_modes = fixed_modes
+		self.track = track
+
+PHASES = [
+	Phase("callsign", "SET TEST DEVICE CALLSIGN", RunSetCallsign, 0, lambda mode, beacon_interval: 1.0, (1, 1)),
+	Phase("adoption", "OWN DEVICE CALLSIGN ADOPTION", RunCallsignAdoption, 0, lambda mode, beacon_interval: 1.0, (1, 1)),
+	Phase("loopback", "USB TEST PACKET and LOOPBACK TEST", RunLoopback, 0, lambda mode, beacon_interval: 3 * (2 + (100 * 8 / mode.bit_rate))),
+	Phase("burst", "BURST TRACK PERFORMANCE", RunBurst, 0, lambda mode, beacon_interval: EstimateTrack(mode.burst_track, mode), track=lambda mode: mode.burst_track),
+	Phase("awgn", "AWGN TRACK PERFORMANCE", RunAWGN, 0, lambda mode, beacon_interval: EstimateTrack(mode.awgn_track, mode), track=lambda mode: mode.awgn_track),
+	Phase("beacon", "BEACON FUNCTION", RunBeacon, 1, lambda mode, beacon_interval: beacon_interval),
+	Phase("beacon_disable", "BEACON DISABLE FUNCTION", RunBeaconDisable, 2, lambda mode, beacon_interval: 2 * beacon_interval, (1, 6)),
+	Phase("tarpnstat", "TARPNstat auto host meta-frame", RunTARPNstat, 2, lambda mode, beacon_interval: 1.0, (1, 6)) ]
+
+PHASES_BY_NAME = {phase.name: phase for phase in PHASES}
+
+class TestCase:
+	"""
+	One phase run in one mode, with the MODE settings it needs on the TEST and
+	STANDARD devices. mode is None for phases with fixed MODE settings.
+	"""
+	def __init__(self, phase, mode, test_mode, standard_mode):
+		self.phase = phase
+		self.mode = mode
+		self.test_mode = test_mode
+		self.standard_mode = standard_mode
+
+	@property
+	def name(self):
+		if self.mode is None:
+			return self.phase.name
+		return f"{self.phase.name}:{self.mode.name}"
+
+	def Run(self, rig):
+		return self.phase.function(rig, self.mode)
+
+	def Track(self):
+		if self.phase.track is None or self.mode is None:
+			return None
+		return self.phase.track(self.mode)
+
+	def Estimate(self, beacon_interval=60.0):
+		return self.phase.estimate(self.mode, beacon_interval)
+
+def BuildRegistry(mode_table, phase_names=None, modes=None):
+	"""
+	Returns the test cases for the named phases (all by default) in the given
+	modes (all of mode_table by default), in phase order.
+	"""
+	if phase_names is None:
+		phase_names = [phase.name for phase in PHASES]
+	if modes is None:
+		modes = list(mode_table)
+	for name in phase_names:
+		if name not in PHASES_BY_NAME:
+			raise ValueError(f"Unknown phase '{name}'")
+	cases = []
+	for phase in PHASES:
+		if phase.name not in phase_names:
+			continue
+		if phase.fixed_modes is not None:
+			cases.append(TestCase(phase, None, phase.fixed_modes[0], phase.fixed_modes[1]))
+		elif phase.name == "beacon":
+			for mode in modes:
+				if mode.beacon_mode > 0:
+					cases.append(TestCase(phase, mode, mode.pattern, mode.beacon_mode))
+		else:
+			for mode in modes:
+				cases.append(TestCase(phase, mode, mode.pattern, mode.pattern))
+	return cases
+
+def Schedule(cases):
+	"""
+	Groups cases by (TEST, STANDARD) MODE pair within each stage, so each pair
+	is entered once per stage. Returns a list of (test_mode, standard_mode,
+	cases) groups. Groups keep the order in which their pair first appears,
+	and cases keep their order within a group.
+	"""
+	groups = {}
+	for case in sorted(cases, key=lambda case: case.phase.stage):
+		key = (case.phase.stage, case.test_mode, case.standard_mode)
+		groups.setdefault(key, []).append(case)
+	return [(key[1], key[2], group) for key, group in groups.items()]
+
+def CountModeChanges(schedule):
+	changes = 0
+	current_modes = None
+	for test_mode, standard_mode, group in schedule:
+		if (test_mode, standard_mode) != current_modes:
+			changes += 1
+			current_modes = (test_mode, standard_mode)
+	return changes
+
+def EstimateSchedule(schedule, reset_time=2.0, beacon_interval=60.0):
+	"""
+	Expected run time of a schedule in seconds, counting reset_time for each
+	mode change.
+	"""
+	return (CountModeChanges(schedule) * reset_time) + sum(case.Estimate(beacon_interval) for test_mode, standard_mode, group in schedule for case in group)
+
+def RunSchedule(rig, schedule, recorder=None):
+	"""
+	Runs every scheduled case on rig. Returns a list of (case, verdict) where
+	verdict is True, False, or None for cases that only set up the devices.
+	recorder, if given, is called as recorder(case, verdict, started,
+	duration) after each case, started being time.time() and duration in
+	seconds.
+	"""
+	results = []
+	for test_mode, standard_mode, group in schedule:
+		# Load this group's tracks while the devices reset.
+		for case in group:
+			if case.Track() is not None:
+				rig.PreloadTrack(case.Track())
+		rig.SetModes(test_mode, standard_mode)
+		for case in group:
+			if case.mode is None:
+				print(f"{time.asctime()} Testing {case.phase.title}.")
+			else:
+				print(f"{time.asctime()} Testing {case.phase.title}, mode {case.mode.name}.")
+			started = time.time()
+			start_time = time.monotonic()
+			rig.Mark("case_start", name=case.name)
+			verdict = case.Run(rig)
+			rig.Mark("case_end", name=case.name, verdict=verdict)
+			results.append((case, verdict))
+			if recorder is not None:
+				recorder(case, verdict, started, time.monotonic() - start_time)
+	return results
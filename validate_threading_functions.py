@@ -6,7 +6,8 @@
 
 
 import threading
-import subprocess
+import queue
+import validate_clock as vclock
 
 def end_do_nothing():
 	return
@@ -15,6 +16,56 @@ def ClearQueue(q):
 	while not q.empty():
 		q.get()
 
+def DrainQueue(q):
+	items = []
+	while not q.empty():
+		items.append(q.get())
+	return items
+
+def WaitForFrames(q, count=0, quiet_time=0, timeout=1, settle_time=None):
+	"""
+	Collects frames from q, including any already queued, and returns them as
+	a list as soon as count frames have arrived or no frame has arrived for
+	quiet_time seconds. Returns whatever has arrived after timeout seconds at
+	the latest. A count or quiet_time of 0 disables that condition.
+	The quiet timer only starts with the first frame, so a decode still in
+	flight is not cut off; with settle_time it also starts settle_time
+	seconds after the call, e.g. 0 to stop early when nothing is coming.
+	"""
+	frames = []
+	start_time = vclock.Monotonic()
+	deadline = start_time + timeout
+	quiet_start = None if settle_time is None else start_time + settle_time
+	while not (count and len(frames) >= count):
+		now = vclock.Monotonic()
+		wait = deadline - now
+		if quiet_time and quiet_start is not None:
+			wait = min(wait, quiet_start + quiet_time - now)
+		if wait <= 0:
+			break
+		try:
+			frames.append(q.get(timeout=vclock.RealTime(wait)))
+		except queue.Empty:
+			# Either the stream went quiet or the deadline passed.
+			break
+		quiet_start = vclock.Monotonic()
+	return frames
+
+def WaitForFramesEach(queues, count=0, quiet_time=0, timeout=1, settle_time=None):
+	"""
+	WaitForFrames on every queue in queues at once, so each gets the same
+	window. Returns a list of frame lists, one per queue.
+	"""
+	results = [[] for q in queues]
+	def Wait(index, q):
+		results[index] = WaitForFrames(q, count, quiet_time, timeout, settle_time)
+	threads = [threading.Thread(target=Wait, args=(index, q)) for index, q in enumerate(queues)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return results
+
 # adapted from https://stackoverflow.com/questions/2581817/python-subprocess-callback-when-cmd-exits
 def popen_and_call(on_exit, *popen_args):
 	"""
@@ -23,6 +74,7 @@ def popen_and_call(on_exit, *popen_args):
 	on_exit is a callable object, and popen_args is a list/tuple of args that
 	would give to subprocess.Popen.
 	"""
+	import subprocess
 	def run_in_thread(on_exit, popen_args):
 		proc = subprocess.Popen(*popen_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 		out, err = proc.communicate()
@@ -0,0 +1,300 @@
+# validate_threshold.py
+# Python3
+# Support validate.py
+# Adaptive search for each device's 50% decode point per mode
+# 18 Oct 2026
+#
+# Instead of one pass/fail comparison at a fixed level, the stimulus is
+# stepped to find where each device decodes half the packets of a burst
+# track. The stimulus is the Eb/N0 of the burst track, rendered by
+# validate_channel.py, or the sound card mixer level. Both devices hear
+# every playback, so each playback is one observation for each.
+#
+# The search bisects each device's bracket around 50% first, then plays
+# at the current estimate of whichever device's threshold is least
+# certain, until both confidence intervals are narrow enough. The
+# thresholds come from a maximum likelihood logistic fit of every
+# observation:
+#   python3 validate.py --threshold-search ebn0 --modes AFSK_1200_AX25
+
+import os
+import math
+import time
+import statistics
+import validate_tests as vtests
+
+class ThresholdFit:
+	"""
+	A device's 50% decode level from a logistic fit, with its standard
+	error, the confidence interval low..high, and the slope in log-odds
+	per stimulus unit.
+	"""
+	def __init__(self, threshold, error, low, high, slope):
+		self.threshold = threshold
+		self.error = error
+		self.low = low
+		self.high = high
+		self.slope = slope
+
+def Logistic(x):
+	if x < -700:
+		return 0.0
+	return 1 / (1 + math.exp(-x))
+
+def LogLogistic(x):
+	# log(Logistic(x)), without overflow for large negative x.
+	if x < 0:
+		return x - math.log1p(math.exp(x))
+	return -math.log1p(math.exp(-x))
+
+def LogLikelihood(observations, center, a, b, ridge):
+	total = -ridge * b * b / 2
+	for level, decoded, sent in observations:
+		eta = a + b * (level - center)
+		total += decoded * LogLogistic(eta) + (sent - decoded) * LogLogistic(-eta)
+	return total
+
+def Curvature(observations, center, a, b, ridge):
+	# Gradient (g_a, g_b) and negated Hessian (h_aa, h_ab, h_bb) of LogLikelihood.
+	gradient_a = 0.0
+	gradient_b = -ridge * b
+	h_aa = 1e-9
+	h_ab = 0.0
+	h_bb = ridge
+	for level, decoded, sent in observations:
+		x = level - center
+		p = Logistic(a + b * x)
+		w = sent * p * (1 - p)
+		gradient_a += decoded - sent * p
+		gradient_b += (decoded - sent * p) * x
+		h_aa += w
+		h_ab += w * x
+		h_bb += w * x * x
+	return gradient_a, gradient_b, h_aa, h_ab, h_bb
+
+def FitThreshold(observations, confidence=0.95, ridge=0.01, iterations=50):
+	"""
+	Fits P(decode) = Logistic(a + b (level - center)) to observations, a
+	list of (level, decoded, sent), by Newton's method with step halving.
+	ridge keeps the slope finite when the observations separate perfectly.
+	Returns a ThresholdFit, or None if decoding does not improve with the
+	level.
+	"""
+	if not observations:
+		return None
+	center = sum(level for level, decoded, sent in observations) / len(observations)
+	a = 0.0
+	b = 0.0
+	likelihood = LogLikelihood(observations, center, a, b, ridge)
+	for iteration in range(iterations):
+		gradient_a, gradient_b, h_aa, h_ab, h_bb = Curvature(observations, center, a, b, ridge)
+		determinant = h_aa * h_bb - h_ab * h_ab
+		step_a = (h_bb * gradient_a - h_ab * gradient_b) / determinant
+		step_b = (h_aa * gradient_b - h_ab * gradient_a) / determinant
+		scale = 1.0
+		trial = LogLikelihood(observations, center, a + step_a, b + step_b, ridge)
+		while trial < likelihood and scale > 1e-6:
+			scale /= 2
+			trial = LogLikelihood(observations, center, a + scale * step_a, b + scale * step_b, ridge)
+		if trial < likelihood:
+			break
+		a += scale * step_a
+		b += scale * step_b
+		improvement = trial - likelihood
+		likelihood = trial
+		if improvement < 1e-10:
+			break
+	if b <= 0:
+		return None
+	# Delta method on threshold = center - a / b, with the covariance from the curvature at the fit.
+	gradient_a, gradient_b, h_aa, h_ab, h_bb = Curvature(observations, center, a, b, ridge)
+	determinant = h_aa * h_bb - h_ab * h_ab
+	threshold = center - a / b
+	g_a = -1 / b
+	g_b = a / (b * b)
+	variance = (g_a * g_a * h_bb - 2 * g_a * g_b * h_ab + g_b * g_b * h_aa) / determinant
+	error = math.sqrt(max(variance, 0.0))
+	z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+	return ThresholdFit(threshold, error, threshold - z * error, threshold + z * error, b)
+
+class DeviceSearch:
+	"""
+	One device's observations, and its bracket low..high around the 50%
+	decode level, narrowed by every observation inside it.
+	"""
+	def __init__(self, name, low, high):
+		self.name = name
+		self.low = low
+		self.high = high
+		self.observations = []
+
+	def Observe(self, level, decoded, sent):
+		self.observations.append((level, decoded, sent))
+		if self.low < level < self.high:
+			if decoded * 2 >= sent:
+				self.high = level
+			else:
+				self.low = level
+
+class ThresholdSearch:
+	"""
+	Finds both devices' 50% decode levels between low and high. play(level,
+	playback) plays the stimulus at level and returns (TEST decodes,
+	STANDARD decodes, packets sent). Bisection runs until each bracket is
+	narrower than resolution; refinement until each confidence interval is
+	narrower than interval, or after max_playbacks.
+	"""
+	def __init__(self, play, low, high, resolution, interval, max_playbacks=24, confidence=0.95):
+		self.play = play
+		self.range = (low, high)
+		self.resolution = resolution
+		self.interval = interval
+		self.max_playbacks = max_playbacks
+		self.confidence = confidence
+		self.devices = [DeviceSearch("TEST", low, high), DeviceSearch("STANDARD", low, high)]
+		self.playbacks = 0
+
+	def NextLevel(self):
+		# The level to play next, or None once every threshold is known well enough.
+		unbracketed = [device for device in self.devices if device.high - device.low > self.resolution]
+		if unbracketed:
+			device = max(unbracketed, key=lambda device: device.high - device.low)
+			return (device.low + device.high) / 2
+		widest = None
+		width = self.interval
+		for device in self.devices:
+			fit = FitThreshold(device.observations, self.confidence)
+			device_width = math.inf if fit is None else fit.high - fit.low
+			if device_width > width:
+				widest = (device, fit)
+				width = device_width
+		if widest is None:
+			return None
+		device, fit = widest
+		if fit is None:
+			return (device.low + device.high) / 2
+		return min(max(fit.threshold, self.range[0]), self.range[1])
+
+	def Fit(self, device):
+		# A threshold outside the searched range is an extrapolation, not a measurement.
+		fit = FitThreshold(device.observations, self.confidence)
+		if fit is None or not self.range[0] <= fit.threshold <= self.range[1]:
+			return None
+		return fit
+
+	def Run(self):
+		while self.playbacks < self.max_playbacks:
+			level = self.NextLevel()
+			if level is None:
+				break
+			test_decoded, standard_decoded, sent = self.play(level, self.playbacks)
+			self.playbacks += 1
+			for device, decoded in zip(self.devices, (test_decoded, standard_decoded)):
+				device.Observe(level, decoded, sent)
+		return [self.Fit(device) for device in self.devices]
+
+class EbN0Stimulus:
+	"""
+	Plays the mode's burst track with noise added at the level's Eb/N0, in
+	dB, from a validate_channel.VariantCache. Each playback has new noise.
+	The range covers the 50% points of the AX.25 modes with a few dB to
+	spare; below it validate_channel turns the track down so far for
+	noise headroom that little of the 16 bit range is left for the signal.
+	"""
+	name = "Eb/N0"
+	unit = "dB"
+	low = 0.0
+	high = 16.0
+	resolution = 0.5
+	interval = 1.0
+
+	def __init__(self, rig, cache, root):
+		import validate_channel as vchannel
+		self.vchannel = vchannel
+		self.rig = rig
+		self.cache = cache
+		self.root = root
+
+	def Play(self, mode, level, playback):
+		track = self.cache.Get(os.path.join(self.root, mode.burst_track), self.vchannel.Impairment(level, seed=playback), mode.bit_rate)
+		return vtests.CountTrackDecodes(self.rig, track)
+
+	def Finish(self):
+		pass
+
+class VolumeStimulus:
+	"""
+	Plays the mode's burst track with the mixer at the level, in percent.
+	The mixer is put back to the rig's setting afterwards.
+	"""
+	name = "volume"
+	unit = "%"
+	low = 0.0
+	high = 100.0
+	resolution = 2.0
+	interval = 4.0
+
+	def __init__(self, rig):
+		self.rig = rig
+		self.original = float(rig.soundcard_volume.rstrip('%'))
+
+	def Play(self, mode, level, playback):
+		self.rig.SetVolume(round(level, 1))
+		return vtests.CountTrackDecodes(self.rig, mode.burst_track)
+
+	def Finish(self):
+		self.rig.SetVolume(self.original)
+
+class ModeThresholds:
+	# Result of the search on one mode: a ThresholdFit or None per device.
+	def __init__(self, mode, test_fit, standard_fit, playbacks):
+		self.mode = mode
+		self.test_fit = test_fit
+		self.standard_fit = standard_fit
+		self.playbacks = playbacks
+
+	def Difference(self, confidence=0.95):
+		"""
+		Returns (TEST threshold - STANDARD threshold, low, high) with the
+		confidence interval of the difference, or None.
+		"""
+		if self.test_fit is None or self.standard_fit is None:
+			return None
+		difference = self.test_fit.threshold - self.standard_fit.threshold
+		error = math.sqrt(self.test_fit.error ** 2 + self.standard_fit.error ** 2)
+		z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+		return difference, difference - z * error, difference + z * error
+
+def RunThresholdSearch(rig, modes, stimulus, max_playbacks=24, confidence=0.95):
+	# Searches every one of modes on rig. Returns a list of ModeThresholds.
+	results = []
+	try:
+		for mode in modes:
+			rig.SetModes(mode.pattern, mode.pattern)
+			print(f"{time.asctime()} Searching the 50% decode {stimulus.name} of mode {mode.name}.")
+
+			def Play(level, playback):
+				test_decoded, standard_decoded, sent = stimulus.Play(mode, level, playback)
+				print(f"{time.asctime()} {stimulus.name} {level:.2f} {stimulus.unit}: TEST {test_decoded}/{sent}, STANDARD {standard_decoded}/{sent}.")
+				return test_decoded, standard_decoded, sent
+
+			search = ThresholdSearch(Play, stimulus.low, stimulus.high, stimulus.resolution, stimulus.interval, max_playbacks, confidence)
+			test_fit, standard_fit = search.Run()
+			results.append(ModeThresholds(mode, test_fit, standard_fit, search.playbacks))
+	finally:
+		stimulus.Finish()
+	return results
+
+def FormatFit(fit, unit):
+	if fit is None:
+		return "not found"
+	return f"{fit.threshold:.2f} [{fit.low:.2f}, {fit.high:.2f}] {unit}"
+
+def Report(results, stimulus, confidence=0.95):
+	# Table lines: each device's 50% decode level and the difference, with confidence intervals.
+	lines = [f"{'mode':<18}{'TEST 50%':<28}{'STANDARD 50%':<28}{'TEST - STANDARD':<28}{'playbacks':>9}"]
+	for result in results:
+		difference = result.Difference(confidence)
+		difference_text = "-" if difference is None else f"{difference[0]:+.2f} [{difference[1]:+.2f}, {difference[2]:+.2f}] {stimulus.unit}"
+		lines.append(f"{result.mode.name:<18}{FormatFit(result.test_fit, stimulus.unit):<28}{FormatFit(result.standard_fit, stimulus.unit):<28}{difference_text:<28}{result.playbacks:>9}")
+	return lines